@@ -0,0 +1,319 @@
+"""
+Deterministic synthetic game and area generator for the Tinker RPG Editor
+
+Produces large inputs for benchmarks and scaling tests. Run as a script to
+write a whole game to disk:
+    python area_generator.py generated --areas 20 --width 512 --height 512 --seed 7
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from dataclasses import asdict
+
+from data_classes import Tile, GameObject, Trigger, Area, Game, ObjectStore
+
+# Cells are stored as one byte per tile, indexing PALETTE
+PALETTE = ("empty", "gray_brick_wall", "wood_floor", "cobblestone_floor", "brown_brick_wall")
+EMPTY, WALL, ROOM_FLOOR, CORRIDOR, CAVE_WALL = range(len(PALETTE))
+CAVE_FLOOR = CORRIDOR
+FLOORS = frozenset((ROOM_FLOOR, CORRIDOR))
+
+OBJECT_TYPES = ("bed_object", "candles_object", "chair_object", "chest_object", "fountain_object",
+                "gargoyle_object", "lever_object", "table_object", "throne_object")
+NPC_TYPES = ("dog_npc", "fighter_npc", "frog_npc", "guard_npc", "hood_npc", "horse_npc", "king_npc",
+             "man_npc", "oldwoman_npc", "peasant_npc", "queen_npc", "richman_npc", "thief_npc",
+             "wizard_npc", "woman_npc", "worker_npc")
+STYLES = ("bsp", "caves", "mixed")
+MIN_LEAF = 8  # Smallest BSP partition side, walls included
+MAX_SIZE = 16384
+CAVE_STEPS = 4
+
+# Corridors turn empty cells and the walls they cut through into corridor floor. Door tiles
+# aren't used: none of the door assets is walkable under TileManager's name-based rule.
+_CORRIDOR_TABLE = bytes(CORRIDOR if value in (EMPTY, WALL) else value for value in range(256))
+_CAVE_TABLE = bytes.maketrans(b"01", bytes((CAVE_FLOOR, CAVE_WALL)))
+
+class GeneratedArea:
+    """An area as a byte grid plus objects and triggers, cheap enough for 16k x 16k cells"""
+
+    def __init__(self, name, width, height, grid, objects, triggers, landing):
+        self.name = name
+        self.width = width
+        self.height = height
+        self.grid = grid  # One bytearray per row
+        self.objects = objects
+        self.triggers = triggers
+        self.landing = landing  # Floor cell that teleports from other areas arrive at
+
+    def used_tiles(self):
+        seen = set()
+        for row in self.grid:
+            seen.update(row)
+        return [PALETTE[value] for value in sorted(seen) if value != EMPTY]
+
+    def to_area(self):
+        """Build an editor Area; cells with the same tile share one Tile object"""
+        tiles = [Tile(type=tile_type) for tile_type in PALETTE]
+        return Area(name=self.name, width=self.width, height=self.height,
+                    tiles=[list(map(tiles.__getitem__, row)) for row in self.grid],
+                    objects=ObjectStore(self.objects), triggers=list(self.triggers))
+
+    def write_json(self, f):
+        """Stream the area in the editor's file format, one row at a time"""
+        cell_json = {value: json.dumps(asdict(Tile(type=tile_type))) + ", "
+                     for value, tile_type in enumerate(PALETTE)}
+        f.write(f'{{"name": {json.dumps(self.name)}, "width": {self.width}, "height": {self.height},\n"tiles": [\n')
+        for y, row in enumerate(self.grid):
+            # latin-1 maps each byte to the code point str.translate looks up
+            f.write(("[" if y == 0 else ",\n[") + row.decode("latin-1").translate(cell_json)[:-2] + "]")
+        f.write('\n],\n"objects": [')
+        f.write(",\n".join(json.dumps(asdict(obj)) for obj in self.objects))
+        f.write('],\n"triggers": [')
+        f.write(",\n".join(json.dumps(asdict(trig)) for trig in self.triggers))
+        f.write(']}\n')
+
+def _fill(grid, x0, y0, x1, y1, value):
+    """Set the cells of [x0, x1) x [y0, y1) to value"""
+    run = bytes((value,)) * (x1 - x0)
+    for row in grid[y0:y1]:
+        row[x0:x1] = run
+
+def _corridor(grid, x0, y0, x1, y1):
+    """Carve an L-shaped corridor, horizontal leg first"""
+    left, right = sorted((x0, x1))
+    row = grid[y0]
+    row[left:right + 1] = row[left:right + 1].translate(_CORRIDOR_TABLE)
+    for y in range(min(y0, y1), max(y0, y1) + 1):
+        grid[y][x1] = _CORRIDOR_TABLE[grid[y][x1]]
+
+def _split(rng, grid, x, y, width, height):
+    """Partition the rectangle, put a room in each leaf and connect siblings; returns a room center"""
+    can_split_x, can_split_y = width >= 2 * MIN_LEAF, height >= 2 * MIN_LEAF
+    small = width < 3 * MIN_LEAF and height < 3 * MIN_LEAF
+    if not (can_split_x or can_split_y) or (small and rng.random() < 0.25):
+        room_w = rng.randint(min(5, width - 2), width - 2)
+        room_h = rng.randint(min(5, height - 2), height - 2)
+        room_x = x + 1 + rng.randint(0, width - 2 - room_w)
+        room_y = y + 1 + rng.randint(0, height - 2 - room_h)
+        _fill(grid, room_x, room_y, room_x + room_w, room_y + room_h, WALL)
+        _fill(grid, room_x + 1, room_y + 1, room_x + room_w - 1, room_y + room_h - 1, ROOM_FLOOR)
+        return room_x + room_w // 2, room_y + room_h // 2
+
+    if can_split_x and (not can_split_y or width > height or (width == height and rng.random() < 0.5)):
+        cut = rng.randint(MIN_LEAF, width - MIN_LEAF)
+        first = _split(rng, grid, x, y, cut, height)
+        second = _split(rng, grid, x + cut, y, width - cut, height)
+    else:
+        cut = rng.randint(MIN_LEAF, height - MIN_LEAF)
+        first = _split(rng, grid, x, y, width, cut)
+        second = _split(rng, grid, x, y + cut, width, height - cut)
+    _corridor(grid, *first, *second)
+    return first if rng.random() < 0.5 else second
+
+def bsp_grid(rng, width, height):
+    """Rooms from binary space partitioning joined by corridors; returns (grid, landing)"""
+    grid = [bytearray(width) for _ in range(height)]
+    center = _split(rng, grid, 0, 0, width, height)
+    landing = (width // 2, height // 2)
+    _corridor(grid, *center, *landing)
+    return grid, landing
+
+def _at_least_five(values):
+    """Bitwise: which bit positions are set in at least five of the nine values"""
+    b0 = b1 = b2 = b3 = 0
+    for value in values:
+        # Ripple-add one bit into the per-position 4-bit counters
+        carry0 = b0 & value
+        b0 ^= value
+        carry1 = b1 & carry0
+        b1 ^= carry0
+        carry2 = b2 & carry1
+        b2 ^= carry1
+        b3 |= carry2
+    return b3 | (b2 & (b1 | b0))
+
+def _fill_runs(seeds, floor, width):
+    """Grow seeds over the runs of set bits in floor that contain them"""
+    up = down = seeds
+    up_pass = down_pass = floor
+    shift = 1
+    while shift < width:
+        up |= up_pass & (up << shift)
+        up_pass &= up_pass << shift
+        down |= down_pass & (down >> shift)
+        down_pass &= down_pass >> shift
+        shift *= 2
+    return up | down
+
+def _reachable_rows(rows, start, mask):
+    """Per row, the floor bits 4-connected to start; rows hold wall bits.
+
+    Alternate downward and upward sweeps each carry the reached bits into
+    the next row and spread them along its floor runs, until a pass adds
+    nothing.
+    """
+    width, height = mask.bit_length(), len(rows)
+    reached = [0] * height
+    reached[start[1]] = _fill_runs(1 << start[0], ~rows[start[1]] & mask, width)
+    changed = True
+    while changed:
+        changed = False
+        for order in (range(height), range(height - 1, -1, -1)):
+            previous = 0
+            for y in order:
+                floor = ~rows[y] & mask
+                seeds = previous & floor
+                if seeds & ~reached[y]:
+                    reached[y] = _fill_runs(seeds | reached[y], floor, width)
+                    changed = True
+                previous = reached[y]
+    return reached
+
+def cave_grid(rng, width, height, steps=CAVE_STEPS):
+    """Cellular-automaton caves; returns (grid, landing).
+
+    Each row is a Python int with one bit per cell (1 = wall), so a step
+    updates a whole row with a few dozen big-integer operations. A cell
+    becomes wall when at least five cells of its 3x3 block are walls;
+    cells outside the area count as walls. Afterwards only the cave
+    connected to the landing is kept, so every floor cell is reachable.
+    """
+    mask = (1 << width) - 1
+    high = 1 << (width - 1)
+    # About 44% walls to start with
+    rows = [rng.getrandbits(width) & (rng.getrandbits(width) | rng.getrandbits(width) | rng.getrandbits(width))
+            for _ in range(height)]
+    for _ in range(steps):
+        shifted = [(mask, mask, mask)]
+        shifted += [(((row << 1) | 1) & mask, row, (row >> 1) | high) for row in rows]
+        shifted.append((mask, mask, mask))
+        rows = [_at_least_five(shifted[y] + shifted[y + 1] + shifted[y + 2]) for y in range(height)]
+
+    landing = (width // 2, height // 2)
+    plaza = ~(0b111 << max(0, landing[0] - 1)) & mask
+    for y in range(max(0, landing[1] - 1), min(height, landing[1] + 2)):
+        rows[y] &= plaza
+    # Tunnels across the whole area through the landing join the caves they cross,
+    # then every pocket the landing can't reach is filled in
+    rows[landing[1]] = 0
+    column = ~(1 << landing[0]) & mask
+    rows = [row & column for row in rows]
+    reached = _reachable_rows(rows, landing, mask)
+    rows = [row | (~seen & mask) for row, seen in zip(rows, reached)]
+    # Bit x is character x of the reversed binary string
+    return [bytearray(format(row, f"0{width}b")[::-1].encode().translate(_CAVE_TABLE)) for row in rows], landing
+
+def _random_floor(rng, grid, width, height, attempts=1000):
+    for _ in range(attempts):
+        x, y = rng.randrange(width), rng.randrange(height)
+        if grid[y][x] in FLOORS:
+            return x, y
+    return None
+
+def generate_area(name, width, height, seed=0, style="mixed", objects=0, triggers=0, neighbours=()):
+    """Generate one area deterministically from seed.
+
+    neighbours are area names that the first triggers teleport to, landing
+    on the center cell, which every style keeps walkable. The remaining
+    triggers are a mix of dialogs, inventory changes and tile updates.
+    """
+    if not (2 * MIN_LEAF <= width <= MAX_SIZE and 2 * MIN_LEAF <= height <= MAX_SIZE):
+        raise ValueError(f"Area size must be between {2 * MIN_LEAF} and {MAX_SIZE} cells per side")
+    if style not in STYLES:
+        raise ValueError(f"Unknown style {style!r}")
+    rng = random.Random(f"{seed}:{name}")
+    if style == "mixed":
+        style = rng.choice(("bsp", "caves"))
+    grid, landing = (bsp_grid if style == "bsp" else cave_grid)(rng, width, height)
+
+    placed_objects = []
+    for _ in range(objects):
+        cell = _random_floor(rng, grid, width, height)
+        if cell is None:
+            break
+        object_type = rng.choice(NPC_TYPES if rng.random() < 0.3 else OBJECT_TYPES)
+        placed_objects.append(GameObject(type=object_type, x=cell[0], y=cell[1]))
+
+    placed_triggers = []
+    for index in range(triggers):
+        cell = _random_floor(rng, grid, width, height)
+        if cell is None:
+            break
+        if index < len(neighbours):
+            target = neighbours[index]
+            trigger_type, parameters = "teleport", {"area": target, "x": width // 2, "y": height // 2}
+        else:
+            trigger_type = rng.choice(("show_dialog", "inventory", "tile_update"))
+            if trigger_type == "show_dialog":
+                parameters = {"message": f"Message {index} of {name}"}
+            elif trigger_type == "inventory":
+                parameters = {"add": rng.choice(OBJECT_TYPES), "remove": ""}
+            else:
+                tile_x, tile_y = rng.randrange(width), rng.randrange(height)
+                parameters = {"tile": rng.choice(PALETTE[1:]), "x": tile_x, "y": tile_y}
+        placed_triggers.append(Trigger(x=cell[0], y=cell[1], trigger_type=trigger_type,
+                                       name=f"trigger_{index + 1}", parameters=parameters))
+    return GeneratedArea(name, width, height, grid, placed_objects, placed_triggers, landing)
+
+def generate_game(output_dir, name="generated", areas=10, width=256, height=256, objects=100,
+                  triggers=20, seed=0, style="mixed", links=2):
+    """Write a game of linked areas under output_dir/areas and output_dir/games.
+
+    Areas are generated and written one at a time, so memory stays at one
+    area regardless of the game size. Each area teleports to the next and
+    previous areas in a ring plus links - 2 random others.
+    """
+    area_dir, game_dir = os.path.join(output_dir, "areas"), os.path.join(output_dir, "games")
+    os.makedirs(area_dir, exist_ok=True)
+    os.makedirs(game_dir, exist_ok=True)
+    rng = random.Random(f"{seed}:{name}")
+    names = [f"{name}_{index:04d}" for index in range(areas)]
+    game = Game(name=name)
+    used_tiles, used_objects, used_npcs = set(), set(), set()
+
+    for index, area_name in enumerate(names):
+        neighbours = []
+        if areas > 1:
+            neighbours = [names[(index + 1) % areas], names[index - 1]][:links]
+            neighbours += [rng.choice(names) for _ in range(max(0, links - 2))]
+        generated = generate_area(area_name, width, height, seed, style, objects,
+                                  max(triggers, len(neighbours)), neighbours)
+        with open(os.path.join(area_dir, area_name + ".json"), 'w') as f:
+            generated.write_json(f)
+        game.areas.append(area_name + ".json")
+        used_tiles.update(generated.used_tiles())
+        for obj in generated.objects:
+            (used_npcs if obj.type in NPC_TYPES else used_objects).add(obj.type)
+
+    game.used_tiles, game.used_objects, game.used_npcs = sorted(used_tiles), sorted(used_objects), sorted(used_npcs)
+    game.used_triggers = ["trigger"] if triggers or areas > 1 else []
+    with open(os.path.join(game_dir, name + ".json"), 'w') as f:
+        json.dump(asdict(game), f, indent=2)
+    return game
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic game for benchmarks and scaling tests")
+    parser.add_argument("output_dir")
+    parser.add_argument("--name", default="generated")
+    parser.add_argument("--areas", type=int, default=10)
+    parser.add_argument("--width", type=int, default=256)
+    parser.add_argument("--height", type=int, default=256)
+    parser.add_argument("--objects", type=int, default=100, help="objects and NPCs per area")
+    parser.add_argument("--triggers", type=int, default=20, help="triggers per area, teleports included")
+    parser.add_argument("--links", type=int, default=2, help="teleports per area to other areas")
+    parser.add_argument("--style", choices=STYLES, default="mixed")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    game = generate_game(args.output_dir, args.name, args.areas, args.width, args.height, args.objects,
+                         args.triggers, args.seed, args.style, args.links)
+    print(f"Generated {len(game.areas)} {args.width}x{args.height} areas in {args.output_dir} "
+          f"in {time.perf_counter() - start:.1f} s")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,437 @@
+"""
+Retained-mode area canvas rendering for the Tinker RPG Editor
+"""
+
+import tkinter as tk
+from PIL import Image, ImageTk
+
+from area_scene import AreaScene, GRID_COLOR
+from render_target import CanvasTarget
+from render_stats import timed
+
+ZOOM_LEVELS = [4, 8, 16, 32, 64]  # Tile sizes in pixels, 32 is 1:1
+VIEWPORT_MARGIN = 4  # Cells materialized beyond each edge of the visible region
+CHUNK_CELLS = 16  # Cells per side of a composited tile chunk
+STATS_HUD_INTERVAL = 500  # Milliseconds between refreshes of the render-stats overlay
+
+class AreaRenderer:
+    """Mixin class that keeps the area canvas in sync with the current area.
+
+    Canvas item ids are kept per cell and layer, so an edit only reconfigures
+    the items of the cells it touched instead of rebuilding the whole canvas.
+    Only cells inside the visible scroll region (plus a margin) have items;
+    cells that scroll out of view hand their items to cells scrolling in.
+
+    With composite_tiles enabled the tile layer is drawn as one Pillow image
+    per CHUNK_CELLS x CHUNK_CELLS chunk instead of one item per tile, and an
+    edit repaints only the touched cell inside its chunk.
+
+    Cells with tiles on more than one visible tile layer show a single image
+    of the composited stack; AreaScene caches one per distinct stack, so an
+    edit re-composites at most the stacks it newly creates.
+
+    The grid is a handful of long lines spanning the visible region and the
+    blocked markers are a single transparent overlay image built from the
+    collision data, so the item count stays close to one per visible tile.
+
+    What each cell looks like is decided by AreaScene, drawn through a
+    CanvasTarget; render_area() draws the same scene into a Pillow image.
+    """
+
+    @timed("draw_area")
+    def draw_area(self):
+        """Rebuild the canvas; used when the area, zoom or assets change"""
+        self.canvas.delete("all")
+        if getattr(self, '_canvas_target', None) is not None:
+            self._canvas_target.clear()
+        self.tile_manager.sprite_cache.release("area")
+        self._cell_items = {}  # (x, y) -> {"pos", "tile", "tile_kind", "overlay": [...]}
+        self._free_cell_items = []  # Item sets of cells that scrolled out of view
+        self._visible_cells = (0, 0, 0, 0)  # x0, y0, x1, y1 (exclusive)
+        self._tile_chunks = {}  # (cx, cy) -> {"item", "pil_image", "photo"}
+        self._grid_lines = []
+        # Created first so grid lines can be slotted below it and objects land above it
+        self._blocked_layer = {"item": self.canvas.create_image(0, 0, anchor=tk.NW, state=tk.HIDDEN),
+                               "pil_image": None, "photo": None, "origin": (0, 0)}
+        self._cursor_item = None
+        self._anchor_item = None
+        self._canvas_target = CanvasTarget(self.canvas, self.tile_manager)
+
+        size = self.tile_size
+        self.canvas.configure(scrollregion=(0, 0, self.current_area.width * size, self.current_area.height * size))
+        if hasattr(self, 'minimap') and not self.minimap.is_showing(self.current_area, self.tile_manager):
+            self.minimap.set_area(self.current_area, self.tile_manager)
+        self.update_viewport()
+        self.update_cursor_display()
+        if getattr(self, 'show_stats', False):
+            self.update_stats_hud()
+
+    def area_scene(self):
+        """The scene for the current area, tile manager and zoom"""
+        scene = getattr(self, '_scene', None)
+        if (scene is None or scene.area is not self.current_area or scene.tile_manager is not self.tile_manager
+                or scene.tile_size != self.tile_size):
+            scene = self._scene = AreaScene(self.current_area, self.tile_manager, self.tile_size,
+                                            self.trigger_colors)
+        return scene
+
+    def on_area_xview(self, *args):
+        self.canvas.xview(*args)
+        self.update_viewport()
+        if getattr(self, 'show_stats', False):
+            self.update_stats_hud()
+
+    def on_area_yview(self, *args):
+        self.canvas.yview(*args)
+        self.update_viewport()
+        if getattr(self, 'show_stats', False):
+            self.update_stats_hud()
+
+    def visible_cell_range(self, margin=VIEWPORT_MARGIN):
+        """Return (x0, y0, x1, y1) of the cells in view plus a margin, x1/y1 exclusive"""
+        size = self.tile_size
+        left, top = self.canvas.canvasx(0), self.canvas.canvasy(0)
+        right = left + max(self.canvas.winfo_width(), 1)
+        bottom = top + max(self.canvas.winfo_height(), 1)
+        return (max(0, int(left // size) - margin),
+                max(0, int(top // size) - margin),
+                min(self.current_area.width, int(right // size) + 1 + margin),
+                min(self.current_area.height, int(bottom // size) + 1 + margin))
+
+    def center_view_on(self, x, y):
+        """Scroll the area canvas so that cell (x, y) is in the middle of the view"""
+        size = self.tile_size
+        total_w, total_h = self.current_area.width * size, self.current_area.height * size
+        self.canvas.xview_moveto(max(0.0, (x * size + size / 2 - self.canvas.winfo_width() / 2) / total_w))
+        self.canvas.yview_moveto(max(0.0, (y * size + size / 2 - self.canvas.winfo_height() / 2) / total_h))
+        self.update_viewport()
+
+    def on_minimap_jump(self, x, y):
+        self.cursor_x, self.cursor_y = x, y
+        self.selected_trigger_index = 0
+        self.center_view_on(x, y)
+        self.schedule_redraw(cursor=True, properties=True)
+
+    @timed("update_viewport")
+    def update_viewport(self, event=None):
+        """Materialize cells that scrolled into view and recycle those that left it"""
+        if not hasattr(self, '_cell_items'):
+            return
+        old = self._visible_cells
+        new = self.visible_cell_range()
+        if new == old:
+            return
+        self._visible_cells = new
+
+        def inside(x, y, bounds):
+            return bounds[0] <= x < bounds[2] and bounds[1] <= y < bounds[3]
+
+        for x, y in [cell for cell in self._cell_items if not inside(*cell, new)]:
+            self._release_cell(x, y)
+        for y in range(new[1], new[3]):
+            for x in range(new[0], new[2]):
+                if not inside(x, y, old):
+                    self._draw_cell(x, y)
+        if self.composite_tiles:
+            self._update_tile_chunks(new)
+        self._update_grid_lines(new)
+        self._rebuild_blocked_layer(new)
+        if hasattr(self, 'minimap'):
+            self.minimap.set_viewport(*self.visible_cell_range(margin=0))
+        self.canvas.tag_raise("cursor")
+
+    def _release_cell(self, x, y):
+        items = self._cell_items.pop((x, y))
+        target = self._canvas_target
+        for item in items.pop("overlay", []):
+            target.delete(item)
+        if items.get("tile_kind") in ("image", "stack"):
+            # Unpin the sprite while the item waits to be reused; _draw_cell points it at a new one
+            target.release(items["tile"])
+        if "tile" in items:
+            # Hidden until reused, so spare items never cover cells drawn later
+            self.canvas.itemconfigure(items["tile"], state=tk.HIDDEN)
+        self._free_cell_items.append(items)
+
+    @timed("redraw_cells")
+    def redraw_cells(self, cells):
+        """Bring the canvas items of the given cells up to date with the area"""
+        if not hasattr(self, '_cell_items'):
+            self.draw_area()
+            return
+        for x, y in set(cells):
+            # Cells outside the viewport are drawn when they scroll into view
+            if (x, y) in self._cell_items:
+                self._draw_cell(x, y)
+        if self.composite_tiles:
+            self._patch_tile_chunks(cells)
+        self._patch_blocked_layer(cells)
+        if hasattr(self, 'minimap'):
+            self.minimap.update_cells(cells)
+        self.canvas.tag_raise("cursor")
+
+    def _draw_cell(self, x, y):
+        items = self._cell_items.get((x, y))
+        if items is None:
+            items = self._free_cell_items.pop() if self._free_cell_items else {}
+            self._cell_items[(x, y)] = items
+            if "tile" in items:
+                self.canvas.itemconfigure(items["tile"], state=tk.NORMAL)
+        size = self.tile_size
+        x1, y1 = x * size, y * size
+
+        if items.get("pos", (x, y)) != (x, y):
+            self._move_cell_items(items, x1, y1)
+        items["pos"] = (x, y)
+
+        # Tile layer: reconfigure in place when the kind of item is unchanged
+        scene, target = self.area_scene(), self._canvas_target
+        tile_kind = scene.tile_kind(x, y)
+        if self.composite_tiles:
+            tile_kind = None  # Drawn by the chunk image
+            if "tile" in items:
+                target.delete(items.pop("tile"))
+            items.pop("tile_kind", None)
+        elif items.get("tile_kind") != tile_kind:
+            if "tile" in items:
+                target.delete(items["tile"])
+            items["tile"] = scene.draw_tile(target, x, y)
+            items["tile_kind"] = tile_kind
+            self.canvas.tag_lower(items["tile"])
+        elif tile_kind == "image":
+            target.set_sprite(items["tile"], scene.tile_info(x, y), size)
+        elif tile_kind == "stack":
+            stack = scene.tile_stack(x, y)
+            target.set_composite(items["tile"], stack, scene.composite_image(stack))
+
+        # Objects and triggers are sparse, so their items are simply recreated
+        for item in items.pop("overlay", []):
+            target.delete(item)
+        overlay = scene.draw_objects(target, x, y) + scene.draw_triggers(target, x, y)
+        if overlay:
+            items["overlay"] = overlay
+
+    def schedule_redraw(self, cursor=False, properties=False, cells=(), full=False):
+        """Mark parts of the editor dirty; they are redrawn once when Tk goes idle"""
+        if not hasattr(self, '_dirty'):
+            self._dirty = {"cursor": False, "properties": False, "cells": set(), "full": False}
+            self._redraw_pending = False
+        self._dirty["cursor"] |= cursor
+        self._dirty["properties"] |= properties
+        self._dirty["cells"].update(cells)
+        self._dirty["full"] |= full
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            self.root.after_idle(self.flush_redraw)
+
+    @timed("flush_redraw")
+    def flush_redraw(self):
+        """Run a single render pass for everything marked dirty since the last flush"""
+        dirty = self._dirty
+        self._dirty = {"cursor": False, "properties": False, "cells": set(), "full": False}
+        self._redraw_pending = False
+
+        if dirty["full"]:
+            self.draw_area()
+        else:
+            if dirty["cells"]:
+                self.redraw_cells(dirty["cells"])
+            if dirty["cursor"]:
+                self.update_cursor_display()
+        if dirty["properties"]:
+            self.update_properties_display()
+
+    def set_show_grid(self, enabled):
+        self.show_grid = enabled
+        self._update_grid_lines(self._visible_cells)
+
+    def set_show_blocked(self, enabled):
+        self.show_blocked = enabled
+        self._rebuild_blocked_layer(self._visible_cells)
+
+    def set_show_stats(self, enabled):
+        self.show_stats = enabled
+        if enabled:
+            self._stats_hud_loop()
+        else:
+            self.canvas.delete("stats_hud")
+
+    def _stats_hud_loop(self):
+        if self.show_stats:
+            self.update_stats_hud()
+            self.root.after(STATS_HUD_INTERVAL, self._stats_hud_loop)
+
+    def render_stats_lines(self):
+        """Timings, canvas item count and cache hit rates as text lines"""
+        cache = self.tile_manager.sprite_cache.stats()
+        lines = self.render_stats.format_lines()
+        lines.append(f"canvas items: {len(self.canvas.find_all())}")
+        lines.append(f"toolbox items: {len(self.tile_canvas.find_all())}")
+        lines.append(f"sprite cache: {cache['hit_rate']:.1%} hits "
+                     f"({cache['hits']}/{cache['hits'] + cache['misses']}), "
+                     f"{cache['used_bytes'] // 1024} KB, {cache['evictions']} evictions")
+        if hasattr(self, 'history'):
+            history = self.history.stats()
+            lines.append(f"undo history: {history['undo_steps']} steps, {history['used_bytes'] // 1024} KB")
+        return lines
+
+    def update_stats_hud(self):
+        """Redraw the stats overlay in the top-left corner of the visible area"""
+        self.canvas.delete("stats_hud")
+        x, y = self.canvas.canvasx(0) + 5, self.canvas.canvasy(0) + 5
+        text = self.canvas.create_text(x + 4, y + 4, text="\n".join(self.render_stats_lines()),
+                                       anchor=tk.NW, fill="white", font=("TkFixedFont", 9),
+                                       tags="stats_hud")
+        bbox = self.canvas.bbox(text)
+        if bbox:
+            background = self.canvas.create_rectangle(bbox[0] - 4, bbox[1] - 4, bbox[2] + 4, bbox[3] + 4,
+                                                      fill="black", outline="", tags="stats_hud")
+            self.canvas.tag_lower(background, text)
+        self.canvas.tag_raise("stats_hud")
+
+    def _update_grid_lines(self, cells):
+        """Lay out one line per visible row and column boundary, reusing line items"""
+        lines = self.area_scene().grid_lines(cells) if self.show_grid else []
+
+        while len(self._grid_lines) > len(lines):
+            self.canvas.delete(self._grid_lines.pop())
+        created = False
+        while len(self._grid_lines) < len(lines):
+            self._grid_lines.append(self.canvas.create_line(0, 0, 0, 0, fill=GRID_COLOR, tags="grid_line"))
+            created = True
+        for item, points in zip(self._grid_lines, lines):
+            self.canvas.coords(item, *points)
+        if created:
+            self.canvas.tag_lower("grid_line", self._blocked_layer["item"])
+
+    def _rebuild_blocked_layer(self, cells):
+        """Render blocked markers for the visible cells into one overlay image"""
+        layer = self._blocked_layer
+        x0, y0, x1, y1 = cells
+        size = self.tile_size
+        if not self.show_blocked or size < 16 or x1 <= x0 or y1 <= y0:
+            self.canvas.itemconfigure(layer["item"], state=tk.HIDDEN)
+            layer["pil_image"] = None
+            return
+
+        overlay = Image.new("RGBA", ((x1 - x0) * size, (y1 - y0) * size), (0, 0, 0, 0))
+        scene = self.area_scene()
+        glyph = scene.blocked_glyph()
+        for y in range(y0, y1):
+            for x in range(x0, x1):
+                if scene.is_marked_blocked(x, y):
+                    overlay.paste(glyph, ((x - x0) * size, (y - y0) * size))
+        layer["pil_image"] = overlay
+        layer["origin"] = (x0, y0)
+        layer["photo"] = ImageTk.PhotoImage(overlay)
+        self.canvas.coords(layer["item"], x0 * size, y0 * size)
+        self.canvas.itemconfigure(layer["item"], image=layer["photo"], state=tk.NORMAL)
+
+    def _patch_blocked_layer(self, cells):
+        layer = self._blocked_layer
+        if layer["pil_image"] is None:
+            return
+        size = self.tile_size
+        x0, y0 = layer["origin"]
+        width, height = layer["pil_image"].size
+        scene = self.area_scene()
+        changed = False
+        for x, y in cells:
+            px, py = (x - x0) * size, (y - y0) * size
+            if not (0 <= px < width and 0 <= py < height):
+                continue
+            if scene.is_marked_blocked(x, y):
+                layer["pil_image"].paste(scene.blocked_glyph(), (px, py))
+            else:
+                layer["pil_image"].paste((0, 0, 0, 0), (px, py, px + size, py + size))
+            changed = True
+        if changed:
+            layer["photo"].paste(layer["pil_image"])
+
+    def set_composite_tiles(self, enabled):
+        """Switch between per-tile canvas items and composited chunk images"""
+        self.composite_tiles = enabled
+        self.draw_area()
+
+    def _update_tile_chunks(self, cells):
+        """Create chunk images covering the given cell range and drop the rest"""
+        x0, y0, x1, y1 = cells
+        wanted = {(cx, cy)
+                  for cy in range(y0 // CHUNK_CELLS, (y1 - 1) // CHUNK_CELLS + 1)
+                  for cx in range(x0 // CHUNK_CELLS, (x1 - 1) // CHUNK_CELLS + 1)} if x1 > x0 and y1 > y0 else set()
+        for key in [key for key in self._tile_chunks if key not in wanted]:
+            self.canvas.delete(self._tile_chunks.pop(key)["item"])
+        for cx, cy in wanted - set(self._tile_chunks):
+            self._create_tile_chunk(cx, cy)
+
+    def _create_tile_chunk(self, cx, cy):
+        size = self.tile_size
+        x0, y0 = cx * CHUNK_CELLS, cy * CHUNK_CELLS
+        cols = min(CHUNK_CELLS, self.current_area.width - x0)
+        rows = min(CHUNK_CELLS, self.current_area.height - y0)
+        chunk = {"pil_image": Image.new("RGB", (cols * size, rows * size), "white")}
+        for y in range(y0, y0 + rows):
+            for x in range(x0, x0 + cols):
+                self._paint_chunk_cell(chunk["pil_image"], x - x0, y - y0, x, y)
+        chunk["photo"] = ImageTk.PhotoImage(chunk["pil_image"])
+        chunk["item"] = self.canvas.create_image(x0 * size, y0 * size, image=chunk["photo"], anchor=tk.NW)
+        self.canvas.tag_lower(chunk["item"])
+        self._tile_chunks[(cx, cy)] = chunk
+
+    def _paint_chunk_cell(self, pil_image, col, row, x, y):
+        """Paint the composited tiles of cell (x, y) into a chunk image at the given cell offset"""
+        scene = self.area_scene()
+        size = self.tile_size
+        pil_image.paste(scene.composite_image(scene.tile_stack(x, y)), (col * size, row * size))
+
+    def _patch_tile_chunks(self, cells):
+        """Repaint edited cells inside their chunk images and re-upload each chunk once"""
+        dirty = set()
+        for x, y in cells:
+            chunk = self._tile_chunks.get((x // CHUNK_CELLS, y // CHUNK_CELLS))
+            if chunk is None or not (0 <= x < self.current_area.width and 0 <= y < self.current_area.height):
+                continue
+            self._paint_chunk_cell(chunk["pil_image"], x % CHUNK_CELLS, y % CHUNK_CELLS, x, y)
+            dirty.add((x // CHUNK_CELLS, y // CHUNK_CELLS))
+        for key in dirty:
+            chunk = self._tile_chunks[key]
+            chunk["photo"].paste(chunk["pil_image"])
+
+    def _move_cell_items(self, items, x1, y1):
+        """Reposition a recycled item set at a new cell"""
+        size = self.tile_size
+        if items.get("tile_kind") in ("image", "stack"):
+            self.canvas.coords(items["tile"], x1, y1)
+        elif "tile" in items:
+            self.canvas.coords(items["tile"], x1, y1, x1 + size, y1 + size)
+
+    def update_cursor_display(self):
+        x1, y1 = self.cursor_x * self.tile_size, self.cursor_y * self.tile_size
+        x2, y2 = x1 + self.tile_size, y1 + self.tile_size
+        if getattr(self, '_cursor_item', None) is None:
+            self._cursor_item = self.canvas.create_rectangle(
+                x1, y1, x2, y2, outline="red", width=3 if self.tile_size >= 16 else 1, tags="cursor")
+        else:
+            self.canvas.coords(self._cursor_item, x1, y1, x2, y2)
+            self.canvas.tag_raise(self._cursor_item)
+        self._update_anchor_display()
+        self.cursor_label.config(text=f"Cursor: ({self.cursor_x}, {self.cursor_y})")
+
+    def _update_anchor_display(self):
+        """Outline the rectangle between the selection anchor and the cursor"""
+        anchor = getattr(self, 'selection_anchor', None)
+        if anchor is None:
+            if getattr(self, '_anchor_item', None) is not None:
+                self.canvas.itemconfigure(self._anchor_item, state=tk.HIDDEN)
+            return
+        size = self.tile_size
+        left, right = sorted((anchor[0], self.cursor_x))
+        top, bottom = sorted((anchor[1], self.cursor_y))
+        box = (left * size, top * size, (right + 1) * size, (bottom + 1) * size)
+        if getattr(self, '_anchor_item', None) is None:
+            self._anchor_item = self.canvas.create_rectangle(*box, outline="blue", width=2,
+                                                             dash=(4, 2), tags="cursor")
+        else:
+            self.canvas.coords(self._anchor_item, *box)
+            self.canvas.itemconfigure(self._anchor_item, state=tk.NORMAL)
+        self.canvas.tag_raise(self._anchor_item)
@@ -0,0 +1,254 @@
+"""
+Backend-independent area scene drawing for the Tinker RPG Editor
+
+Run as a script to render an area file to a PNG without a display:
+    python area_scene.py areas/town.json town.png --tile-size 16
+"""
+
+import sys
+import json
+import time
+import argparse
+from functools import lru_cache
+from PIL import Image, ImageDraw
+
+from render_target import ImageTarget
+
+NPC_COLORS = {"guard": "#4169E1", "merchant": "#FFD700", "villager": "#90EE90",
+              "wizard": "#9370DB", "knight": "#C0C0C0", "enemy": "#DC143C", "boss": "#8B0000"}
+OBJECT_COLORS = {"item": "#32CD32", "lever": "#FF4500", "fountain": "#00CED1",
+                 "chest": "#8B4513", "barrel": "#654321", "table": "#DEB887"}
+TRIGGER_COLORS = {
+    "teleport": "#0066CC",      # Blue
+    "inventory": "#009900",     # Green
+    "tile_update": "#FFCC00",   # Yellow
+    "area_object": "#FF6600",   # Orange
+    "game_end": "#9900CC",      # Purple
+    "show_dialog": "#00CCCC",   # Cyan
+    "custom": "#CC0000"         # Red
+}
+GRID_COLOR = "#BEBEBE"  # Tk's "gray"; Pillow reads that name as #808080
+COMPOSITE_CACHE_SIZE = 512  # Composited tile stacks kept per scene
+
+def tile_is_blocked(area, tile_manager, x, y):
+    """True when the tile or anything standing on it blocks movement"""
+    tile = area.tiles[y][x]
+    if not tile.is_walkable(tile_manager):
+        return True
+
+    objects_here = area.objects_at(x, y)
+
+    # Check if any object on this tile blocks movement
+    for obj in objects_here:
+        if obj.properties.get("walkable", True) is False:
+            return True
+
+    # Check if any NPC blocks movement
+    for obj in objects_here:
+        if obj.type in tile_manager.npcs and obj.properties.get("walkable", False) is False:
+            return True
+
+    return False
+
+@lru_cache(maxsize=None)
+def blocked_glyph(size):
+    """Red cross marker for one cell of size x size pixels"""
+    glyph = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(glyph)
+    lo, hi = size * 5 // 16, size * 11 // 16
+    width = max(2, size // 12)
+    draw.line((lo, lo, hi, hi), fill=(255, 0, 0, 255), width=width)
+    draw.line((lo, hi, hi, lo), fill=(255, 0, 0, 255), width=width)
+    return glyph
+
+class AreaScene:
+    """Describes how each cell of an area looks, independent of where it is drawn.
+
+    Every draw_* method takes a render target (CanvasTarget or ImageTarget)
+    and returns whatever the target returned for the primitives it drew.
+    """
+
+    def __init__(self, area, tile_manager, tile_size, trigger_colors=TRIGGER_COLORS):
+        self.area = area
+        self.tile_manager = tile_manager
+        self.tile_size = tile_size
+        self.trigger_colors = trigger_colors
+        self._composites = {}  # Tile type stack -> composited Pillow image
+
+    def tile_info(self, x, y):
+        return self.tile_manager.get_tile_info(self.area.tiles[y][x].type)
+
+    def tile_stack(self, x, y):
+        """Tile types drawn at a cell, bottom first, from the visible layers"""
+        layers = self.area.layers
+        stack = (self.area.tiles[y][x].type,) if layers[0].visible else ()
+        for layer in layers[1:]:
+            if layer.visible:
+                tile = layer.cells.get((x, y))
+                if tile is not None:
+                    stack += (tile.type,)
+        return stack
+
+    def tile_kind(self, x, y):
+        """"image" or "rect" for a lone ground tile, "stack" when layers have to be composited"""
+        layers = self.area.layers
+        if len(layers) > 1 or not layers[0].visible:
+            stack = self.tile_stack(x, y)
+            if not layers[0].visible or len(stack) > 1:
+                return "stack"
+        return "image" if "sprite" in self.tile_info(x, y) else "rect"
+
+    def composite_image(self, stack):
+        """One tile-sized image of a stack of tile types, built once per distinct stack"""
+        image = self._composites.get(stack)
+        if image is None:
+            size = self.tile_size
+            image = Image.new("RGB", (size, size), "white")
+            for tile_type in stack:
+                sprite = self.tile_manager.get_pil_image(self.tile_manager.get_tile_info(tile_type), size)
+                if sprite is None:
+                    image.paste((211, 211, 211), (0, 0, size, size))  # lightgray placeholder
+                elif sprite.mode in ("RGBA", "LA", "P"):
+                    sprite = sprite.convert("RGBA")
+                    image.paste(sprite, (0, 0), sprite)
+                else:
+                    image.paste(sprite.convert("RGB"), (0, 0))
+            if len(self._composites) >= COMPOSITE_CACHE_SIZE:
+                del self._composites[next(iter(self._composites))]
+            self._composites[stack] = image
+        return image
+
+    def draw_tile(self, target, x, y):
+        size = self.tile_size
+        x1, y1 = x * size, y * size
+        if self.tile_kind(x, y) == "stack":
+            stack = self.tile_stack(x, y)
+            return target.composite(x1, y1, stack, self.composite_image(stack))
+        info = self.tile_info(x, y)
+        if "sprite" in info:
+            return target.sprite(x1, y1, info, size)
+        return target.rectangle(x1, y1, x1 + size, y1 + size, fill="lightgray", outline="black")
+
+    def draw_objects(self, target, x, y):
+        created = []
+        size = self.tile_size
+        inset = max(1, size // 8)
+        x1, y1 = x * size, y * size
+        x2, y2 = x1 + size, y1 + size
+
+        for obj in self.area.objects_at(x, y):
+            npc_info = self.tile_manager.get_npc_info(obj.type)
+            obj_info = self.tile_manager.get_object_info(obj.type)
+
+            if "sprite" in npc_info:
+                created.append(target.sprite(x1, y1, npc_info, size))
+            elif "sprite" in obj_info:
+                created.append(target.sprite(x1, y1, obj_info, size))
+            elif obj.type in NPC_COLORS:
+                created.append(target.oval(x1 + inset, y1 + inset, x2 - inset, y2 - inset,
+                                           fill=NPC_COLORS[obj.type], outline="black", width=2))
+                if size >= 16:
+                    created.append(target.text(x1 + size // 2, y1 + size // 2, "N", fill="white", size=size // 4))
+            else:
+                color = OBJECT_COLORS.get(obj.type, "#32CD32")
+                created.append(target.rectangle(x1 + inset, y1 + inset, x2 - inset, y2 - inset,
+                                                fill=color, outline="black", width=2))
+        return created
+
+    def draw_triggers(self, target, x, y):
+        triggers = self.area.triggers_at(x, y)
+        if not triggers:
+            return []
+
+        size = self.tile_size
+        inset = max(1, size // 8)
+        x1, y1 = x * size, y * size
+        x2, y2 = x1 + size, y1 + size
+        center_x, center_y = (x1 + x2) / 2, (y1 + y2) / 2
+        points = (center_x, y1 + inset, x2 - inset, center_y, center_x, y2 - inset, x1 + inset, center_y)
+
+        if len(triggers) == 1:
+            # Single trigger - use type color
+            color = self.trigger_colors.get(triggers[0].trigger_type, "#CC0000")
+            return [target.polygon(points, fill=color, outline="black", width=2)]
+
+        # Multiple triggers - dark gray with white number
+        created = [target.polygon(points, fill="#444444", outline="black", width=2)]
+        if size >= 16:
+            created.append(target.text(center_x, center_y, str(len(triggers)), fill="white", size=size * 5 // 16))
+        return created
+
+    def grid_lines(self, cells):
+        """Line coordinates for the row and column boundaries of a cell range"""
+        x0, y0, x1, y1 = cells
+        size = self.tile_size
+        if size < 16 or x1 <= x0 or y1 <= y0:
+            return []
+        return ([(x * size, y0 * size, x * size, y1 * size) for x in range(x0, x1 + 1)] +
+                [(x0 * size, y * size, x1 * size, y * size) for y in range(y0, y1 + 1)])
+
+    def is_marked_blocked(self, x, y):
+        """Whether the cell gets a blocked marker; empty cells never do"""
+        return (self.area.tiles[y][x].type != "empty" and
+                tile_is_blocked(self.area, self.tile_manager, x, y))
+
+    def blocked_glyph(self):
+        return blocked_glyph(self.tile_size)
+
+def render_area(area, tile_manager, tile_size=32, trigger_colors=TRIGGER_COLORS,
+                show_grid=True, show_blocked=True, cells=None):
+    """Render an area, or the (x0, y0, x1, y1) cell range of it, to a Pillow image.
+
+    Layers are stacked as in the editor canvas: tiles, grid, blocked
+    markers, then objects and triggers.
+    """
+    scene = AreaScene(area, tile_manager, tile_size, trigger_colors)
+    x0, y0, x1, y1 = cells or (0, 0, area.width, area.height)
+    target = ImageTarget(tile_manager, (x1 - x0) * tile_size, (y1 - y0) * tile_size,
+                         origin=(x0 * tile_size, y0 * tile_size))
+    cell_range = [(x, y) for y in range(y0, y1) for x in range(x0, x1)]
+
+    for x, y in cell_range:
+        scene.draw_tile(target, x, y)
+    if show_grid:
+        for line in scene.grid_lines((x0, y0, x1, y1)):
+            target.line(*line, fill=GRID_COLOR)
+    if show_blocked and tile_size >= 16:
+        for x, y in cell_range:
+            if scene.is_marked_blocked(x, y):
+                target.paste(x * tile_size, y * tile_size, scene.blocked_glyph())
+    for x, y in cell_range:
+        scene.draw_objects(target, x, y)
+        scene.draw_triggers(target, x, y)
+    return target.image
+
+def main(argv=None):
+    from data_classes import Area
+    from tile_manager import TileManager
+
+    parser = argparse.ArgumentParser(description="Render an area file to a PNG without a display")
+    parser.add_argument("area_file")
+    parser.add_argument("output")
+    parser.add_argument("--tile-size", type=int, default=32)
+    parser.add_argument("--no-grid", action="store_true")
+    parser.add_argument("--no-blocked", action="store_true")
+    parser.add_argument("--repeat", type=int, default=1, help="render this many times and report timings")
+    args = parser.parse_args(argv)
+
+    with open(args.area_file, 'r') as f:
+        area = Area.from_dict(json.load(f))
+    tile_manager = TileManager()
+
+    timings = []
+    for _ in range(max(1, args.repeat)):
+        start = time.perf_counter()
+        image = render_area(area, tile_manager, args.tile_size,
+                            show_grid=not args.no_grid, show_blocked=not args.no_blocked)
+        timings.append(time.perf_counter() - start)
+    image.save(args.output)
+    print(f"Rendered {area.width}x{area.height} area to {args.output}: "
+          f"best {min(timings) * 1000:.1f} ms, mean {sum(timings) / len(timings) * 1000:.1f} ms "
+          f"over {len(timings)} run(s)")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
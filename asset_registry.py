@@ -0,0 +1,140 @@
+"""
+Pluggable asset registry with background loading for the Tinker RPG Editor
+"""
+
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class AssetRegistry:
+    """Loads every registered asset kind on a shared worker pool.
+
+    Each kind supplies a directory, the file extensions it owns and two
+    callables: load(path) does the expensive work (decoding, compiling) on a
+    worker thread, commit(name, path, loaded) stores the result and always
+    runs on the thread that polls the load job.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or min(8, (os.cpu_count() or 1) + 2)
+        self.kinds = {}  # kind -> {"directory", "extensions", "load", "commit"}
+        self.assets = {}  # kind -> {asset name: info}
+
+    def register_kind(self, kind, directory, extensions, load, commit):
+        self.kinds[kind] = {
+            "directory": directory,
+            "extensions": tuple(ext.lower() for ext in extensions),
+            "load": load,
+            "commit": commit
+        }
+        return self.assets.setdefault(kind, {})
+
+    def load_async(self, progress=None):
+        """Start loading every kind on a background thread and return the job"""
+        job = AssetLoadJob(self, progress)
+        job.start()
+        return job
+
+    def load(self, progress=None):
+        """Load every kind and block until finished"""
+        job = self.load_async(progress)
+        job.wait()
+        return job
+
+    def scan_kind(self, kind):
+        """List the files belonging to one kind as (kind, name, path) tuples"""
+        spec = self.kinds[kind]
+        found = []
+        try:
+            with os.scandir(spec["directory"]) as entries:
+                for entry in entries:
+                    name, ext = os.path.splitext(entry.name)
+                    if ext.lower() in spec["extensions"] and entry.is_file():
+                        found.append((kind, name, entry.path))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            # e.g. the directory is a file or unreadable; the other kinds still load
+            print(f"Error scanning {spec['directory']}: {e}")
+        found.sort()
+        return found
+
+class AssetLoadJob:
+    """A running asset load; call poll() from the UI thread to commit results"""
+
+    def __init__(self, registry, progress=None):
+        self.registry = registry
+        self.progress = progress  # called as progress(done, total, kind, name)
+        self.done = 0
+        self.total = None
+        self.finished = False
+        self.errors = []
+        self._results = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        try:
+            with ThreadPoolExecutor(max_workers=self.registry.max_workers) as pool:
+                # Directory scans run concurrently, so extra kinds don't add serial startup work
+                listings = list(pool.map(self.registry.scan_kind, list(self.registry.kinds)))
+                jobs = [job for listing in listings for job in listing]
+                self._results.put(("total", len(jobs)))
+                for job in jobs:
+                    pool.submit(self._load_one, *job)
+        except Exception as e:
+            self._results.put(("failed", e))
+        finally:
+            # Always sent, so wait() and the UI poll loop can't hang on a failed job
+            self._results.put(("finished",))
+
+    def _load_one(self, kind, name, path):
+        try:
+            loaded = self.registry.kinds[kind]["load"](path)
+            self._results.put(("loaded", kind, name, path, loaded))
+        except Exception as e:
+            self._results.put(("error", kind, name, path, e))
+
+    def poll(self, limit=None):
+        """Commit pending results without blocking; returns True once finished"""
+        handled = 0
+        while not self.finished and (limit is None or handled < limit):
+            try:
+                event = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._handle(event)
+            handled += 1
+        return self.finished
+
+    def wait(self):
+        while not self.finished:
+            self._handle(self._results.get())
+
+    def _handle(self, event):
+        if event[0] == "total":
+            self.total = event[1]
+            return
+        if event[0] == "finished":
+            self.finished = True
+            return
+        if event[0] == "failed":
+            print(f"Error loading assets: {event[1]}")
+            self.errors.append(f"asset loading: {event[1]}")
+            return
+
+        status, kind, name, path, payload = event
+        if status == "loaded":
+            try:
+                self.registry.kinds[kind]["commit"](name, path, payload)
+            except Exception as e:
+                status, payload = "error", e
+        if status == "error":
+            print(f"Error loading {path}: {payload}")
+            self.errors.append(f"{path}: {payload}")
+        self.done += 1
+        if self.progress:
+            self.progress(self.done, self.total, kind, name)
@@ -0,0 +1,47 @@
+"""
+Asset name search index for the Tinker RPG Editor toolbox
+"""
+
+from bisect import bisect_left
+
+class AssetSearchIndex:
+    """Prefix index over the words of asset names and categories.
+
+    Every search term must match the start of some word of an asset
+    ("brick" finds "gray_brick_wall"); terms that match no word prefix fall
+    back to a substring scan, so "rick" still finds it.
+    """
+
+    def __init__(self, entries):
+        # entries: iterable of (name, [keywords]) in display order
+        self.names = []
+        self._texts = []
+        words = []
+        for i, (name, keywords) in enumerate(entries):
+            text = " ".join([name] + list(keywords)).lower().replace("_", " ")
+            self.names.append(name)
+            self._texts.append(text)
+            words.extend((word, i) for word in set(text.split()))
+        words.sort()
+        self._word_keys = [word for word, _ in words]
+        self._word_owners = [i for _, i in words]
+
+    def search(self, query):
+        """Return the names matching every term of query, in display order"""
+        terms = query.lower().replace("_", " ").split()
+        if not terms:
+            return list(self.names)
+
+        matches = None
+        for term in terms:
+            hits = set()
+            i = bisect_left(self._word_keys, term)
+            while i < len(self._word_keys) and self._word_keys[i].startswith(term):
+                hits.add(self._word_owners[i])
+                i += 1
+            if not hits:
+                hits = {i for i, text in enumerate(self._texts) if term in text}
+            matches = hits if matches is None else matches & hits
+            if not matches:
+                return []
+        return [self.names[i] for i in sorted(matches)]
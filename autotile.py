@@ -0,0 +1,167 @@
+"""
+Bitmask auto-tiling for the Tinker RPG Editor
+
+A cell's neighbour mask has one bit per neighbour of the same tile family:
+N=1, NE=2, E=4, SE=8, S=16, SW=32, W=64, NW=128. The variant for mask m of
+a base tile is the tile asset named "<base>_<m>", e.g. gray_brick_wall_84
+for a wall with walls to the east, south and west. Masks are reduced
+before lookup: with 4 neighbours the corner bits are dropped, with 8 a
+corner only counts when both edges next to it are set (the usual 47-tile
+blob set). Variants without an asset fall back to the 4-neighbour variant
+and then to the base tile.
+"""
+
+from dataclasses import replace
+from itertools import repeat
+from operator import eq, mul, or_
+
+from undo_history import TileOp
+
+N, NE, E, SE, S, SW, W, NW = (1 << bit for bit in range(8))
+EDGES = N | E | S | W
+NEIGHBOURS = ((0, -1, N), (1, -1, NE), (1, 0, E), (1, 1, SE),
+              (0, 1, S), (-1, 1, SW), (-1, 0, W), (-1, -1, NW))
+AUTOTILE_CATEGORIES = ("wall",)
+
+def _reduce_corners(mask):
+    for corner, first, second in ((NE, N, E), (SE, S, E), (SW, S, W), (NW, N, W)):
+        if mask & corner and not (mask & first and mask & second):
+            mask &= ~corner
+    return mask
+
+# Raw 8-bit mask -> reduced mask, for each neighbourhood
+REDUCED_MASKS = {
+    4: bytes(mask & EDGES for mask in range(256)),
+    8: bytes(_reduce_corners(mask) for mask in range(256))
+}
+
+def variant_name(base, mask):
+    return f"{base}_{mask}"
+
+class AutoTiler:
+    """Picks tile variants from neighbour masks using per-family lookup tables.
+
+    Tables map all 256 raw masks straight to a Tile, so retiling a cell is
+    eight neighbour checks and one index. They are built on first use and
+    dropped by clear() when the tile assets change.
+    """
+
+    def __init__(self, tile_manager):
+        self.tile_manager = tile_manager
+        self._tables = {}  # (base, neighbours) -> tuple of 256 Tiles
+        self._families = {}  # tile type -> base name
+
+    def clear(self):
+        self._tables.clear()
+        self._families.clear()
+
+    def family(self, tile_type):
+        """Base tile of a variant name, or the name itself"""
+        base = self._families.get(tile_type)
+        if base is None:
+            base = tile_type
+            prefix, _, suffix = tile_type.rpartition("_")
+            if suffix.isdigit() and int(suffix) < 256 and prefix in self.tile_manager.tiles:
+                base = prefix
+            self._families[tile_type] = base
+        return base
+
+    def is_autotiled(self, base):
+        return self.tile_manager.tiles.get(base, {}).get("category") in AUTOTILE_CATEGORIES
+
+    def table(self, base, neighbours=8):
+        key = (base, neighbours)
+        table = self._tables.get(key)
+        if table is None:
+            from data_classes import Tile
+            tiles = self.tile_manager.tiles
+            names = []
+            for mask in range(256):
+                name = variant_name(base, REDUCED_MASKS[neighbours][mask])
+                if name not in tiles:
+                    name = variant_name(base, REDUCED_MASKS[4][mask])
+                names.append(name if name in tiles else base)
+            variants = {name: Tile(type=name) for name in set(names)}  # One shared Tile per variant
+            table = self._tables[key] = tuple(variants[name] for name in names)
+        return table
+
+    def retile(self, op, neighbours=8, cells=()):
+        """Extend a TileOp so its cells, the given cells and all their neighbours show matching variants.
+
+        The op's changes are applied virtually first, so the result is a
+        single TileOp going straight from the current tiles to the final
+        ones. Work is done over row runs of affected cells, so a bulk fill
+        costs about as much as the fill itself, however large the area.
+        """
+        area = op.area
+        width, height = area.width, area.height
+        painted_rows = {}  # y -> {x: new tile}
+        for x, y, _, new in op.changes:
+            painted_rows.setdefault(y, {})[x] = new
+        source_rows = {y: list(row) for y, row in painted_rows.items()}
+        for x, y in cells:
+            source_rows.setdefault(y, []).append(x)
+
+        # Affected cells as merged (start, end) runs per row: the sources widened by one in every direction
+        target_runs = {}
+        for y, xs in source_rows.items():
+            for start, end in _merge_runs((x, x) for x in xs):
+                for target_y in range(max(0, y - 1), min(height, y + 2)):
+                    target_runs.setdefault(target_y, []).append((max(0, start - 1), min(width - 1, end + 1)))
+        families = self._families
+        area_tiles = area.tiles
+
+        def read_row(y, lo, hi):
+            """Tiles after the op and their families for x = lo .. hi; None outside the area"""
+            if not 0 <= y < height:
+                return None, [None] * (hi - lo + 1)
+            first = max(0, lo)
+            tiles = area_tiles[y][first:hi + 1]
+            painted = painted_rows.get(y)
+            if painted:
+                tiles = list(map(painted.get, range(first, first + len(tiles)), tiles))
+            row_families = [families[tile.type] if tile.type in families else self.family(tile.type)
+                            for tile in tiles]
+            return tiles, [None] * (first - lo) + row_families + [None] * max(0, hi + 1 - width)
+
+        tables = {}  # base -> lookup table, or None when the family isn't auto-tiled
+        changes = []
+        for y in sorted(target_runs):
+            area_row = area_tiles[y]
+            for start, end in _merge_runs(target_runs[y]):
+                # Families of x = start - 1 .. end + 1
+                _, up = read_row(y - 1, start - 1, end + 1)
+                tiles, row = read_row(y, start - 1, end + 1)
+                _, down = read_row(y + 1, start - 1, end + 1)
+                center = row[1:-1]
+                # Neighbour masks for the whole run, built with C-level maps instead of per-cell code
+                masks = [0] * len(center)
+                for neighbour, bit in ((up[1:-1], N), (up[2:], NE), (row[2:], E), (down[2:], SE),
+                                       (down[1:-1], S), (down[:-2], SW), (row[:-2], W), (up[:-2], NW)):
+                    masks = list(map(or_, masks, map(mul, map(eq, neighbour, center), repeat(bit))))
+                offset = start - max(0, start - 1)
+                for x, base, mask, tile in zip(range(start, end + 1), center, masks, tiles[offset:]):
+                    if base not in tables:
+                        tables[base] = self.table(base, neighbours) if self.is_autotiled(base) else None
+                    table = tables[base]
+                    if table is not None:
+                        variant = table[mask]
+                        if variant.type != tile.type:
+                            # Overrides and properties stay with the cell
+                            plain = tile.walkable_override is None and not tile.properties
+                            tile = variant if plain else replace(tile, type=variant.type)
+                    old = area_row[x]
+                    if tile is not old:
+                        changes.append((x, y, old, tile))
+        return TileOp(area, changes)
+
+def _merge_runs(runs):
+    """Sort (start, end) runs and merge the ones that overlap or touch"""
+    merged = []
+    for start, end in sorted(runs):
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
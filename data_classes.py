@@ -2,8 +2,11 @@
 Updated data_classes.py with enhanced trigger system
 """
 
-from dataclasses import dataclass, asdict
-from typing import Dict, List, Optional, Any
+import weakref
+from array import array
+from copy import deepcopy
+from dataclasses import dataclass, asdict, replace
+from typing import Dict, List, Optional, Any, Tuple
 
 @dataclass
 class Tile:
@@ -21,6 +24,45 @@ class Tile:
             return self.walkable_override
         return tile_manager.get_default_walkable(self.type)
 
+EMPTY_TILE = Tile()  # Stands in for the cells an upper layer doesn't store
+
+@dataclass
+class TileLayer:
+    """A named tile layer; an area draws its layers bottom to top.
+    
+    The ground layer (Area.layers[0]) keeps its tiles in the dense Area.tiles
+    grid. Upper layers store only their non-empty cells, keyed by (x, y).
+    """
+    name: str = "Layer"
+    visible: bool = True
+    locked: bool = False
+    cells: Dict[Tuple[int, int], Tile] = None
+    
+    def __post_init__(self):
+        if self.cells is None:
+            self.cells = {}
+    
+    def to_dict(self):
+        """Compact saved form: distinct tiles once in a palette, cells as a flat [x, y, index, ...] list"""
+        palette, indexes, flat = [], {}, []
+        for (x, y), tile in sorted(self.cells.items(), key=lambda item: (item[0][1], item[0][0])):
+            key = (tile.type, tile.walkable_override) if not tile.properties else id(tile)
+            index = indexes.get(key)
+            if index is None:
+                index = indexes[key] = len(palette)
+                palette.append(asdict(tile))
+            flat += (x, y, index)
+        return {"name": self.name, "visible": self.visible, "locked": self.locked,
+                "palette": palette, "cells": flat}
+    
+    @classmethod
+    def from_dict(cls, layer_dict):
+        palette = [Tile(**tile) for tile in layer_dict.get("palette", [])]
+        flat = layer_dict.get("cells", [])
+        return cls(name=layer_dict.get("name", "Layer"), visible=layer_dict.get("visible", True),
+                   locked=layer_dict.get("locked", False),
+                   cells={(flat[i], flat[i + 1]): palette[flat[i + 2]] for i in range(0, len(flat), 3)})
+
 @dataclass
 class GameObject:
     """Represents NPCs, items, or interactive objects"""
@@ -33,6 +75,232 @@ class GameObject:
         if self.properties is None:
             self.properties = {}
 
+def _column(index):
+    def get(self):
+        if self._store is None:
+            return self._values[index]
+        return self._store._get(self._handle, index)
+    
+    def set(self, value):
+        if self._store is None:
+            self._values[index] = value
+        else:
+            self._store._set(self._handle, index, value)
+    return property(get, set)
+
+class ObjectView(GameObject):
+    """A GameObject backed by one row of an ObjectStore.
+    
+    Reading and assigning type, x, y or properties goes straight to the
+    store's columns, so code that edits objects in place keeps working. Once
+    its row is removed the view holds on to its last values, so it can be
+    added back, e.g. by undo.
+    """
+    type = _column(0)
+    x = _column(1)
+    y = _column(2)
+    properties = _column(3)
+    
+    def __init__(self, type="npc", x=0, y=0, properties=None):
+        self._store = None
+        self._handle = None
+        self._values = [type, x, y, {} if properties is None else properties]
+    
+    def __eq__(self, other):
+        if not isinstance(other, GameObject):
+            return NotImplemented
+        return (self.type, self.x, self.y, self.properties) == (other.type, other.x, other.y, other.properties)
+    
+    __hash__ = None
+    
+    def _detach(self, values):
+        self._store = None
+        self._handle = None
+        self._values = values
+
+class ObjectStore:
+    """Column-oriented storage for the objects of an area.
+    
+    Each object is one row across parallel int arrays: an interned type id,
+    x and y. Properties are kept only for the objects that have any, or
+    whose properties dict has been handed out, and are copied on the way in
+    so a store never shares them with another store or a stamp. A
+    removed row is filled with the last row, so adds and removes are O(1)
+    amortized, and a per-cell list of rows makes at() independent of the
+    object count.
+    
+    Rows are handed out as ObjectView objects that write through to the
+    columns. Each object has a stable handle that survives rows moving, so
+    the same view stays valid, and is returned again while it is referenced.
+    """
+    
+    def __init__(self, objects=()):
+        self.type_names = []  # type id -> type name
+        self._type_ids = {}  # type name -> type id
+        self.types = array('i')
+        self.xs = array('i')
+        self.ys = array('i')
+        self.handles = array('i')  # row -> handle
+        self._rows = {}  # handle -> row
+        self._next_handle = 0
+        self.properties = {}  # handle -> properties dict, for rows that have or handed one out
+        self._cells = {}  # (x, y) -> rows there, in the order they were added
+        self._views = weakref.WeakValueDictionary()  # handle -> ObjectView
+        for obj in objects:
+            if isinstance(obj, dict):
+                self.add(obj.get("type", "npc"), obj.get("x", 0), obj.get("y", 0), obj.get("properties"))
+            else:
+                self.append(obj)
+    
+    def type_id(self, type_name):
+        type_id = self._type_ids.get(type_name)
+        if type_id is None:
+            type_id = self._type_ids[type_name] = len(self.type_names)
+            self.type_names.append(type_name)
+        return type_id
+    
+    def __len__(self):
+        return len(self.types)
+    
+    def __iter__(self):
+        for row in range(len(self.types)):
+            yield self.view(row)
+    
+    def __getitem__(self, row):
+        if row < 0:
+            row += len(self.types)
+        if not 0 <= row < len(self.types):
+            raise IndexError("object row out of range")
+        return self.view(row)
+    
+    def records(self):
+        """(type, x, y, properties) of every row, without creating views"""
+        names, properties = self.type_names, self.properties
+        return [(names[type_id], x, y, properties.get(handle, {}))
+                for type_id, x, y, handle in zip(self.types, self.xs, self.ys, self.handles)]
+    
+    def __eq__(self, other):
+        if isinstance(other, ObjectStore):
+            return self.records() == other.records()
+        if isinstance(other, (list, tuple)):
+            return self.records() == [(obj.type, obj.x, obj.y, obj.properties or {}) for obj in other]
+        return NotImplemented
+    
+    __hash__ = None
+    
+    def view(self, row):
+        handle = self.handles[row]
+        view = self._views.get(handle)
+        if view is None:
+            view = ObjectView.__new__(ObjectView)
+            view._store, view._handle, view._values = self, handle, None
+            self._views[handle] = view
+        return view
+    
+    def _get(self, handle, index):
+        if index == 3:
+            # Handing out the dict attaches it, so every way of mutating it reaches the store
+            properties = self.properties.get(handle)
+            if properties is None:
+                properties = self.properties[handle] = {}
+            return properties
+        row = self._rows[handle]
+        if index == 0:
+            return self.type_names[self.types[row]]
+        return (self.xs if index == 1 else self.ys)[row]
+    
+    def _set(self, handle, index, value):
+        row = self._rows[handle]
+        if index == 0:
+            self.types[row] = self.type_id(value)
+        elif index == 3:
+            if value:
+                self.properties[handle] = value
+            else:
+                self.properties.pop(handle, None)
+        else:
+            self._unlink_cell(row)
+            (self.xs if index == 1 else self.ys)[row] = value
+            self._cells.setdefault((self.xs[row], self.ys[row]), []).append(row)
+    
+    def add(self, type_name, x, y, properties=None):
+        """Add a row; the store keeps its own deep copy of properties"""
+        row = len(self.types)
+        handle = self._next_handle
+        self._next_handle += 1
+        self.types.append(self.type_id(type_name))
+        self.xs.append(x)
+        self.ys.append(y)
+        self.handles.append(handle)
+        self._rows[handle] = row
+        if properties:
+            self.properties[handle] = deepcopy(properties)
+        self._cells.setdefault((x, y), []).append(row)
+        return row
+    
+    def append(self, obj):
+        """Add a row with the values of obj; a view removed earlier stays detached"""
+        return self.add(obj.type, obj.x, obj.y, obj.properties)
+    
+    def rows_at(self, x, y):
+        return list(self._cells.get((x, y), ()))
+    
+    def at(self, x, y):
+        return [self.view(row) for row in self._cells.get((x, y), ())]
+    
+    def cells(self):
+        """Cells holding at least one object"""
+        return self._cells.keys()
+    
+    def rows_of_type(self, type_name):
+        type_id = self._type_ids.get(type_name)
+        if type_id is None:
+            return []
+        return [row for row, row_type in enumerate(self.types) if row_type == type_id]
+    
+    def _unlink_cell(self, row):
+        cell = (self.xs[row], self.ys[row])
+        rows = self._cells[cell]
+        rows.remove(row)
+        if not rows:
+            del self._cells[cell]
+    
+    def remove_row(self, row):
+        handle = self.handles[row]
+        view = self._views.pop(handle, None)
+        if view is not None:
+            view._detach([self.type_names[self.types[row]], self.xs[row], self.ys[row],
+                          self.properties.get(handle, {})])
+        self._unlink_cell(row)
+        self.properties.pop(handle, None)
+        del self._rows[handle]
+        last = len(self.types) - 1
+        if row != last:
+            # Fill the gap with the last row; it keeps its handle and its place in its cell's list
+            moved = self.handles[last]
+            self.types[row], self.xs[row], self.ys[row] = self.types[last], self.xs[last], self.ys[last]
+            self.handles[row] = moved
+            self._rows[moved] = row
+            rows = self._cells[(self.xs[row], self.ys[row])]
+            rows[rows.index(last)] = row
+        del self.types[last], self.xs[last], self.ys[last], self.handles[last]
+    
+    def remove(self, obj):
+        """Remove the row of a view, or one row equal to obj; returns whether there was one"""
+        if isinstance(obj, ObjectView) and obj._store is self:
+            self.remove_row(self._rows[obj._handle])
+            return True
+        type_id = self._type_ids.get(obj.type)
+        for row in self._cells.get((obj.x, obj.y), ()):
+            if self.types[row] == type_id and self.properties.get(self.handles[row], {}) == (obj.properties or {}):
+                self.remove_row(row)
+                return True
+        return False
+    
+    def to_dicts(self):
+        return [{"type": type_name, "x": x, "y": y, "properties": deepcopy(properties)}
+                for type_name, x, y, properties in self.records()]
+
 @dataclass
 class Trigger:
     """Represents a trigger tile that executes actions"""
@@ -91,16 +359,232 @@ class Area:
     width: int = 20
     height: int = 15
     tiles: List[List[Tile]] = None
-    objects: List[GameObject] = None
+    objects: ObjectStore = None
     triggers: List[Trigger] = None
+    layers: List[TileLayer] = None  # layers[0] is the ground layer, whose tiles are in tiles
     
     def __post_init__(self):
         if self.tiles is None:
-            self.tiles = [[Tile() for _ in range(self.width)] for _ in range(self.height)]
+            empty = Tile()  # Tiles are replaced, never mutated, so blank cells can share one
+            self.tiles = [[empty] * self.width for _ in range(self.height)]
+            self._occupancy = (self.tiles, [0] * self.height, [0] * self.width)
         if self.objects is None:
-            self.objects = []
+            self.objects = ObjectStore()
         if self.triggers is None:
             self.triggers = []
+        if not self.layers:
+            self.layers = [TileLayer(name="Ground")]
+    
+    @classmethod
+    def from_dict(cls, area_dict):
+        """Build an area from its saved JSON form"""
+        area_dict = dict(area_dict)
+        objects = area_dict.pop("objects", ())
+        area = cls(**area_dict)
+        area.objects = ObjectStore(objects)
+        area.tiles = [[Tile(**tile) if isinstance(tile, dict) else tile for tile in row] for row in area.tiles]
+        area.triggers = [Trigger(**trig) for trig in area.triggers]
+        area.layers = [TileLayer.from_dict(layer) if isinstance(layer, dict) else layer for layer in area.layers]
+        return area
+    
+    def to_dict(self):
+        """Saved JSON form; upper layers without any tiles are left out"""
+        tile_dicts = {}  # id(tile) -> dict, so shared tiles are converted once
+        
+        def tile_dict(tile):
+            converted = tile_dicts.get(id(tile))
+            if converted is None:
+                converted = tile_dicts[id(tile)] = asdict(tile)
+            return converted
+        
+        ground = self.layers[0]
+        return {"name": self.name, "width": self.width, "height": self.height,
+                "tiles": [[tile_dict(tile) for tile in row] for row in self.tiles],
+                "objects": self.objects.to_dicts(),
+                "triggers": [asdict(trig) for trig in self.triggers],
+                "layers": [{"name": ground.name, "visible": ground.visible, "locked": ground.locked}] +
+                          [layer.to_dict() for layer in self.layers[1:] if layer.cells]}
+    
+    def layer_tile(self, layer, x, y):
+        """Tile of layer index layer at (x, y); EMPTY_TILE where an upper layer has none"""
+        if layer == 0:
+            return self.tiles[y][x]
+        return self.layers[layer].cells.get((x, y), EMPTY_TILE)
+    
+    def set_layer_tile(self, layer, x, y, tile):
+        if layer == 0:
+            self.set_tile(x, y, tile)
+        elif tile.type == "empty":
+            self.layers[layer].cells.pop((x, y), None)
+        else:
+            self.layers[layer].cells[(x, y)] = tile
+    
+    def layers_window(self, x0, y0, width, height):
+        """Layers with upper-layer cells shifted by (-x0, -y0) and clipped to width x height"""
+        return [self.layers[0]] + [
+            replace(layer, cells={(x - x0, y - y0): tile for (x, y), tile in layer.cells.items()
+                                  if x0 <= x < x0 + width and y0 <= y < y0 + height})
+            for layer in self.layers[1:]]
+    
+    def __setattr__(self, name, value):
+        if name == "objects" and not (value is None or isinstance(value, ObjectStore)):
+            raise TypeError("Area.objects must be an ObjectStore; wrap lists as ObjectStore(objects)")
+        super().__setattr__(name, value)
+        # Replacing the trigger list invalidates its per-cell index; the object store keeps its own
+        if name == "triggers":
+            super().__setattr__("_cell_index", None)
+        elif name == "tiles":
+            # Counts window() took for this grid carry over; any other grid is recounted on demand
+            counted = self.__dict__.pop("_window_occupancy", None)
+            super().__setattr__("_occupancy", counted if counted is not None and counted[0] is value else None)
+    
+    def reindex(self):
+        """Rebuild the per-cell trigger index after triggers were moved in place"""
+        self._cell_index = None
+    
+    def _index(self):
+        if self._cell_index is None:
+            triggers_by_cell = {}
+            for trig in self.triggers:
+                triggers_by_cell.setdefault((trig.x, trig.y), []).append(trig)
+            self._cell_index = triggers_by_cell
+        return self._cell_index
+    
+    def objects_at(self, x, y):
+        return self.objects.at(x, y)
+    
+    def triggers_at(self, x, y):
+        return list(self._index().get((x, y), ()))
+    
+    def objects_in(self, left, top, right, bottom):
+        """Objects inside a rectangle, inclusive; visits its cells when that is cheaper than every object"""
+        store = self.objects
+        if (right - left + 1) * (bottom - top + 1) <= len(store):
+            return [obj for y in range(top, bottom + 1) for x in range(left, right + 1) for obj in store.at(x, y)]
+        return [obj for obj in store if left <= obj.x <= right and top <= obj.y <= bottom]
+    
+    def triggers_in(self, left, top, right, bottom):
+        """Triggers inside a rectangle, inclusive, found the same way as objects_in"""
+        triggers_by_cell = self._index()
+        if (right - left + 1) * (bottom - top + 1) <= len(triggers_by_cell):
+            return [trig for y in range(top, bottom + 1) for x in range(left, right + 1)
+                    for trig in triggers_by_cell.get((x, y), ())]
+        return [trig for trig in self.triggers if left <= trig.x <= right and top <= trig.y <= bottom]
+    
+    def add_object(self, obj):
+        self.objects.append(obj)
+    
+    def remove_object(self, obj):
+        """Remove one object equal to obj"""
+        return self.objects.remove(obj)
+    
+    def remove_objects_at(self, x, y, predicate=None):
+        """Remove objects at (x, y), optionally only those matching predicate"""
+        store = self.objects
+        rows = [row for row in store.rows_at(x, y) if predicate is None or predicate(store[row])]
+        removed = [store[row] for row in rows]
+        # Highest first, so the rows still to remove are never the ones moved into a gap
+        for row in sorted(rows, reverse=True):
+            store.remove_row(row)
+        return removed
+    
+    def add_trigger(self, trigger):
+        triggers_by_cell = self._index()
+        self.triggers.append(trigger)
+        triggers_by_cell.setdefault((trigger.x, trigger.y), []).append(trigger)
+    
+    def remove_trigger(self, trigger):
+        self.triggers.remove(trigger)
+        triggers_by_cell = self._index()
+        here = triggers_by_cell.get((trigger.x, trigger.y), [])
+        here.remove(trigger)
+        if not here:
+            del triggers_by_cell[(trigger.x, trigger.y)]
+    
+    def _counted(self):
+        """The cached (tiles, row_counts, column_counts) if it still describes the current grid"""
+        counted = self._occupancy
+        if (counted is not None and counted[0] is self.tiles
+                and len(counted[1]) == self.height and len(counted[2]) == self.width):
+            return counted
+        return None
+    
+    def occupancy(self):
+        """Per-row and per-column counts of non-empty tiles, as (row_counts, column_counts).
+        
+        The counts are tied to the grid they were taken from, so assigning
+        tiles, width and height in any order makes them recount when needed.
+        """
+        counted = self._counted()
+        if counted is None:
+            row_counts, column_counts = [], [0] * self.width
+            for row in self.tiles:
+                occupied = [x for x, tile in enumerate(row) if tile.type != "empty"]
+                row_counts.append(len(occupied))
+                for x in occupied:
+                    column_counts[x] += 1
+            counted = self._occupancy = (self.tiles, row_counts, column_counts)
+        return counted[1], counted[2]
+    
+    def set_tile(self, x, y, tile):
+        """Put a tile on a cell, keeping the occupancy counts current"""
+        old = self.tiles[y][x]
+        self.tiles[y][x] = tile
+        counted = self._counted()
+        if counted is not None:
+            delta = (tile.type != "empty") - (old.type != "empty")
+            if delta:
+                counted[1][y] += delta
+                counted[2][x] += delta
+    
+    def tile_bounds(self):
+        """(min_x, min_y, max_x, max_y) of the non-empty tiles, or None, in O(width + height)"""
+        row_counts, column_counts = self.occupancy()
+        rows = [y for y, count in enumerate(row_counts) if count]
+        if not rows:
+            return None
+        columns = [x for x, count in enumerate(column_counts) if count]
+        return columns[0], rows[0], columns[-1], rows[-1]
+    
+    def content_bounds(self):
+        """Bounding box of tiles on any layer, objects and triggers, or None when the area is blank"""
+        triggers_by_cell = self._index()
+        xs, ys = [], []
+        bounds = self.tile_bounds()
+        if bounds:
+            xs += bounds[0::2]
+            ys += bounds[1::2]
+        upper_cells = [cell for layer in self.layers[1:] for cell in layer.cells]
+        for x, y in list(self.objects.cells()) + list(triggers_by_cell) + upper_cells:
+            xs.append(x)
+            ys.append(y)
+        if not xs:
+            return None
+        return min(xs), min(ys), max(xs), max(ys)
+    
+    def window(self, x0, y0, width, height):
+        """Tiles of the width x height window at (x0, y0), padded with empty tiles.
+
+        Rows are sliced rather than copied cell by cell, and the kept Tile
+        objects are shared with this area. When no tile falls outside the
+        window, its occupancy is derived from this area's counts and used
+        once the returned grid is assigned to tiles.
+        """
+        empty = Tile()
+        tiles = []
+        for y in range(y0, y0 + height):
+            row = self.tiles[y][x0:x0 + width] if y < self.height else []
+            if len(row) < width:
+                row += [empty] * (width - len(row))
+            tiles.append(row)
+        
+        row_counts, column_counts = self.occupancy()
+        total = sum(row_counts)
+        if sum(row_counts[y0:y0 + height]) == total and sum(column_counts[x0:x0 + width]) == total:
+            self._window_occupancy = (tiles,
+                                      row_counts[y0:y0 + height] + [0] * max(0, y0 + height - self.height),
+                                      column_counts[x0:x0 + width] + [0] * max(0, x0 + width - self.width))
+        return tiles
 
 @dataclass
 class Game:
@@ -112,6 +596,7 @@ class Game:
     used_objects: List[str] = None  # Objects used in this game
     used_triggers: List[str] = None  # Triggers used in this game
     properties: Dict[str, Any] = None
+    world_positions: Dict[str, List[int]] = None  # Area filename -> [x, y] of its corner in the world view
     
     def __post_init__(self):
         if self.areas is None:
@@ -125,4 +610,6 @@ class Game:
         if self.used_triggers is None:
             self.used_triggers = []
         if self.properties is None:
-            self.properties = {}
\ No newline at end of file
+            self.properties = {}
+        if self.world_positions is None:
+            self.world_positions = {}
\ No newline at end of file
@@ -3,7 +3,16 @@ Dialog and tool methods for the Tinker RPG Editor
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, filedialog, messagebox, simpledialog
+import os
+import time
+from dataclasses import replace
+
+from data_classes import ObjectStore
+from undo_history import TileOp, AttrOp, window_retained_bytes
+from stamps import STAMPS_DIR, copy_region, save_stamp, load_stamp
+from game_replace import ReplaceSpec, GameReplace, replace_ops
+from world_view import WorldView
 
 class DialogTools:
     """Mixin class containing dialog and tool methods"""
@@ -39,13 +48,119 @@ class DialogTools:
         button_frame.pack(fill=tk.X, padx=10, pady=10)
         
         def save_properties():
-            self.current_game.name = game_name_var.get()
+            self.apply_edit("Game Properties", AttrOp(self.current_game, name=game_name_var.get()))
             self.game_name_label.config(text=self.current_game.name)
             dialog.destroy()
         
         ttk.Button(button_frame, text="Save", command=save_properties).pack(side=tk.RIGHT, padx=(5,0))
         ttk.Button(button_frame, text="Cancel", command=dialog.destroy).pack(side=tk.RIGHT)
     
+    def find_replace_targets(self):
+        """Area files of the game other than the open area, which is edited in memory instead"""
+        open_path = os.path.abspath(self.current_area_file) if self.current_area_file else None
+        paths = [os.path.join("areas", area_file) for area_file in self.current_game.areas]
+        return [path for path in paths if os.path.exists(path) and os.path.abspath(path) != open_path]
+    
+    def show_find_replace_dialog(self):
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Find and Replace in Game")
+        dialog.geometry("420x400")
+        dialog.transient(self.root)
+        
+        frame = ttk.Frame(dialog)
+        frame.pack(fill=tk.X, padx=10, pady=10)
+        ttk.Label(frame, text="Find:").grid(row=0, column=0, sticky=tk.W, padx=5)
+        find_var = tk.StringVar(value=self.selected_tile or "")
+        ttk.Entry(frame, textvariable=find_var, width=30).grid(row=0, column=1, padx=5)
+        ttk.Label(frame, text="Replace with:").grid(row=1, column=0, sticky=tk.W, padx=5)
+        replace_var = tk.StringVar()
+        ttk.Entry(frame, textvariable=replace_var, width=30).grid(row=1, column=1, padx=5)
+        
+        scope_frame = ttk.Frame(dialog)
+        scope_frame.pack(fill=tk.X, padx=10)
+        tiles_var, objects_var, triggers_var = tk.BooleanVar(value=True), tk.BooleanVar(value=True), tk.BooleanVar(value=True)
+        ttk.Checkbutton(scope_frame, text="Tiles", variable=tiles_var).pack(side=tk.LEFT)
+        ttk.Checkbutton(scope_frame, text="Objects", variable=objects_var).pack(side=tk.LEFT, padx=10)
+        ttk.Checkbutton(scope_frame, text="Trigger parameters", variable=triggers_var).pack(side=tk.LEFT)
+        
+        results_listbox = tk.Listbox(dialog)
+        results_listbox.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        def current_spec():
+            find = find_var.get().strip()
+            if not find:
+                messagebox.showerror("Error", "Please enter something to find", parent=dialog)
+                return None
+            return ReplaceSpec(find, replace_var.get().strip(), tiles=tiles_var.get(),
+                               objects=objects_var.get(), triggers=triggers_var.get())
+        
+        def describe(name, counts):
+            return f"{name}: {counts['tiles']} tiles, {counts['objects']} objects, {counts['triggers']} triggers"
+        
+        def preview():
+            spec = current_spec()
+            if spec is None:
+                return
+            results_listbox.delete(0, tk.END)
+            _, counts = replace_ops(self.current_area, spec)
+            results_listbox.insert(tk.END, describe(f"{self.current_area.name} (open)", counts))
+            for path, result in GameReplace(self.find_replace_targets(), spec).preview().items():
+                if isinstance(result, Exception):
+                    results_listbox.insert(tk.END, f"{os.path.basename(path)}: error: {result}")
+                else:
+                    results_listbox.insert(tk.END, describe(os.path.basename(path), result))
+        
+        def replace_all():
+            spec = current_spec()
+            if spec is None:
+                return
+            if not spec.replace:
+                messagebox.showerror("Error", "Please enter a replacement", parent=dialog)
+                return
+            # The open area may have unsaved edits, so it is changed as an undoable edit instead of on disk
+            ops, open_counts = replace_ops(self.current_area, spec)
+            # Checked before any file is written, so a locked layer leaves everything unchanged
+            if not all(self.layer_editable(op.layer) for op in ops if isinstance(op, TileOp) and op):
+                return
+            try:
+                file_counts = GameReplace(self.find_replace_targets(), spec).apply()
+            except Exception as e:
+                messagebox.showerror("Error", f"Replace failed, no area files were changed: {e}", parent=dialog)
+                return
+            self.apply_edit("Replace in Game", *ops)
+            changed_files = sum(1 for counts in file_counts.values() if any(counts.values()))
+            messagebox.showinfo("Find and Replace",
+                                f"Updated {changed_files} area file(s).\n" +
+                                describe("Open area", open_counts) + "\nSave the open area to keep its changes.",
+                                parent=dialog)
+            dialog.destroy()
+        
+        button_frame = ttk.Frame(dialog)
+        button_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        ttk.Button(button_frame, text="Replace All", command=replace_all).pack(side=tk.RIGHT, padx=(5,0))
+        ttk.Button(button_frame, text="Preview", command=preview).pack(side=tk.RIGHT, padx=(5,0))
+        ttk.Button(button_frame, text="Cancel", command=dialog.destroy).pack(side=tk.RIGHT)
+    
+    def show_world_view(self):
+        """Open a window with every area of the game stitched together"""
+        if not self.current_game.areas:
+            messagebox.showinfo("World View", "The game has no areas yet. Use Area > Add Area to Game first.")
+            return
+        WorldView(self.root, self.current_game, self.tile_manager,
+                  open_area=lambda: (self.current_area_file, self.current_area),
+                  on_open=self.open_area_at, on_move=self.set_world_positions)
+    
+    def open_area_at(self, path, x, y):
+        """Open an area file, if it isn't open already, and jump to cell (x, y)"""
+        if not (self.current_area_file and os.path.abspath(self.current_area_file) == os.path.abspath(path)):
+            self._load_area_from_file(path, show_message=False)
+        # After the full redraw the load scheduled
+        self.root.after_idle(lambda: self.on_minimap_jump(x, y))
+        self.root.lift()
+    
+    def set_world_positions(self, positions):
+        self.apply_edit("Move Area in World", AttrOp(self.current_game, world_positions=positions))
+    
     def show_resize_dialog(self):
         dialog = tk.Toplevel(self.root)
         dialog.title("Resize Canvas")
@@ -78,76 +193,147 @@ class DialogTools:
         ttk.Button(dialog, text="Cancel", command=dialog.destroy).pack()
     
     def resize_canvas(self, new_width, new_height):
-        from data_classes import Tile
-        old_w, old_h = self.current_area.width, self.current_area.height
-        new_tiles = [[Tile() for _ in range(new_width)] for _ in range(new_height)]
-        
-        copy_w, copy_h = min(old_w, new_width), min(old_h, new_height)
-        for y in range(copy_h):
-            for x in range(copy_w):
-                new_tiles[y][x] = self.current_area.tiles[y][x]
-        
-        self.current_area.width, self.current_area.height = new_width, new_height
-        self.current_area.tiles = new_tiles
-        self.current_area.objects = [obj for obj in self.current_area.objects 
-                                   if 0 <= obj.x < new_width and 0 <= obj.y < new_height]
-        self.current_area.triggers = [trig for trig in self.current_area.triggers 
-                                    if 0 <= trig.x < new_width and 0 <= trig.y < new_height]
-        
-        self.cursor_x = min(self.cursor_x, new_width - 1)
-        self.cursor_y = min(self.cursor_y, new_height - 1)
-        
-        self.draw_area()
-        self.update_properties_display()
+        area = self.current_area
+        new_tiles = area.window(0, 0, new_width, new_height)
+        self.apply_edit("Resize Canvas", AttrOp(
+            area, cells=None, retained_bytes=window_retained_bytes(area, 0, 0, new_width, new_height),
+            width=new_width, height=new_height, tiles=new_tiles,
+            layers=area.layers_window(0, 0, new_width, new_height),
+            objects=ObjectStore(obj for obj in area.objects if 0 <= obj.x < new_width and 0 <= obj.y < new_height),
+            triggers=[trig for trig in area.triggers if 0 <= trig.x < new_width and 0 <= trig.y < new_height]))
         messagebox.showinfo("Resize", f"Canvas resized to {new_width}x{new_height}")
     
     def crop_canvas_to_room(self):
-        from data_classes import Tile
-        min_x = min_y = float('inf')
-        max_x = max_y = float('-inf')
-        found_content = False
-        
-        for y in range(self.current_area.height):
-            for x in range(self.current_area.width):
-                if self.current_area.tiles[y][x].type != "empty":
-                    min_x, max_x = min(min_x, x), max(max_x, x)
-                    min_y, max_y = min(min_y, y), max(max_y, y)
-                    found_content = True
-        
-        for obj in self.current_area.objects:
-            min_x, max_x = min(min_x, obj.x), max(max_x, obj.x)
-            min_y, max_y = min(min_y, obj.y), max(max_y, obj.y)
-            found_content = True
-        
-        for trig in self.current_area.triggers:
-            min_x, max_x = min(min_x, trig.x), max(max_x, trig.x)
-            min_y, max_y = min(min_y, trig.y), max(max_y, trig.y)
-            found_content = True
-        
-        if not found_content:
+        area = self.current_area
+        bounds = area.content_bounds()
+        if bounds is None:
             messagebox.showinfo("Crop", "No content found to crop to.")
             return
         
-        new_width, new_height = int(max_x - min_x + 1), int(max_y - min_y + 1)
-        new_tiles = [[Tile() for _ in range(new_width)] for _ in range(new_height)]
+        min_x, min_y, max_x, max_y = bounds
+        new_width, new_height = max_x - min_x + 1, max_y - min_y + 1
+        new_tiles = area.window(min_x, min_y, new_width, new_height)
         
-        for y in range(int(min_y), int(max_y + 1)):
-            for x in range(int(min_x), int(max_x + 1)):
-                new_tiles[y - int(min_y)][x - int(min_x)] = self.current_area.tiles[y][x]
+        # Shifted copies, so undo gets the originals back at their old positions
+        self.apply_edit("Crop Canvas", AttrOp(
+            area, cells=None, retained_bytes=window_retained_bytes(area, min_x, min_y, new_width, new_height),
+            width=new_width, height=new_height, tiles=new_tiles,
+            layers=area.layers_window(min_x, min_y, new_width, new_height),
+            objects=ObjectStore(replace(obj, x=obj.x - min_x, y=obj.y - min_y) for obj in area.objects),
+            triggers=[replace(trig, x=trig.x - min_x, y=trig.y - min_y) for trig in area.triggers]))
+        self.cursor_x = min(max(0, self.cursor_x - min_x), new_width - 1)
+        self.cursor_y = min(max(0, self.cursor_y - min_y), new_height - 1)
+        messagebox.showinfo("Crop", f"Canvas cropped to {new_width}x{new_height}")
+    
+    def add_layer(self):
+        """Add an empty tile layer above the others and make it the active one"""
+        from data_classes import TileLayer
+        area = self.current_area
+        name = simpledialog.askstring("Add Layer", "Layer name:", initialvalue=f"Layer {len(area.layers)}",
+                                      parent=self.root)
+        if name:
+            if self.apply_edit("Add Layer", AttrOp(area, cells=None, layers=area.layers + [TileLayer(name=name)])):
+                self.active_layer = len(area.layers) - 1
+                self.update_layer_controls()
+    
+    def rename_layer(self):
+        layer = self.current_area.layers[self.active_layer]
+        name = simpledialog.askstring("Rename Layer", "Layer name:", initialvalue=layer.name, parent=self.root)
+        if name:
+            self.apply_edit("Rename Layer", AttrOp(layer, name=name))
+    
+    def remove_layer(self):
+        """Remove the active layer with its tiles; the ground layer stays"""
+        area = self.current_area
+        if self.active_layer == 0:
+            messagebox.showinfo("Remove Layer", "The ground layer can't be removed")
+            return
+        layer = area.layers[self.active_layer]
+        if layer.cells and not messagebox.askyesno("Remove Layer",
+                                                   f"Remove layer '{layer.name}' and its {len(layer.cells)} tiles?"):
+            return
+        self.apply_edit("Remove Layer", AttrOp(area, cells=None,
+                                               layers=[other for other in area.layers if other is not layer]))
+    
+    def show_cache_dialog(self):
+        cache = self.tile_manager.sprite_cache
+        stats = cache.stats()
         
-        for obj in self.current_area.objects:
-            obj.x -= int(min_x)
-            obj.y -= int(min_y)
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Sprite Cache")
+        dialog.geometry("300x220")
+        dialog.transient(self.root)
+        
+        ttk.Label(dialog, text=f"Sprites: {stats['entries']}  Pinned: {stats['pinned']}").pack(pady=(10, 0))
+        ttk.Label(dialog, text=f"Resident: {stats['used_bytes'] // 1024} KB").pack()
+        ttk.Label(dialog, text=f"Hits: {stats['hits']}  Misses: {stats['misses']}  "
+                               f"Evictions: {stats['evictions']}").pack()
+        ttk.Label(dialog, text=f"Hit rate: {stats['hit_rate']:.1%}").pack()
         
-        for trig in self.current_area.triggers:
-            trig.x -= int(min_x)
-            trig.y -= int(min_y)
+        frame = ttk.Frame(dialog)
+        frame.pack(pady=10)
+        ttk.Label(frame, text="Budget (MB):").grid(row=0, column=0, padx=5)
+        budget_var = tk.StringVar(value=str(stats['budget_bytes'] // (1024 * 1024)))
+        ttk.Entry(frame, textvariable=budget_var, width=10).grid(row=0, column=1, padx=5)
         
-        self.current_area.width, self.current_area.height = new_width, new_height
-        self.current_area.tiles = new_tiles
-        self.cursor_x = max(0, self.cursor_x - int(min_x))
-        self.cursor_y = max(0, self.cursor_y - int(min_y))
+        def apply():
+            try:
+                budget_mb = int(budget_var.get())
+                if budget_mb > 0:
+                    self.cache_budget = budget_mb * 1024 * 1024
+                    cache.set_budget(self.cache_budget)
+                    dialog.destroy()
+            except ValueError:
+                messagebox.showerror("Error", "Please enter a valid number")
         
-        self.draw_area()
-        self.update_properties_display()
-        messagebox.showinfo("Crop", f"Canvas cropped to {new_width}x{new_height}")
\ No newline at end of file
+        ttk.Button(dialog, text="Apply", command=apply).pack(pady=5)
+        ttk.Button(dialog, text="Cancel", command=dialog.destroy).pack()
+    
+    def dump_render_stats(self):
+        """Write the render-stats overlay contents to a text file for bug reports"""
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".txt",
+            filetypes=[("Text files", "*.txt"), ("All files", "*.*")],
+            initialfile="render_stats.txt",
+            title="Dump Render Stats"
+        )
+        if filename:
+            try:
+                with open(filename, 'w') as f:
+                    f.write(f"Tinker render stats, {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+                    f.write(f"Area: {self.current_area.name} ({self.current_area.width}x{self.current_area.height}), "
+                            f"zoom {self.tile_size}px\n")
+                    f.write("\n".join(self.render_stats_lines()) + "\n")
+                messagebox.showinfo("Render Stats", f"Render stats written to {filename}")
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to write render stats: {e}")
+    
+    def save_selection_as_stamp(self):
+        """Save the selected region, with its objects and triggers, as a prefab stamp"""
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("Stamp files", "*.json"), ("All files", "*.*")],
+            initialdir=STAMPS_DIR,
+            title="Save Stamp"
+        )
+        if filename:
+            name = os.path.splitext(os.path.basename(filename))[0]
+            stamp = copy_region(self.current_area, *self.selection_bounds(), name=name, layer=self.active_layer)
+            try:
+                save_stamp(stamp, filename)
+                self.clipboard_stamp = stamp
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to save stamp: {e}")
+    
+    def load_stamp_file(self):
+        """Load a stamp into the clipboard; paste places it at the cursor"""
+        filename = filedialog.askopenfilename(
+            filetypes=[("Stamp files", "*.json"), ("All files", "*.*")],
+            initialdir=STAMPS_DIR,
+            title="Load Stamp"
+        )
+        if filename:
+            try:
+                self.clipboard_stamp = load_stamp(filename)
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to load stamp: {e}")
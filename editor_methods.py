@@ -6,7 +6,31 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import json
 import os
-from dataclasses import asdict
+from dataclasses import asdict, replace
+
+from area_renderer import ZOOM_LEVELS
+from area_scene import tile_is_blocked, TRIGGER_COLORS
+from asset_search import AssetSearchIndex
+from paint_tools import rect_cells, line_cells, flood_cells
+from render_stats import timed
+from undo_history import EditCommand, TileOp, ContentOp, AttrOp
+from stamps import copy_region, clear_ops, paste_ops
+
+PALETTE_CELL = 40  # Toolbox slot size in pixels
+TRIGGER_TYPES = {
+    "teleport": "Teleport",
+    "inventory": "Inventory",
+    "tile_update": "Tile Update",
+    "area_object": "Area Object",
+    "game_end": "Game End",
+    "show_dialog": "Show Dialog",
+    "custom": "Custom Script"
+}
+# Placeholder entries shown when no NPC or object sprites are loaded
+PALETTE_NPC_COLORS = {"guard": "#4169E1", "merchant": "#FFD700", "villager": "#90EE90",
+                      "wizard": "#9370DB", "knight": "#C0C0C0"}
+PALETTE_OBJECT_COLORS = {"item": "#32CD32", "lever": "#FF4500", "fountain": "#00CED1",
+                         "chest": "#8B4513", "barrel": "#654321"}
 
 class EditorMethods:
     """Mixin class containing all editor interaction methods"""
@@ -14,19 +38,32 @@ class EditorMethods:
     def __init__(self):
         # Add trigger selection tracking
         self.selected_trigger_index = 0
-        self.trigger_colors = {
-            "teleport": "#0066CC",      # Blue
-            "inventory": "#009900",     # Green
-            "tile_update": "#FFCC00",   # Yellow
-            "area_object": "#FF6600",   # Orange
-            "game_end": "#9900CC",      # Purple
-            "show_dialog": "#00CCCC",   # Cyan
-            "custom": "#CC0000"         # Red
-        }
+        self.trigger_colors = dict(TRIGGER_COLORS)
     
     def on_key_press(self, event):
         key = event.keysym.lower()
-        if self.root.focus_get() == self.canvas:
+        if event.state & 0x4:  # Control held
+            if key == 'z':
+                if event.state & 0x1:  # Shift as well
+                    self.redo()
+                else:
+                    self.undo()
+                return "break"
+            elif key == 'y':
+                self.redo()
+                return "break"
+            elif self.root.focus_get() == self.canvas:
+                # Only while the canvas has focus, so text fields keep their own clipboard keys
+                if key == 'c':
+                    self.copy_selection()
+                    return "break"
+                elif key == 'x':
+                    self.cut_selection()
+                    return "break"
+                elif key == 'v':
+                    self.paste_clipboard()
+                    return "break"
+        elif self.root.focus_get() == self.canvas:
             if key in ['up', 'down', 'left', 'right']:
                 self.move_cursor(key)
                 return "break"
@@ -42,23 +79,50 @@ class EditorMethods:
             elif key == 'return':  # Enter key
                 self.edit_selected_trigger()
                 return "break"
+            elif key in ['plus', 'equal', 'kp_add']:
+                self.zoom_in()
+                return "break"
+            elif key in ['minus', 'kp_subtract']:
+                self.zoom_out()
+                return "break"
+            elif key == 'm':
+                self.set_selection_anchor()
+                return "break"
+            elif key == 'escape':
+                self.clear_selection_anchor()
+                return "break"
+            elif key == 'r':
+                self.paint_rectangle()
+                return "break"
+            elif key == 'l':
+                self.paint_line()
+                return "break"
+            elif key == 'f':
+                self.paint_flood_fill()
+                return "break"
     
     def select_trigger(self, trigger_number):
         """Select a specific trigger at the current location"""
-        triggers_here = [trig for trig in self.current_area.triggers 
-                        if trig.x == self.cursor_x and trig.y == self.cursor_y]
+        triggers_here = self.current_area.triggers_at(self.cursor_x, self.cursor_y)
         if triggers_here and 1 <= trigger_number <= len(triggers_here):
             self.selected_trigger_index = trigger_number - 1
-            self.update_properties_display()
+            self.schedule_redraw(properties=True)
     
     def edit_selected_trigger(self):
         """Open edit dialog for the currently selected trigger"""
-        triggers_here = [trig for trig in self.current_area.triggers 
-                        if trig.x == self.cursor_x and trig.y == self.cursor_y]
+        triggers_here = self.current_area.triggers_at(self.cursor_x, self.cursor_y)
         if triggers_here and 0 <= self.selected_trigger_index < len(triggers_here):
             trigger = triggers_here[self.selected_trigger_index]
             self.show_trigger_edit_dialog(trigger)
     
+    def compile_custom_trigger(self, trigger):
+        """Compile a custom trigger's script, returning an error message or None"""
+        if trigger.trigger_type != "custom":
+            return None
+        source = trigger.parameters.get("code", "")
+        _, error = self.tile_manager.trigger_scripts.compile(source, f"<trigger {trigger.name}>")
+        return error
+    
     def get_next_trigger_name(self):
         """Generate the next available trigger name (trigger_1, trigger_2, etc.)"""
         existing_names = [trig.name for trig in self.current_area.triggers]
@@ -68,98 +132,218 @@ class EditorMethods:
         return f"trigger_{counter}"
     
     def place_tile(self):
+        area, x, y = self.current_area, self.cursor_x, self.cursor_y
         if self.selected_mode == "tile":
-            current_tile = self.current_area.tiles[self.cursor_y][self.cursor_x]
-            if current_tile.type == self.selected_tile:
-                from data_classes import Tile
-                self.current_area.tiles[self.cursor_y][self.cursor_x] = Tile(type="empty")
-            else:
-                from data_classes import Tile
-                self.current_area.tiles[self.cursor_y][self.cursor_x] = Tile(type=self.selected_tile)
+            if not self.layer_editable():
+                return
+            layer = self.active_layer
+            current_family = self.tile_manager.autotiler.family(area.layer_tile(layer, x, y).type)
+            new_type = "empty" if current_family == self.selected_tile else self.selected_tile
+            self.apply_edit("Place Tile", self.autotiled(TileOp.fill(area, [(x, y)], new_type, layer)))
         
         elif self.selected_mode == "object":
-            existing = [obj for obj in self.current_area.objects 
-                       if obj.x == self.cursor_x and obj.y == self.cursor_y]
-            if existing and existing[0].type == self.selected_tile:
-                self.current_area.objects = [obj for obj in self.current_area.objects 
-                                           if not (obj.x == self.cursor_x and obj.y == self.cursor_y)]
-            else:
-                self.current_area.objects = [obj for obj in self.current_area.objects 
-                                           if not (obj.x == self.cursor_x and obj.y == self.cursor_y)]
+            existing = area.objects_at(x, y)
+            added = []
+            if not (existing and existing[0].type == self.selected_tile):
                 from data_classes import GameObject
-                self.current_area.objects.append(GameObject(
-                    type=self.selected_tile, x=self.cursor_x, y=self.cursor_y))
+                added.append(GameObject(type=self.selected_tile, x=x, y=y))
+            self.apply_edit("Place Object", ContentOp(area, "objects", added=added, removed=existing))
         
         elif self.selected_mode == "npc":
             npc_types = set(self.tile_manager.get_npc_names()) or {"guard", "merchant", "villager"}
-            existing = [obj for obj in self.current_area.objects 
-                       if obj.x == self.cursor_x and obj.y == self.cursor_y and obj.type in npc_types]
-            if existing and existing[0].type == self.selected_tile:
-                self.current_area.objects = [obj for obj in self.current_area.objects 
-                                           if not (obj.x == self.cursor_x and obj.y == self.cursor_y and 
-                                                  obj.type in npc_types)]
-            else:
-                self.current_area.objects = [obj for obj in self.current_area.objects 
-                                           if not (obj.x == self.cursor_x and obj.y == self.cursor_y and 
-                                                  obj.type in npc_types)]
+            existing = [obj for obj in area.objects_at(x, y) if obj.type in npc_types]
+            added = []
+            if not (existing and existing[0].type == self.selected_tile):
                 from data_classes import GameObject
-                self.current_area.objects.append(GameObject(
-                    type=self.selected_tile, x=self.cursor_x, y=self.cursor_y))
+                added.append(GameObject(type=self.selected_tile, x=x, y=y))
+            self.apply_edit("Place NPC", ContentOp(area, "objects", added=added, removed=existing))
         
         elif self.selected_mode == "trigger":
             # Check if we can add more triggers (max 6)
-            triggers_here = [trig for trig in self.current_area.triggers 
-                           if trig.x == self.cursor_x and trig.y == self.cursor_y]
+            triggers_here = area.triggers_at(x, y)
             if len(triggers_here) >= 6:
                 messagebox.showwarning("Max Triggers", "Maximum 6 triggers allowed per location")
                 return
             
             from data_classes import Trigger
             new_trigger = Trigger(
-                x=self.cursor_x, 
-                y=self.cursor_y,
+                x=x, 
+                y=y,
                 trigger_type=self.selected_tile,  # selected_tile now holds trigger type
                 name=self.get_next_trigger_name()
             )
-            self.current_area.triggers.append(new_trigger)
+            self.apply_edit("Place Trigger", ContentOp(area, "triggers", added=[new_trigger]))
             self.selected_trigger_index = len(triggers_here)  # Select the new trigger
             
             # Open edit dialog immediately for new trigger
             self.show_trigger_edit_dialog(new_trigger)
-        
-        self.draw_area()
-        self.update_properties_display()
     
     def remove_tile(self):
+        area, x, y = self.current_area, self.cursor_x, self.cursor_y
+        npc_types = set(self.tile_manager.get_npc_names()) or {"guard", "merchant", "villager"}
         if self.selected_mode == "tile":
-            from data_classes import Tile
-            self.current_area.tiles[self.cursor_y][self.cursor_x] = Tile(type="empty")
+            if self.layer_editable():
+                self.apply_edit("Remove Tile",
+                                self.autotiled(TileOp.fill(area, [(x, y)], "empty", self.active_layer)))
         elif self.selected_mode == "object":
-            npc_types = set(self.tile_manager.get_npc_names()) or {"guard", "merchant", "villager"}
-            self.current_area.objects = [obj for obj in self.current_area.objects 
-                                       if not (obj.x == self.cursor_x and obj.y == self.cursor_y and 
-                                              obj.type not in npc_types)]
+            removed = [obj for obj in area.objects_at(x, y) if obj.type not in npc_types]
+            self.apply_edit("Remove Object", ContentOp(area, "objects", removed=removed))
         elif self.selected_mode == "npc":
-            npc_types = set(self.tile_manager.get_npc_names()) or {"guard", "merchant", "villager"}
-            self.current_area.objects = [obj for obj in self.current_area.objects 
-                                       if not (obj.x == self.cursor_x and obj.y == self.cursor_y and 
-                                              obj.type in npc_types)]
+            removed = [obj for obj in area.objects_at(x, y) if obj.type in npc_types]
+            self.apply_edit("Remove NPC", ContentOp(area, "objects", removed=removed))
         elif self.selected_mode == "trigger":
-            triggers_here = [trig for trig in self.current_area.triggers 
-                           if trig.x == self.cursor_x and trig.y == self.cursor_y]
+            triggers_here = area.triggers_at(x, y)
             if triggers_here and 0 <= self.selected_trigger_index < len(triggers_here):
                 trigger_to_remove = triggers_here[self.selected_trigger_index]
-                self.current_area.triggers.remove(trigger_to_remove)
+                self.apply_edit("Remove Trigger", ContentOp(area, "triggers", removed=[trigger_to_remove]))
                 # Adjust selected index if needed
-                remaining_triggers = [trig for trig in self.current_area.triggers 
-                                    if trig.x == self.cursor_x and trig.y == self.cursor_y]
+                remaining_triggers = area.triggers_at(x, y)
                 if not remaining_triggers:
                     self.selected_trigger_index = 0
                 elif self.selected_trigger_index >= len(remaining_triggers):
                     self.selected_trigger_index = len(remaining_triggers) - 1
-        
-        self.draw_area()
-        self.update_properties_display()
+    
+    # Undo/redo
+    def apply_edit(self, label, *ops, merge_key=None):
+        """Apply ops as one undoable command and redraw what they touched"""
+        ops = [op for op in ops if op]
+        if not ops:
+            return False
+        command = EditCommand(label, ops, merge_key)
+        self._redraw_after_edit(command.apply(True))
+        self.history.push(command)
+        return True
+    
+    def undo(self):
+        if self.history.can_undo:
+            _, cells = self.history.undo()
+            self._redraw_after_edit(cells)
+    
+    def redo(self):
+        if self.history.can_redo:
+            _, cells = self.history.redo()
+            self._redraw_after_edit(cells)
+    
+    def _redraw_after_edit(self, cells):
+        if self.area_name_var.get() != self.current_area.name:
+            self.area_name_var.set(self.current_area.name)
+        self.game_name_label.config(text=self.current_game.name)
+        if cells is None:
+            # The area itself may have been swapped or resized
+            self.cursor_x = min(self.cursor_x, self.current_area.width - 1)
+            self.cursor_y = min(self.cursor_y, self.current_area.height - 1)
+            self.schedule_redraw(full=True, properties=True)
+        else:
+            self.schedule_redraw(cells=cells, properties=True)
+        self.update_layer_controls()
+    
+    def set_selection_anchor(self):
+        """Pin the current cell as the fixed corner for rectangle and line tools"""
+        self.selection_anchor = (self.cursor_x, self.cursor_y)
+        self.schedule_redraw(cursor=True)
+    
+    def clear_selection_anchor(self):
+        self.selection_anchor = None
+        self.schedule_redraw(cursor=True)
+    
+    def paint_cells(self, cells):
+        """Place the selected tile on many cells as one update and one redraw"""
+        if self.selected_mode != "tile":
+            messagebox.showinfo("Paint", "Painting tools place tiles; switch the toolbox to Tiles first")
+            return []
+        if not self.layer_editable():
+            return []
+        op = self.autotiled(TileOp.fill(self.current_area, cells, self.selected_tile, self.active_layer))
+        self.apply_edit("Paint", op)
+        return [(x, y) for x, y, _, _ in op.changes]
+    
+    def autotiled(self, op):
+        """With auto-tiling on, extend a ground tile op so edited walls and their neighbours match up"""
+        if not self.autotile or op.layer != 0:
+            return op
+        return self.tile_manager.autotiler.retile(op, self.autotile_neighbours)
+    
+    def retile_area(self):
+        """Re-pick the variant of every auto-tiled wall, e.g. after loading an older area"""
+        area = self.current_area
+        if not self.layer_editable(0):
+            return
+        cells = [(x, y) for y in range(area.height) for x in range(area.width)]
+        self.apply_edit("Retile Area", self.tile_manager.autotiler.retile(TileOp(area, []), self.autotile_neighbours,
+                                                                          cells))
+    
+    def paint_rectangle(self):
+        """Fill the rectangle between the anchor and the cursor"""
+        anchor_x, anchor_y = self.selection_anchor or (self.cursor_x, self.cursor_y)
+        self.paint_cells(rect_cells(anchor_x, anchor_y, self.cursor_x, self.cursor_y))
+        self.clear_selection_anchor()
+    
+    def paint_line(self):
+        """Draw a line from the anchor to the cursor; the cursor becomes the next anchor"""
+        anchor_x, anchor_y = self.selection_anchor or (self.cursor_x, self.cursor_y)
+        self.paint_cells(line_cells(anchor_x, anchor_y, self.cursor_x, self.cursor_y))
+        self.set_selection_anchor()
+    
+    def paint_flood_fill(self):
+        """Replace the region of same-type tiles connected to the cursor"""
+        area, layer = self.current_area, self.active_layer
+        if self.selected_mode == "tile" and area.layer_tile(layer, self.cursor_x, self.cursor_y).type == self.selected_tile:
+            return
+        self.paint_cells(flood_cells(area, self.cursor_x, self.cursor_y, layer))
+    
+    # Tile layers
+    def layer_editable(self, layer=None):
+        """Whether tile edits may go to a layer, the active one by default; tells the user when it is locked"""
+        layer = self.current_area.layers[self.active_layer if layer is None else layer]
+        if layer.locked:
+            messagebox.showinfo("Layer Locked", f"Layer '{layer.name}' is locked; unlock it to edit its tiles")
+            return False
+        return True
+    
+    def update_layer_controls(self):
+        """Show the current area's layers and the active layer's flags in the toolbox"""
+        layers = self.current_area.layers
+        self.active_layer = min(self.active_layer, len(layers) - 1)
+        if not hasattr(self, 'layer_combo'):
+            return
+        self.layer_combo.configure(values=[layer.name for layer in layers])
+        self.layer_combo.current(self.active_layer)
+        self.layer_visible_var.set(layers[self.active_layer].visible)
+        self.layer_locked_var.set(layers[self.active_layer].locked)
+    
+    def on_layer_select(self, event=None):
+        self.active_layer = max(0, self.layer_combo.current())
+        self.update_layer_controls()
+    
+    def on_layer_flags_change(self):
+        layer = self.current_area.layers[self.active_layer]
+        visible, locked = self.layer_visible_var.get(), self.layer_locked_var.get()
+        # Only a visibility change alters what the canvas shows
+        self.apply_edit("Change Layer", AttrOp(layer, cells=None if visible != layer.visible else (),
+                                               visible=visible, locked=locked))
+    
+    def selection_bounds(self):
+        """Corners of the anchor-to-cursor rectangle, or just the cursor cell"""
+        anchor_x, anchor_y = self.selection_anchor or (self.cursor_x, self.cursor_y)
+        return anchor_x, anchor_y, self.cursor_x, self.cursor_y
+    
+    def copy_selection(self):
+        self.clipboard_stamp = copy_region(self.current_area, *self.selection_bounds(), layer=self.active_layer)
+    
+    def cut_selection(self):
+        if not self.layer_editable():
+            return
+        self.copy_selection()
+        self.apply_edit("Cut", *clear_ops(self.current_area, *self.selection_bounds(), layer=self.active_layer))
+        self.clear_selection_anchor()
+    
+    def paste_clipboard(self):
+        """Paste the copied region or loaded stamp with its corner at the cursor"""
+        if self.clipboard_stamp is None or not self.layer_editable():
+            return
+        self.apply_edit("Paste", *paste_ops(self.current_area, self.clipboard_stamp, self.cursor_x, self.cursor_y,
+                                            self.active_layer))
+        self.selected_trigger_index = 0
     
     def move_cursor(self, direction):
         if direction == 'up' and self.cursor_y > 0:
@@ -173,8 +357,31 @@ class EditorMethods:
         
         # Reset trigger selection when moving to new location
         self.selected_trigger_index = 0
-        self.update_cursor_display()
-        self.update_properties_display()
+        self.schedule_redraw(cursor=True, properties=True)
+    
+    def zoom_in(self):
+        larger = [size for size in ZOOM_LEVELS if size > self.tile_size]
+        if larger:
+            self.set_zoom(larger[0])
+    
+    def zoom_out(self):
+        smaller = [size for size in ZOOM_LEVELS if size < self.tile_size]
+        if smaller:
+            self.set_zoom(smaller[-1])
+    
+    def set_zoom(self, tile_size):
+        """Change the area canvas tile size and keep the cursor in view"""
+        if tile_size == self.tile_size:
+            return
+        self.tile_size = tile_size
+        self.draw_area()
+        if self.current_area.width > 1:
+            self.canvas.xview_moveto(max(0.0, (self.cursor_x - 5) / self.current_area.width))
+        if self.current_area.height > 1:
+            self.canvas.yview_moveto(max(0.0, (self.cursor_y - 5) / self.current_area.height))
+        self.update_viewport()
+        if hasattr(self, 'zoom_label'):
+            self.zoom_label.config(text=f"Zoom: {self.tile_size * 100 // 32}%")
     
     def on_canvas_click(self, event):
         self.canvas.focus_set()
@@ -187,29 +394,16 @@ class EditorMethods:
             self.cursor_x = grid_x
             self.cursor_y = grid_y
             self.selected_trigger_index = 0  # Reset trigger selection
-            self.update_cursor_display()
-            self.update_properties_display()
+            self.schedule_redraw(cursor=True, properties=True)
     
     def on_tile_canvas_click(self, event):
-        clicked = self.tile_canvas.find_closest(event.x, event.y)[0]
-        tags = self.tile_canvas.gettags(clicked)
-        for tag in tags:
-            if tag.startswith("tile_"):
-                self.selected_tile = tag[5:]
-                self.update_tile_display()
-                break
-            elif tag.startswith("obj_"):
-                self.selected_tile = tag[4:]
-                self.update_tile_display()
-                break
-            elif tag.startswith("npc_"):
-                self.selected_tile = tag[4:]
-                self.update_tile_display()
-                break
-            elif tag.startswith("trigger_"):
-                self.selected_tile = tag[8:]  # trigger type (e.g., "teleport")
-                self.update_tile_display()
-                break
+        columns = 5 if self.selected_mode == "tile" else 1
+        col = int((self.tile_canvas.canvasx(event.x) - 10) // PALETTE_CELL)
+        row = int((self.tile_canvas.canvasy(event.y) - 10) // PALETTE_CELL)
+        i = row * columns + col
+        if 0 <= col < columns and row >= 0 and i < len(self.palette_entries):
+            self.selected_tile = self.palette_entries[i]
+            self.update_palette_selection()
     
     def on_mode_change(self):
         self.selected_mode = self.mode_var.get()
@@ -221,204 +415,155 @@ class EditorMethods:
         self.update_tile_display()
     
     def on_area_name_change(self, event):
-        self.current_area.name = self.area_name_var.get()
+        self.apply_edit("Rename Area", AttrOp(self.current_area, name=self.area_name_var.get()),
+                        merge_key=("rename", id(self.current_area)))
     
     def on_walkable_change(self):
         tile = self.current_area.tiles[self.cursor_y][self.cursor_x]
         value = self.walkable_override_var.get()
         if value == "default":
-            tile.walkable_override = None
+            override = None
         elif value == "walkable":
-            tile.walkable_override = True
+            override = True
         else:
-            tile.walkable_override = False
-        self.update_properties_display()
-        self.draw_area()
+            override = False
+        if override != tile.walkable_override:
+            if not self.layer_editable(0):
+                # Walkability overrides live on ground tiles; show the unchanged value again
+                self.walkable_override_var.set({None: "default", True: "walkable"}.get(tile.walkable_override,
+                                                                                       "not_walkable"))
+                return
+            self.apply_edit("Change Walkable", TileOp(self.current_area, [
+                (self.cursor_x, self.cursor_y, tile, replace(tile, walkable_override=override))]))
     
     def is_tile_blocked(self, x, y):
-        tile = self.current_area.tiles[y][x]
-        if not tile.is_walkable(self.tile_manager):
-            return True
-        
-        # Check if any object on this tile blocks movement
-        for obj in self.current_area.objects:
-            if obj.x == x and obj.y == y:
-                if obj.properties.get("walkable", True) is False:
-                    return True
-        
-        # Check if any NPC blocks movement
-        for obj in self.current_area.objects:
-            if obj.x == x and obj.y == y:
-                npc_names = set(self.tile_manager.get_npc_names())
-                if obj.type in npc_names and obj.properties.get("walkable", False) is False:
-                    return True
-        
-        return False
+        return tile_is_blocked(self.current_area, self.tile_manager, x, y)
     
-    def draw_area(self):
-        self.canvas.delete("all")
-        
-        for y in range(self.current_area.height):
-            for x in range(self.current_area.width):
-                x1, y1 = x * self.tile_size, y * self.tile_size
-                tile = self.current_area.tiles[y][x]
-                tile_info = self.tile_manager.get_tile_info(tile.type)
-                
-                if "image" in tile_info:
-                    self.canvas.create_image(x1, y1, image=tile_info["image"], anchor=tk.NW)
-                else:
-                    self.canvas.create_rectangle(x1, y1, x1 + self.tile_size, y1 + self.tile_size, 
-                                               fill="lightgray", outline="black")
-                
-                self.canvas.create_rectangle(x1, y1, x1 + self.tile_size, y1 + self.tile_size, 
-                                           outline="gray", width=1)
-                
-                # Show non-walkable tiles
-                if tile.type != "empty" and self.is_tile_blocked(x, y):
-                    self.canvas.create_text(x1 + 16, y1 + 16, text="✗", fill="red", 
-                                          font=("Arial", 12, "bold"))
-        
-        # Draw objects and NPCs
-        for obj in self.current_area.objects:
-            x1, y1 = obj.x * self.tile_size, obj.y * self.tile_size
-            npc_info = self.tile_manager.get_npc_info(obj.type)
-            obj_info = self.tile_manager.get_object_info(obj.type)
-            
-            if "image" in npc_info:
-                self.canvas.create_image(x1, y1, image=npc_info["image"], anchor=tk.NW)
-            elif "image" in obj_info:
-                self.canvas.create_image(x1, y1, image=obj_info["image"], anchor=tk.NW)
-            else:
-                x2, y2 = x1 + self.tile_size, y1 + self.tile_size
-                if obj.type in ["guard", "merchant", "villager", "wizard", "knight", "enemy", "boss"]:
-                    colors = {"guard": "#4169E1", "merchant": "#FFD700", "villager": "#90EE90",
-                             "wizard": "#9370DB", "knight": "#C0C0C0", "enemy": "#DC143C", "boss": "#8B0000"}
-                    color = colors.get(obj.type, "#FFD700")
-                    self.canvas.create_oval(x1 + 4, y1 + 4, x2 - 4, y2 - 4, fill=color, outline="black", width=2)
-                    self.canvas.create_text(x1 + 16, y1 + 16, text="N", fill="white", font=("Arial", 8, "bold"))
-                else:
-                    colors = {"item": "#32CD32", "lever": "#FF4500", "fountain": "#00CED1",
-                             "chest": "#8B4513", "barrel": "#654321", "table": "#DEB887"}
-                    color = colors.get(obj.type, "#32CD32")
-                    self.canvas.create_rectangle(x1 + 4, y1 + 4, x2 - 4, y2 - 4, fill=color, outline="black", width=2)
-        
-        # Draw triggers with new color system
-        trigger_locations = {}
-        for trigger in self.current_area.triggers:
-            key = (trigger.x, trigger.y)
-            if key not in trigger_locations:
-                trigger_locations[key] = []
-            trigger_locations[key].append(trigger)
-        
-        for (x, y), triggers in trigger_locations.items():
-            x1, y1 = x * self.tile_size, y * self.tile_size
-            x2, y2 = x1 + self.tile_size, y1 + self.tile_size
-            center_x, center_y = (x1 + x2) / 2, (y1 + y2) / 2
-            
-            if len(triggers) == 1:
-                # Single trigger - use type color
-                color = self.trigger_colors.get(triggers[0].trigger_type, "#CC0000")
-                self.canvas.create_polygon(center_x, y1 + 4, x2 - 4, center_y, center_x, y2 - 4, x1 + 4, center_y,
-                                         fill=color, outline="black", width=2)
-            else:
-                # Multiple triggers - dark gray with white number
-                self.canvas.create_polygon(center_x, y1 + 4, x2 - 4, center_y, center_x, y2 - 4, x1 + 4, center_y,
-                                         fill="#444444", outline="black", width=2)
-                self.canvas.create_text(center_x, center_y, text=str(len(triggers)), 
-                                      fill="white", font=("Arial", 10, "bold"))
-        
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        self.update_cursor_display()
+    def palette_names(self):
+        """Names shown in the toolbox for the current mode and search text"""
+        query = self.palette_search_var.get() if hasattr(self, 'palette_search_var') else ""
+        if self.selected_mode == "tile":
+            return self.tile_manager.search_assets("tiles", query)
+        elif self.selected_mode == "npc":
+            if self.tile_manager.get_npc_names():
+                return self.tile_manager.search_assets("npcs", query)
+            return AssetSearchIndex((name, ["npc"]) for name in PALETTE_NPC_COLORS).search(query)
+        elif self.selected_mode == "object":
+            if self.tile_manager.get_object_names():
+                return self.tile_manager.search_assets("objects", query)
+            return AssetSearchIndex((name, ["object"]) for name in PALETTE_OBJECT_COLORS).search(query)
+        elif self.selected_mode == "trigger":
+            return AssetSearchIndex((name, [label]) for name, label in TRIGGER_TYPES.items()).search(query)
+        return []
     
-    def update_cursor_display(self):
-        self.canvas.delete("cursor")
-        x1, y1 = self.cursor_x * self.tile_size, self.cursor_y * self.tile_size
-        x2, y2 = x1 + self.tile_size, y1 + self.tile_size
-        self.canvas.create_rectangle(x1, y1, x2, y2, outline="red", width=3, tags="cursor")
-        self.cursor_label.config(text=f"Cursor: ({self.cursor_x}, {self.cursor_y})")
+    def palette_slot(self, i):
+        """Top-left canvas position of the i-th toolbox entry"""
+        columns = 5 if self.selected_mode == "tile" else 1
+        return (i % columns) * PALETTE_CELL + 10, (i // columns) * PALETTE_CELL + 10
     
+    @timed("update_tile_display")
     def update_tile_display(self):
+        """Rebuild the toolbox for the current mode and search text"""
         self.tile_canvas.delete("all")
-        
+        self.tile_manager.sprite_cache.release("palette")
+        self.palette_entries = self.palette_names()
+        self._palette_rows = None
+        
+        columns = 5 if self.selected_mode == "tile" else 1
+        rows = (len(self.palette_entries) + columns - 1) // columns
+        self.tile_canvas.configure(scrollregion=(0, 0, 200, rows * PALETTE_CELL + 10))
+        self.palette_selection = self.tile_canvas.create_rectangle(0, 0, 0, 0, outline="red", width=2,
+                                                                   state=tk.HIDDEN, tags="selection")
+        self.render_palette()
+        self.update_palette_selection()
+    
+    def on_palette_yview(self, *args):
+        self.tile_canvas.yview(*args)
+        self.render_palette()
+    
+    def render_palette(self, event=None):
+        """Create canvas items only for the toolbox rows currently scrolled into view"""
+        if not hasattr(self, 'palette_entries'):
+            return
+        columns = 5 if self.selected_mode == "tile" else 1
+        top = self.tile_canvas.canvasy(0)
+        height = max(self.tile_canvas.winfo_height(), PALETTE_CELL)
+        first_row = max(0, int((top - 10) // PALETTE_CELL) - 1)
+        last_row = int((top + height - 10) // PALETTE_CELL) + 1
+        if self._palette_rows == (first_row, last_row):
+            return
+        self._palette_rows = (first_row, last_row)
+        
+        self.tile_canvas.delete("palette")
+        self.tile_manager.sprite_cache.release("palette")
+        entries = self.palette_entries[first_row * columns:(last_row + 1) * columns]
+        for i, name in enumerate(entries, first_row * columns):
+            self._draw_palette_entry(name, *self.palette_slot(i))
+        self.tile_canvas.tag_raise("selection")
+    
+    def _draw_palette_entry(self, name, x, y):
+        canvas = self.tile_canvas
         if self.selected_mode == "tile":
-            tiles_per_row = 5
-            tile_names = self.tile_manager.get_tile_names()
-            for i, tile_name in enumerate(tile_names):
-                row, col = i // tiles_per_row, i % tiles_per_row
-                x, y = col * 40 + 10, row * 40 + 10
-                tile_info = self.tile_manager.get_tile_info(tile_name)
-                self.tile_canvas.create_image(x, y, image=tile_info["image"], anchor=tk.NW, tags=f"tile_{tile_name}")
-                if tile_name == self.selected_tile:
-                    self.tile_canvas.create_rectangle(x-2, y-2, x+34, y+34, outline="red", width=2, tags="selection")
+            tile_info = self.tile_manager.get_tile_info(name)
+            canvas.create_image(x, y, image=self.tile_manager.get_image(tile_info, "palette"),
+                                anchor=tk.NW, tags="palette")
         
         elif self.selected_mode == "npc":
-            npc_names = self.tile_manager.get_npc_names() or ["guard", "merchant", "villager", "wizard", "knight"]
-            for i, npc_name in enumerate(npc_names):
-                y = i * 40 + 10
-                npc_info = self.tile_manager.get_npc_info(npc_name)
-                if "image" in npc_info:
-                    self.tile_canvas.create_image(10, y, image=npc_info["image"], anchor=tk.NW, tags=f"npc_{npc_name}")
-                else:
-                    colors = {"guard": "#4169E1", "merchant": "#FFD700", "villager": "#90EE90",
-                             "wizard": "#9370DB", "knight": "#C0C0C0"}
-                    color = colors.get(npc_name, "#FFD700")
-                    self.tile_canvas.create_oval(10, y, 40, y + 30, fill=color, outline="black", tags=f"npc_{npc_name}")
-                self.tile_canvas.create_text(50, y + 15, text=npc_name.title(), anchor=tk.W)
-                if npc_name == self.selected_tile:
-                    self.tile_canvas.create_rectangle(8, y-2, 200, y + 32, outline="red", width=2, tags="selection")
+            npc_info = self.tile_manager.get_npc_info(name)
+            if "sprite" in npc_info:
+                canvas.create_image(x, y, image=self.tile_manager.get_image(npc_info, "palette"),
+                                    anchor=tk.NW, tags="palette")
+            else:
+                color = PALETTE_NPC_COLORS.get(name, "#FFD700")
+                canvas.create_oval(x, y, x + 30, y + 30, fill=color, outline="black", tags="palette")
+            canvas.create_text(x + 40, y + 15, text=name.title(), anchor=tk.W, tags="palette")
         
         elif self.selected_mode == "object":
-            obj_names = self.tile_manager.get_object_names() or ["item", "lever", "fountain", "chest", "barrel"]
-            for i, obj_name in enumerate(obj_names):
-                y = i * 40 + 10
-                obj_info = self.tile_manager.get_object_info(obj_name)
-                if "image" in obj_info:
-                    self.tile_canvas.create_image(10, y, image=obj_info["image"], anchor=tk.NW, tags=f"obj_{obj_name}")
-                else:
-                    colors = {"item": "#32CD32", "lever": "#FF4500", "fountain": "#00CED1",
-                             "chest": "#8B4513", "barrel": "#654321"}
-                    color = colors.get(obj_name, "#32CD32")
-                    self.tile_canvas.create_rectangle(10, y, 40, y + 30, fill=color, outline="black", tags=f"obj_{obj_name}")
-                self.tile_canvas.create_text(50, y + 15, text=obj_name.title(), anchor=tk.W)
-                if obj_name == self.selected_tile:
-                    self.tile_canvas.create_rectangle(8, y-2, 200, y + 32, outline="red", width=2, tags="selection")
+            obj_info = self.tile_manager.get_object_info(name)
+            if "sprite" in obj_info:
+                canvas.create_image(x, y, image=self.tile_manager.get_image(obj_info, "palette"),
+                                    anchor=tk.NW, tags="palette")
+            else:
+                color = PALETTE_OBJECT_COLORS.get(name, "#32CD32")
+                canvas.create_rectangle(x, y, x + 30, y + 30, fill=color, outline="black", tags="palette")
+            canvas.create_text(x + 40, y + 15, text=name.title(), anchor=tk.W, tags="palette")
         
         elif self.selected_mode == "trigger":
-            trigger_types = ["teleport", "inventory", "tile_update", "area_object", "game_end", "show_dialog", "custom"]
-            trigger_names = {
-                "teleport": "Teleport",
-                "inventory": "Inventory",
-                "tile_update": "Tile Update",
-                "area_object": "Area Object", 
-                "game_end": "Game End",
-                "show_dialog": "Show Dialog",
-                "custom": "Custom Script"
-            }
-            
-            for i, trigger_type in enumerate(trigger_types):
-                y = i * 40 + 10
-                color = self.trigger_colors[trigger_type]
-                
-                # Draw colored diamond preview
-                center_x, center_y = 25, y + 20
-                self.tile_canvas.create_polygon(center_x, y + 5, 40, center_y, center_x, y + 35, 10, center_y, 
-                                              fill=color, outline="black", tags=f"trigger_{trigger_type}")
-                self.tile_canvas.create_text(50, y + 20, text=trigger_names[trigger_type], anchor=tk.W)
-                
-                if trigger_type == self.selected_tile:
-                    self.tile_canvas.create_rectangle(8, y-2, 200, y + 32, outline="red", width=2, tags="selection")
-        
-        self.tile_canvas.configure(scrollregion=self.tile_canvas.bbox("all"))
+            # Draw colored diamond preview
+            center_x, center_y = x + 15, y + 20
+            canvas.create_polygon(center_x, y + 5, x + 30, center_y, center_x, y + 35, x, center_y,
+                                  fill=self.trigger_colors[name], outline="black", tags="palette")
+            canvas.create_text(x + 40, y + 20, text=TRIGGER_TYPES[name], anchor=tk.W, tags="palette")
+    
+    def update_palette_selection(self):
+        """Move the selection highlight without redrawing the toolbox"""
+        if self.selected_tile in self.palette_entries:
+            x, y = self.palette_slot(self.palette_entries.index(self.selected_tile))
+            right = x + 34 if self.selected_mode == "tile" else 200
+            self.tile_canvas.coords(self.palette_selection, x - 2, y - 2, right, y + 32)
+            self.tile_canvas.itemconfigure(self.palette_selection, state=tk.NORMAL)
+        else:
+            self.tile_canvas.itemconfigure(self.palette_selection, state=tk.HIDDEN)
         if hasattr(self, 'selected_tile_label'):
             self.selected_tile_label.config(text=f"Selected: {self.selected_tile}")
     
+    @timed("update_properties_display")
     def update_properties_display(self):
-        self.properties_text.configure(state='normal')
-        self.properties_text.delete(1.0, tk.END)
-        
+        """Refresh the properties panel, skipping cells whose content is unchanged"""
         tile = self.current_area.tiles[self.cursor_y][self.cursor_x]
-        objects_here = [obj for obj in self.current_area.objects if obj.x == self.cursor_x and obj.y == self.cursor_y]
-        triggers_here = [trig for trig in self.current_area.triggers if trig.x == self.cursor_x and trig.y == self.cursor_y]
+        objects_here = self.current_area.objects_at(self.cursor_x, self.cursor_y)
+        triggers_here = self.current_area.triggers_at(self.cursor_x, self.cursor_y)
+        
+        key = (id(self.current_area), id(self.tile_manager), self.cursor_x, self.cursor_y,
+               tile.type, tile.walkable_override,
+               tuple(obj.type for obj in objects_here),
+               tuple((trigger.name, trigger.get_description()) for trigger in triggers_here))
+        if key == getattr(self, '_properties_key', None):
+            if self.selected_trigger_index != self._properties_trigger_index:
+                self._move_trigger_marker(len(triggers_here))
+            return
+        self._properties_key = key
+        self._properties_trigger_index = self.selected_trigger_index
         
         info = f"Position: ({self.cursor_x}, {self.cursor_y})\n\n"
         tile_info = self.tile_manager.get_tile_info(tile.type)
@@ -441,14 +586,28 @@ class EditorMethods:
         
         if triggers_here:
             info += f"Triggers: ({len(triggers_here)})\n"
+            self._first_trigger_line = info.count("\n") + 1  # Text widget lines are 1-based
             for i, trigger in enumerate(triggers_here):
                 selected_marker = "● " if i == self.selected_trigger_index else "  "
                 info += f"{selected_marker}{i+1}. {trigger.name} ({trigger.get_description()})\n"
             info += f"\nPress {1 if len(triggers_here) == 1 else '1-' + str(len(triggers_here))} to select, Enter to edit\n"
         
+        self.properties_text.configure(state='normal')
+        self.properties_text.delete(1.0, tk.END)
         self.properties_text.insert(1.0, info)
         self.properties_text.configure(state='disabled')
     
+    def _move_trigger_marker(self, trigger_count):
+        """Rewrite only the two marker characters of the old and new selected trigger lines"""
+        self.properties_text.configure(state='normal')
+        for index, marker in ((self._properties_trigger_index, "  "), (self.selected_trigger_index, "● ")):
+            if 0 <= index < trigger_count:
+                line = self._first_trigger_line + index
+                self.properties_text.delete(f"{line}.0", f"{line}.2")
+                self.properties_text.insert(f"{line}.0", marker)
+        self.properties_text.configure(state='disabled')
+        self._properties_trigger_index = self.selected_trigger_index
+    
     def show_trigger_edit_dialog(self, trigger):
         """Open the edit dialog for a specific trigger"""
         dialog = tk.Toplevel(self.root)
@@ -601,29 +760,31 @@ class EditorMethods:
         button_frame.pack(fill=tk.X, padx=10, pady=10)
         
         def save_trigger():
-            # Update trigger name
-            trigger.name = name_var.get()
-            
-            # Update parameters based on type
+            # Build a new parameters dict so undo can restore the old one
+            parameters = dict(trigger.parameters)
             for param_name, param_var in param_vars.items():
                 if isinstance(param_var, tk.Text):
-                    trigger.parameters[param_name] = param_var.get(1.0, tk.END).strip()
+                    parameters[param_name] = param_var.get(1.0, tk.END).strip()
                 elif isinstance(param_var, tk.BooleanVar):
-                    trigger.parameters[param_name] = param_var.get()
+                    parameters[param_name] = param_var.get()
                 else:
                     value = param_var.get()
                     # Convert coordinates to integers
                     if param_name in ['x', 'y']:
                         try:
-                            trigger.parameters[param_name] = int(value)
+                            parameters[param_name] = int(value)
                         except ValueError:
-                            trigger.parameters[param_name] = 0
+                            parameters[param_name] = 0
                     else:
-                        trigger.parameters[param_name] = value
+                        parameters[param_name] = value
+            
+            self.apply_edit("Edit Trigger", AttrOp(trigger, cells=[(trigger.x, trigger.y)],
+                                                   name=name_var.get(), parameters=parameters))
+            error = self.compile_custom_trigger(trigger)
+            if error:
+                messagebox.showwarning("Trigger Script", f"Script has a syntax error:\n{error}")
             
             dialog.destroy()
-            self.update_properties_display()
-            self.draw_area()
         
         ttk.Button(button_frame, text="Save", command=save_trigger).pack(side=tk.RIGHT, padx=(5,0))
         ttk.Button(button_frame, text="Cancel", command=dialog.destroy).pack(side=tk.RIGHT)
\ No newline at end of file
@@ -8,6 +8,8 @@ import json
 import os
 from dataclasses import asdict
 
+from undo_history import AttrOp
+
 class FileManager:
     """Mixin class containing file management methods"""
     
@@ -15,15 +17,9 @@ class FileManager:
     def new_game(self):
         if messagebox.askyesno("New Game", "Create new game? Unsaved changes will be lost."):
             from data_classes import Game, Area
-            self.current_game = Game()
-            self.current_area = Area()
-            self.current_area_file = None
-            self.current_game_file = None
             self.cursor_x = self.cursor_y = 0
-            self.area_name_var.set(self.current_area.name)
-            self.game_name_label.config(text=self.current_game.name)
-            self.draw_area()
-            self.update_properties_display()
+            self.apply_edit("New Game", AttrOp(self, cells=None, current_game=Game(), current_area=Area(),
+                                               current_area_file=None, current_game_file=None))
     
     def save_game(self):
         if self.current_game_file:
@@ -43,7 +39,7 @@ class FileManager:
     
     def _save_game_to_file(self, filename):
         try:
-            with open(filename, 'w') as f:
+            with self.render_stats.measure("save_game"), open(filename, 'w') as f:
                 json.dump(asdict(self.current_game), f, indent=2)
             messagebox.showinfo("Save Game", f"Game saved to {filename}")
         except Exception as e:
@@ -57,23 +53,25 @@ class FileManager:
         )
         if filename:
             try:
-                with open(filename, 'r') as f:
-                    game_dict = json.load(f)
-                
-                from data_classes import Game
-                self.current_game = Game(**game_dict)
-                self.current_game_file = filename
-                self.game_name_label.config(text=self.current_game.name)
-                
-                loaded_areas = []
-                
-                # Load the first area if available
-                if self.current_game.areas:
-                    first_area_file = os.path.join("areas", self.current_game.areas[0])
-                    if os.path.exists(first_area_file):
-                        self._load_area_from_file(first_area_file, show_message=False)
-                        loaded_areas = [os.path.splitext(area)[0] for area in self.current_game.areas 
-                                      if os.path.exists(os.path.join("areas", area))]
+                with self.render_stats.measure("load_game"):
+                    with open(filename, 'r') as f:
+                        game_dict = json.load(f)
+                    
+                    from data_classes import Game
+                    self.current_game = Game(**game_dict)
+                    self.current_game_file = filename
+                    self.game_name_label.config(text=self.current_game.name)
+                    self.history.clear()
+                    
+                    loaded_areas = []
+                    
+                    # Load the first area if available
+                    if self.current_game.areas:
+                        first_area_file = os.path.join("areas", self.current_game.areas[0])
+                        if os.path.exists(first_area_file):
+                            self._load_area_from_file(first_area_file, show_message=False)
+                            loaded_areas = [os.path.splitext(area)[0] for area in self.current_game.areas 
+                                          if os.path.exists(os.path.join("areas", area))]
                 
                 # Show consolidated load message
                 self.show_load_message(
@@ -160,12 +158,8 @@ class FileManager:
     def new_area(self):
         if messagebox.askyesno("New Area", "Create new area? Unsaved changes will be lost."):
             from data_classes import Area
-            self.current_area = Area()
-            self.current_area_file = None
             self.cursor_x = self.cursor_y = 0
-            self.area_name_var.set(self.current_area.name)
-            self.draw_area()
-            self.update_properties_display()
+            self.apply_edit("New Area", AttrOp(self, cells=None, current_area=Area(), current_area_file=None))
     
     def save_area(self):
         if self.current_area_file:
@@ -186,8 +180,8 @@ class FileManager:
     
     def _save_area_to_file(self, filename):
         try:
-            with open(filename, 'w') as f:
-                json.dump(asdict(self.current_area), f, indent=2)
+            with self.render_stats.measure("save_area"), open(filename, 'w') as f:
+                json.dump(self.current_area.to_dict(), f, indent=2)
             messagebox.showinfo("Save Area", f"Area saved to {filename}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save area: {e}")
@@ -203,30 +197,32 @@ class FileManager:
     
     def _load_area_from_file(self, filename, show_message=True):
         try:
-            with open(filename, 'r') as f:
-                area_dict = json.load(f)
-            
-            from data_classes import Area, Tile, GameObject, Trigger
-            self.current_area = Area(**area_dict)
-            
-            # Reconstruct tile objects
-            for y, row in enumerate(self.current_area.tiles):
-                for x, tile_data in enumerate(row):
-                    if isinstance(tile_data, dict):
-                        self.current_area.tiles[y][x] = Tile(**tile_data)
+            with self.render_stats.measure("load_area"):
+                with open(filename, 'r') as f:
+                    area_dict = json.load(f)
+                
+                from data_classes import Area
+                self.current_area = Area.from_dict(area_dict)
             
-            self.current_area.objects = [GameObject(**obj) for obj in self.current_area.objects]
-            self.current_area.triggers = [Trigger(**trig) for trig in self.current_area.triggers]
+            # Compile custom trigger scripts now so errors show up at load time
+            script_errors = [error for error in map(self.compile_custom_trigger, self.current_area.triggers) if error]
+            for error in script_errors:
+                print(f"Syntax error in trigger {error}")
             
             self.current_area_file = filename
+            self.history.clear()  # Earlier edits refer to the area being replaced
             self.cursor_x = self.cursor_y = 0
+            self.active_layer = 0
             self.area_name_var.set(self.current_area.name)
-            self.draw_area()
-            self.update_properties_display()
+            self.update_layer_controls()
+            self.schedule_redraw(full=True, properties=True)
             
             if show_message:
                 area_name = os.path.splitext(os.path.basename(filename))[0]
                 self.show_load_message(loaded_areas=[area_name])
+            if script_errors:
+                messagebox.showwarning("Trigger Scripts", "Syntax errors in custom triggers:\n" +
+                                       "\n".join(script_errors))
                 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to open area: {e}")
@@ -255,6 +251,8 @@ class FileManager:
             for tile in row:
                 if tile.type != "empty":
                     used_tiles.add(tile.type)
+        for layer in self.current_area.layers[1:]:
+            used_tiles.update(tile.type for tile in layer.cells.values())
         
         for obj in self.current_area.objects:
             if obj.type in self.tile_manager.get_npc_names():
@@ -282,6 +280,8 @@ class FileManager:
                                 tile_type = 'empty'
                             if tile_type != "empty":
                                 used_tiles.add(tile_type)
+                    for layer_data in area_dict.get('layers', []):
+                        used_tiles.update(tile_data.get('type', 'empty') for tile_data in layer_data.get('palette', []))
                     
                     # Scan objects
                     for obj_data in area_dict.get('objects', []):
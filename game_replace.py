@@ -0,0 +1,159 @@
+"""
+Game-wide find and replace for the Tinker RPG Editor
+"""
+
+import os
+import json
+import tempfile
+from dataclasses import dataclass, replace
+from concurrent.futures import ThreadPoolExecutor
+
+from undo_history import TileOp, ContentOp, AttrOp
+
+@dataclass
+class ReplaceSpec:
+    """What to look for: an exact tile type, object type or trigger parameter value"""
+    find: str
+    replace: str
+    tiles: bool = True
+    objects: bool = True
+    triggers: bool = True  # String parameter values, e.g. the area of a teleport
+
+def _replaced_parameters(parameters, spec):
+    """A new parameters dict with matching string values replaced, or None when nothing matches"""
+    if not any(value == spec.find for value in parameters.values()):
+        return None
+    return {key: spec.replace if value == spec.find else value for key, value in parameters.items()}
+
+def replace_in_area_dict(area_dict, spec):
+    """Replace matches inside a saved area dict in place; returns per-kind counts"""
+    counts = {"tiles": 0, "objects": 0, "triggers": 0}
+    if spec.tiles:
+        for row in area_dict.get("tiles", []):
+            for tile_data in row:
+                if isinstance(tile_data, dict) and tile_data.get("type") == spec.find:
+                    tile_data["type"] = spec.replace
+                    counts["tiles"] += 1
+        for layer_data in area_dict.get("layers", []):
+            cells = layer_data.get("cells", [])
+            for index, tile_data in enumerate(layer_data.get("palette", [])):
+                if tile_data.get("type") == spec.find:
+                    tile_data["type"] = spec.replace
+                    counts["tiles"] += cells[2::3].count(index)
+    if spec.objects:
+        for obj_data in area_dict.get("objects", []):
+            if obj_data.get("type") == spec.find:
+                obj_data["type"] = spec.replace
+                counts["objects"] += 1
+    if spec.triggers:
+        for trig_data in area_dict.get("triggers", []):
+            parameters = _replaced_parameters(trig_data.get("parameters") or {}, spec)
+            if parameters is not None:
+                trig_data["parameters"] = parameters
+                counts["triggers"] += 1
+    return counts
+
+def replace_ops(area, spec):
+    """Undo ops that apply spec to an area in memory, and the per-kind counts"""
+    counts = {"tiles": 0, "objects": 0, "triggers": 0}
+    ops = []
+    if spec.tiles:
+        replacements = {}  # id(old tile) -> new tile, so shared tiles stay shared
+        changes = []
+        for y, row in enumerate(area.tiles):
+            for x, tile in enumerate(row):
+                if tile.type == spec.find:
+                    new_tile = replacements.get(id(tile))
+                    if new_tile is None:
+                        new_tile = replacements[id(tile)] = replace(tile, type=spec.replace)
+                    changes.append((x, y, tile, new_tile))
+        ops.append(TileOp(area, changes))
+        upper_changes = []  # One change list per upper layer
+        for layer_index, layer in enumerate(area.layers[1:], 1):
+            layer_changes = []
+            for (x, y), tile in layer.cells.items():
+                if tile.type == spec.find:
+                    new_tile = replacements.get(id(tile))
+                    if new_tile is None:
+                        new_tile = replacements[id(tile)] = replace(tile, type=spec.replace)
+                    layer_changes.append((x, y, tile, new_tile))
+            upper_changes.append(layer_changes)
+            ops.append(TileOp(area, layer_changes, layer_index))
+        counts["tiles"] = len(changes) + sum(len(layer_changes) for layer_changes in upper_changes)
+    if spec.objects:
+        removed = [area.objects[row] for row in area.objects.rows_of_type(spec.find)]
+        counts["objects"] = len(removed)
+        ops.append(ContentOp(area, "objects", removed=removed,
+                             added=[replace(obj, type=spec.replace) for obj in removed]))
+    if spec.triggers:
+        for trig in area.triggers:
+            parameters = _replaced_parameters(trig.parameters, spec)
+            if parameters is not None:
+                counts["triggers"] += 1
+                ops.append(AttrOp(trig, cells=[(trig.x, trig.y)], parameters=parameters))
+    return ops, counts
+
+def _scan_file(path, spec):
+    with open(path, 'r') as f:
+        area_dict = json.load(f)
+    return replace_in_area_dict(area_dict, spec)
+
+def _stage_file(path, spec):
+    """Write the replaced area next to path; returns (counts, temp path or None)"""
+    with open(path, 'r') as f:
+        area_dict = json.load(f)
+    counts = replace_in_area_dict(area_dict, spec)
+    if not any(counts.values()):
+        return counts, None
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(area_dict, f, indent=2)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return counts, tmp_path
+
+class GameReplace:
+    """Find and replace over a list of area files on a thread pool.
+
+    preview() only counts. apply() writes every changed area to a temporary
+    file first and moves them into place only once all of them were
+    written, so a failure part way leaves every area file untouched.
+    """
+
+    def __init__(self, paths, spec, max_workers=None):
+        self.paths = list(paths)
+        self.spec = spec
+        self.max_workers = max_workers or min(8, (os.cpu_count() or 1) + 2)
+
+    def _run(self, work):
+        """Run work(path, spec) for every path; returns {path: result or exception}"""
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {path: pool.submit(work, path, self.spec) for path in self.paths}
+            for path, future in futures.items():
+                try:
+                    results[path] = future.result()
+                except Exception as e:
+                    results[path] = e
+        return results
+
+    def preview(self):
+        """Per-file match counts, or the exception that kept a file from being read"""
+        return self._run(_scan_file)
+
+    def apply(self):
+        """Replace in every file; returns per-file counts or raises without changing any file"""
+        staged = self._run(_stage_file)
+        failures = [(path, result) for path, result in staged.items() if isinstance(result, Exception)]
+        if failures:
+            for result in staged.values():
+                if not isinstance(result, Exception) and result[1]:
+                    os.remove(result[1])
+            path, error = failures[0]
+            raise OSError(f"{os.path.basename(path)}: {error}")
+        for path, (counts, tmp_path) in staged.items():
+            if tmp_path:
+                os.replace(tmp_path, path)
+        return {path: counts for path, (counts, tmp_path) in staged.items()}
@@ -0,0 +1,123 @@
+"""
+Minimap panel for the Tinker RPG Editor
+"""
+
+import tkinter as tk
+from operator import attrgetter
+from PIL import Image, ImageTk
+
+MINIMAP_SIZE = 200  # Widget size in pixels
+EMPTY_COLOR = (255, 255, 255)
+OVERFLOW_COLOR = (128, 128, 128)  # Used once the 256-entry palette is full
+BULK_UPDATE_CELLS = 1024  # Edits touching more cells re-render the whole image once
+
+class Minimap:
+    """Overview of the whole area at 1-2 px per cell with click-to-jump.
+
+    The area is kept as a bytearray of palette indices, one byte per cell, so
+    a refresh is a single Image.frombytes over the grid and an edit only
+    rewrites the bytes of the touched cells.
+    """
+
+    def __init__(self, parent, on_jump):
+        self.on_jump = on_jump  # called as on_jump(x, y)
+        self.canvas = tk.Canvas(parent, width=MINIMAP_SIZE, height=MINIMAP_SIZE, bg="white",
+                                highlightthickness=0)
+        self.canvas.bind('<Button-1>', self._on_click)
+        self.canvas.bind('<B1-Motion>', self._on_click)
+        self.image_item = self.canvas.create_image(0, 0, anchor=tk.NW)
+        self.viewport_item = self.canvas.create_rectangle(0, 0, 0, 0, outline="red")
+        self.area = None
+        self.tile_manager = None
+        self.scale = 1
+        self.grid = bytearray()
+        self.photo = None
+
+    def pack(self, **kwargs):
+        self.canvas.pack(**kwargs)
+
+    def set_area(self, area, tile_manager):
+        """Index every cell of the area; needed when the area or its size changes"""
+        self.area = area
+        self.tile_manager = tile_manager
+        self.palette_index = {"empty": 0}
+        self.palette = list(EMPTY_COLOR)
+        self.scale = 2 if max(area.width, area.height) * 2 <= MINIMAP_SIZE else 1
+
+        # Known types resolve through a plain dict lookup; new ones fall back to _palette_entry
+        lookup = self.palette_index
+        get_type = attrgetter("type")
+        self.grid = bytearray(area.width * area.height)
+        for y, row in enumerate(area.tiles):
+            types = list(map(get_type, row))
+            try:
+                row_bytes = bytes(map(lookup.__getitem__, types))
+            except KeyError:
+                row_bytes = bytes(map(self._palette_entry, types))
+            self.grid[y * area.width:(y + 1) * area.width] = row_bytes
+        self.refresh()
+
+    def is_showing(self, area, tile_manager):
+        return (self.area is area and self.tile_manager is tile_manager
+                and len(self.grid) == area.width * area.height)
+
+    def _palette_entry(self, tile_type):
+        index = self.palette_index.get(tile_type)
+        if index is None:
+            if len(self.palette_index) >= 255:
+                return 255
+            index = len(self.palette_index)
+            self.palette_index[tile_type] = index
+            self.palette += self.tile_manager.get_tile_color(tile_type)
+        return index
+
+    def refresh(self):
+        """Re-render the whole minimap image from the index grid"""
+        area = self.area
+        image = Image.frombytes("P", (area.width, area.height), bytes(self.grid))
+        image.putpalette(self.palette + list(OVERFLOW_COLOR) * (256 - len(self.palette) // 3))
+        if self.scale != 1:
+            image = image.resize((area.width * self.scale, area.height * self.scale), Image.NEAREST)
+        self.pil_image = image.convert("RGB")
+        self.photo = ImageTk.PhotoImage(self.pil_image)
+        self.canvas.itemconfigure(self.image_item, image=self.photo)
+        self.canvas.configure(scrollregion=(0, 0, area.width * self.scale, area.height * self.scale))
+
+    def update_cells(self, cells):
+        """Rewrite only the pixels of edited cells"""
+        if self.area is None:
+            return
+        area, scale = self.area, self.scale
+        if len(cells) > BULK_UPDATE_CELLS:
+            for x, y in cells:
+                if 0 <= x < area.width and 0 <= y < area.height:
+                    self.grid[y * area.width + x] = self._palette_entry(area.tiles[y][x].type)
+            self.refresh()
+            return
+        for x, y in cells:
+            if not (0 <= x < area.width and 0 <= y < area.height):
+                continue
+            index = self._palette_entry(area.tiles[y][x].type)
+            self.grid[y * area.width + x] = index
+            color = tuple(self.palette[index * 3:index * 3 + 3]) if index < 255 else OVERFLOW_COLOR
+            box = (x * scale, y * scale, (x + 1) * scale, (y + 1) * scale)
+            self.pil_image.paste(color, box)
+            # Fill just this cell's pixels in the Tk photo instead of re-uploading the image
+            self.canvas.tk.call(str(self.photo), "put", "#%02x%02x%02x" % color, "-to", *box)
+
+    def set_viewport(self, x0, y0, x1, y1):
+        """Outline the cells visible in the area canvas and keep them in view"""
+        scale = self.scale
+        self.canvas.coords(self.viewport_item, x0 * scale, y0 * scale, x1 * scale, y1 * scale)
+        self.canvas.tag_raise(self.viewport_item)
+        if self.area is not None and max(self.area.width, self.area.height) * scale > MINIMAP_SIZE:
+            self.canvas.xview_moveto(max(0.0, ((x0 + x1) / 2 * scale - MINIMAP_SIZE / 2) / (self.area.width * scale)))
+            self.canvas.yview_moveto(max(0.0, ((y0 + y1) / 2 * scale - MINIMAP_SIZE / 2) / (self.area.height * scale)))
+
+    def _on_click(self, event):
+        if self.area is None:
+            return
+        x = int(self.canvas.canvasx(event.x) // self.scale)
+        y = int(self.canvas.canvasy(event.y) // self.scale)
+        if 0 <= x < self.area.width and 0 <= y < self.area.height:
+            self.on_jump(x, y)
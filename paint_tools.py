@@ -0,0 +1,79 @@
+"""
+Bulk tile painting shapes for the Tinker RPG Editor
+"""
+
+from data_classes import EMPTY_TILE
+
+def rect_cells(x0, y0, x1, y1):
+    """Every cell of the rectangle spanned by two corners, inclusive"""
+    left, right = sorted((x0, x1))
+    top, bottom = sorted((y0, y1))
+    return [(x, y) for y in range(top, bottom + 1) for x in range(left, right + 1)]
+
+def line_cells(x0, y0, x1, y1):
+    """Cells on the Bresenham line between two cells, inclusive"""
+    cells = []
+    dx, dy = abs(x1 - x0), -abs(y1 - y0)
+    step_x = 1 if x0 < x1 else -1
+    step_y = 1 if y0 < y1 else -1
+    error = dx + dy
+    x, y = x0, y0
+    while True:
+        cells.append((x, y))
+        if (x, y) == (x1, y1):
+            return cells
+        doubled = 2 * error
+        if doubled >= dy:
+            error += dy
+            x += step_x
+        if doubled <= dx:
+            error += dx
+            y += step_y
+
+def flood_cells(area, x, y, layer=0):
+    """Cells 4-connected to (x, y) that share its tile type on a layer, found by scanline fill.
+
+    Each popped seed is widened to the full horizontal run of matching cells,
+    and only one seed per run is pushed for the rows above and below, so the
+    work stays proportional to the filled region. Upper layers are read
+    straight from their sparse cells.
+    """
+    if layer == 0:
+        rows = area.tiles
+
+        def type_at(cx, cy):
+            return rows[cy][cx].type
+    else:
+        cells = area.layers[layer].cells
+
+        def type_at(cx, cy):
+            return cells.get((cx, cy), EMPTY_TILE).type
+
+    width, height = area.width, area.height
+    target = type_at(x, y)
+    filled = set()
+    seeds = [(x, y)]
+    while seeds:
+        x, y = seeds.pop()
+        if (x, y) in filled:
+            continue
+        left = x
+        while left > 0 and type_at(left - 1, y) == target and (left - 1, y) not in filled:
+            left -= 1
+        right = x
+        while right < width - 1 and type_at(right + 1, y) == target and (right + 1, y) not in filled:
+            right += 1
+        filled.update((cx, y) for cx in range(left, right + 1))
+
+        for ny in (y - 1, y + 1):
+            if not 0 <= ny < height:
+                continue
+            in_run = False
+            for cx in range(left, right + 1):
+                if type_at(cx, ny) == target and (cx, ny) not in filled:
+                    if not in_run:
+                        seeds.append((cx, ny))
+                        in_run = True
+                else:
+                    in_run = False
+    return sorted(filled, key=lambda cell: (cell[1], cell[0]))
@@ -0,0 +1,57 @@
+"""
+Frame-time statistics for the Tinker RPG Editor
+"""
+
+import time
+import functools
+from collections import deque
+from contextlib import contextmanager
+
+ROLLING_WINDOW = 30  # Samples kept per timing for the rolling average
+
+class RenderStats:
+    """Last and rolling-average durations of named editor operations"""
+
+    def __init__(self, window=ROLLING_WINDOW):
+        self.window = window
+        self.samples = {}  # name -> deque of durations in seconds
+        self.counts = {}  # name -> total number of samples recorded
+
+    def record(self, name, seconds):
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=self.window)
+        samples.append(seconds)
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    @contextmanager
+    def measure(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def summary(self):
+        """Return {name: {"last_ms", "avg_ms", "count"}} in recording order"""
+        return {name: {"last_ms": samples[-1] * 1000,
+                       "avg_ms": sum(samples) / len(samples) * 1000,
+                       "count": self.counts[name]}
+                for name, samples in self.samples.items()}
+
+    def format_lines(self):
+        return [f"{name}: {timing['last_ms']:.1f} ms (avg {timing['avg_ms']:.1f}, n={timing['count']})"
+                for name, timing in self.summary().items()]
+
+def timed(name):
+    """Record a method's duration in self.render_stats when the editor has one"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            stats = getattr(self, 'render_stats', None)
+            if stats is None:
+                return method(self, *args, **kwargs)
+            with stats.measure(name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
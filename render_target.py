@@ -0,0 +1,187 @@
+"""
+Drawing backends for area rendering in the Tinker RPG Editor
+"""
+
+import tkinter as tk
+from PIL import Image, ImageDraw, ImageFont, ImageTk
+
+PHOTO_CACHE_SIZE = 512  # PhotoImages a CanvasTarget keeps beyond those shown by live items
+
+class CanvasTarget:
+    """Draws onto a Tk canvas; every call returns the created item id.
+
+    Sprites are pinned in the sprite cache under holder, one pin per item.
+    Items deleted or released through the target give their pin back; the
+    editor releases the rest at once when the canvas is rebuilt.
+
+    Composites and pasted images are owned by the target. Their PhotoImages
+    must outlive the items showing them, so once there are more than
+    PHOTO_CACHE_SIZE the ones no live item shows are dropped, least recently
+    used composites first.
+    """
+
+    def __init__(self, canvas, tile_manager, holder="area"):
+        self.canvas = canvas
+        self.tile_manager = tile_manager
+        self.holder = holder
+        self.clear()
+
+    def clear(self):
+        """Drop every PhotoImage this target created; only once its items are deleted"""
+        self._photos = {}  # Item -> PhotoImage of a pasted Pillow image
+        self._composites = {}  # Composite key -> PhotoImage shared by every cell showing it, oldest use first
+        self._composite_keys = {}  # Item -> composite key it shows
+        self._sprites = {}  # Item -> (info, size) of the sprite it pins
+        self._photo_limit = PHOTO_CACHE_SIZE
+
+    def sprite(self, x, y, info, size):
+        item = self.canvas.create_image(x, y, image=self.tile_manager.get_image(info, self.holder, size),
+                                        anchor=tk.NW)
+        self._sprites[item] = (info, size)
+        return item
+
+    def set_sprite(self, item, info, size):
+        """Point an existing sprite item at a different asset"""
+        # Pin the new sprite before unpinning the old one so a shared sprite is never evicted in between
+        image = self.tile_manager.get_image(info, self.holder, size)
+        self._forget(item)
+        self.canvas.itemconfigure(item, image=image)
+        self._sprites[item] = (info, size)
+
+    def release(self, item):
+        """Blank an image item and let go of what it showed, e.g. when its cell scrolls out of view"""
+        self._forget(item)
+        self.canvas.itemconfigure(item, image="")
+
+    def delete(self, item):
+        self._forget(item)
+        self.canvas.delete(item)
+
+    def _forget(self, item):
+        sprite = self._sprites.pop(item, None)
+        if sprite is not None:
+            self.tile_manager.release_image(sprite[0], self.holder, sprite[1])
+        self._composite_keys.pop(item, None)
+        self._photos.pop(item, None)
+
+    def _composite_photo(self, key, pil_image):
+        photo = self._composites.pop(key, None)
+        if photo is None:
+            photo = ImageTk.PhotoImage(pil_image)
+        self._composites[key] = photo
+        return photo
+
+    def composite(self, x, y, key, pil_image):
+        """Like paste, but the image is uploaded once per key"""
+        item = self.canvas.create_image(x, y, image=self._composite_photo(key, pil_image), anchor=tk.NW)
+        self._composite_keys[item] = key
+        self._trim()
+        return item
+
+    def set_composite(self, item, key, pil_image):
+        self._forget(item)
+        self.canvas.itemconfigure(item, image=self._composite_photo(key, pil_image))
+        self._composite_keys[item] = key
+        self._trim()
+
+    def paste(self, x, y, pil_image):
+        photo = ImageTk.PhotoImage(pil_image)
+        item = self.canvas.create_image(x, y, image=photo, anchor=tk.NW)
+        self._photos[item] = photo
+        self._trim()
+        return item
+
+    def _trim(self):
+        """Forget deleted items and the composites nobody shows once over the limit"""
+        if len(self._composites) + len(self._photos) <= self._photo_limit:
+            return
+        # Tk never reuses item ids, so an id without a type has been deleted
+        self._photos = {item: photo for item, photo in self._photos.items() if self.canvas.type(item)}
+        self._composite_keys = {item: key for item, key in self._composite_keys.items() if self.canvas.type(item)}
+        shown = set(self._composite_keys.values())
+        for key in [key for key in self._composites if key not in shown]:
+            if len(self._composites) + len(self._photos) <= PHOTO_CACHE_SIZE:
+                break
+            del self._composites[key]
+        # What is left is in use; check again only after it doubles so trimming stays amortized O(1)
+        self._photo_limit = max(PHOTO_CACHE_SIZE, 2 * (len(self._composites) + len(self._photos)))
+
+    def rectangle(self, x1, y1, x2, y2, fill, outline, width=1):
+        return self.canvas.create_rectangle(x1, y1, x2, y2, fill=fill, outline=outline, width=width)
+
+    def oval(self, x1, y1, x2, y2, fill, outline, width=1):
+        return self.canvas.create_oval(x1, y1, x2, y2, fill=fill, outline=outline, width=width)
+
+    def polygon(self, points, fill, outline, width=1):
+        return self.canvas.create_polygon(*points, fill=fill, outline=outline, width=width)
+
+    def line(self, x1, y1, x2, y2, fill, width=1):
+        return self.canvas.create_line(x1, y1, x2, y2, fill=fill, width=width)
+
+    def text(self, x, y, text, fill, size):
+        """Bold text centered on (x, y); size is the font size in points"""
+        return self.canvas.create_text(x, y, text=text, fill=fill, font=("Arial", size, "bold"))
+
+class ImageTarget:
+    """Draws into an in-memory Pillow image, for rendering without a display.
+
+    Coordinates are area pixel coordinates; origin is the area pixel that
+    lands at the top-left corner of the image. Calls return None.
+    """
+
+    def __init__(self, tile_manager, width, height, origin=(0, 0), background="white"):
+        self.tile_manager = tile_manager
+        self.image = Image.new("RGB", (max(1, width), max(1, height)), background)
+        self.draw = ImageDraw.Draw(self.image)
+        self.origin = origin
+        self._fonts = {}
+
+    def _xy(self, x, y):
+        return x - self.origin[0], y - self.origin[1]
+
+    def _box(self, x1, y1, x2, y2):
+        # Tk fills up to but not including x2/y2, Pillow includes them
+        (x1, y1), (x2, y2) = self._xy(x1, y1), self._xy(x2, y2)
+        return x1, y1, x2 - 1, y2 - 1
+
+    def sprite(self, x, y, info, size):
+        self._paste_at(self._xy(x, y), self.tile_manager.get_pil_image(info, size))
+
+    def paste(self, x, y, pil_image):
+        self._paste_at(self._xy(x, y), pil_image)
+
+    def composite(self, x, y, key, pil_image):
+        self._paste_at(self._xy(x, y), pil_image)
+
+    def _paste_at(self, position, pil_image):
+        if pil_image is None:
+            return
+        position = tuple(map(int, position))
+        if pil_image.mode in ("RGBA", "LA", "P"):
+            pil_image = pil_image.convert("RGBA")
+            self.image.paste(pil_image, position, pil_image)
+        else:
+            self.image.paste(pil_image.convert("RGB"), position)
+
+    def rectangle(self, x1, y1, x2, y2, fill, outline, width=1):
+        self.draw.rectangle(self._box(x1, y1, x2, y2), fill=fill, outline=outline, width=width)
+
+    def oval(self, x1, y1, x2, y2, fill, outline, width=1):
+        self.draw.ellipse(self._box(x1, y1, x2, y2), fill=fill, outline=outline, width=width)
+
+    def polygon(self, points, fill, outline, width=1):
+        xy = [self._xy(points[i], points[i + 1]) for i in range(0, len(points), 2)]
+        self.draw.polygon(xy, fill=fill, outline=outline, width=width)
+
+    def line(self, x1, y1, x2, y2, fill, width=1):
+        self.draw.line(self._xy(x1, y1) + self._xy(x2, y2), fill=fill, width=width)
+
+    def text(self, x, y, text, fill, size):
+        font = self._fonts.get(size)
+        if font is None:
+            # Tk font sizes are points; treat them as pixels so output doesn't depend on screen dpi
+            font = self._fonts[size] = ImageFont.load_default(max(1, size))
+        self.draw.text(self._xy(x, y), text, fill=fill, font=font, anchor="mm")
+
+    def save(self, path):
+        self.image.save(path)
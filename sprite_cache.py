@@ -0,0 +1,203 @@
+"""
+Memory-budgeted sprite cache for the Tinker RPG Editor
+"""
+
+from collections import OrderedDict
+from PIL import Image, ImageTk
+
+DEFAULT_CACHE_BUDGET = 64 * 1024 * 1024  # bytes
+
+def image_bytes(pil_image):
+    """Approximate resident size of a decoded image"""
+    width, height = pil_image.size
+    return width * height * len(pil_image.getbands())
+
+def scale_sprite(pil_image, size):
+    """Scale a sprite to size x size: box-filtered when shrinking, blocky when growing"""
+    if pil_image.size[0] > size:
+        return pil_image.resize((size, size), Image.BOX)
+    return pil_image.resize((size, size), Image.NEAREST)
+
+class SpriteCache:
+    """LRU cache of decoded sprites and their PhotoImages with a byte budget.
+
+    Entries are keyed by sprite digest. Evicted entries keep their source path
+    and are transparently reloaded on the next request. Scaled variants for
+    other zoom levels are derived lazily from the base sprite and cached (and
+    evicted) like any other entry. Sprites currently shown on a canvas are
+    pinned by a holder name ("area", "palette", ...) and are never evicted
+    until that holder releases them, all at once or one pin at a time.
+
+    Only unpinned entries holding something evictable are kept in the LRU
+    lists, so eviction never walks past pinned sprites.
+    """
+
+    def __init__(self, loader, budget_bytes=DEFAULT_CACHE_BUDGET):
+        self.loader = loader  # path -> decoded PIL image
+        self.budget_bytes = budget_bytes
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = {}  # key -> entry
+        self._photo_lru = OrderedDict()  # unpinned keys with a PhotoImage, least recently used first
+        self._decoded_lru = OrderedDict()  # unpinned reloadable keys with only a decoded image
+        self._pins = {}  # holder -> {key: pin count}
+        self._pin_counts = {}  # key -> pins over all holders
+
+    def register(self, key, path=None, pil_image=None):
+        """Add a sprite; entries without a path can never be evicted"""
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = {"path": path, "pil_image": None, "photo": None, "bytes": 0, "assets": []}
+            self._entries[key] = entry
+        elif entry["path"] is None and path is not None:
+            entry["path"] = path
+        if pil_image is not None and entry["pil_image"] is None:
+            entry["pil_image"] = pil_image
+            entry["native_size"] = pil_image.size[0]
+            self._charge(entry, image_bytes(pil_image))
+            self._track(key)
+            self._evict()
+        return entry
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def entries(self):
+        return self._entries.items()
+
+    def get_pil(self, key, size=None):
+        key = self._variant_key(key, size)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry["pil_image"] is not None:
+            self.hits += 1
+            self._track(key)
+            return entry["pil_image"]
+        self.misses += 1
+        if "base" in entry:
+            pil_image = scale_sprite(self.get_pil(entry["base"]), entry["size"])
+        else:
+            pil_image = self.loader(entry["path"])
+        entry["pil_image"] = pil_image
+        self._charge(entry, image_bytes(pil_image))
+        self._track(key)
+        self._evict()
+        return pil_image
+
+    def get_photo(self, key, holder=None, size=None):
+        """Return the PhotoImage for a sprite, pinning it to holder if given"""
+        key = self._variant_key(key, size)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if holder is not None:
+            held = self._pins.setdefault(holder, {})
+            held[key] = held.get(key, 0) + 1
+            self._pin_counts[key] = self._pin_counts.get(key, 0) + 1
+        if entry["photo"] is not None:
+            self.hits += 1
+            self._track(key)
+            return entry["photo"]
+        pil_image = self.get_pil(key)
+        entry["photo"] = ImageTk.PhotoImage(pil_image)
+        self._charge(entry, image_bytes(pil_image))
+        self._track(key)
+        self._evict()
+        return entry["photo"]
+
+    def unpin(self, key, holder, size=None):
+        """Drop one pin that get_photo took for holder"""
+        key = self._variant_key(key, size)
+        held = self._pins.get(holder, {})
+        if key not in held:
+            return
+        held[key] -= 1
+        if not held[key]:
+            del held[key]
+        self._drop_pins(key, 1)
+        self._evict()
+
+    def release(self, holder):
+        """Unpin every sprite held by holder so it becomes evictable again"""
+        for key, count in self._pins.pop(holder, {}).items():
+            self._drop_pins(key, count)
+        self._evict()
+
+    def set_budget(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self._evict()
+
+    def clear(self):
+        for entry in self._entries.values():
+            if entry["path"] is not None or "base" in entry:
+                entry["pil_image"] = None
+            entry["photo"] = None
+            entry["bytes"] = image_bytes(entry["pil_image"]) if entry["pil_image"] is not None else 0
+        self.used_bytes = sum(entry["bytes"] for entry in self._entries.values())
+        self._pins.clear()
+        self._pin_counts.clear()
+        self._photo_lru.clear()
+        self._decoded_lru.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "used_bytes": self.used_bytes,
+            "budget_bytes": self.budget_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "pinned": len(self._pin_counts),
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+    def _variant_key(self, key, size):
+        """Return the cache key for a sprite scaled to size x size pixels"""
+        base = self._entries.get(key)
+        if size is None or base is None or "base" in base or size == base.get("native_size"):
+            return key
+        variant_key = f"{key}@{size}"
+        if variant_key not in self._entries:
+            self._entries[variant_key] = {"path": None, "base": key, "size": size, "pil_image": None,
+                                          "photo": None, "bytes": 0, "assets": []}
+        return variant_key
+
+    def _charge(self, entry, nbytes):
+        entry["bytes"] += nbytes
+        self.used_bytes += nbytes
+
+    def _drop_pins(self, key, count):
+        remaining = self._pin_counts[key] - count
+        if remaining:
+            self._pin_counts[key] = remaining
+        else:
+            del self._pin_counts[key]
+            self._track(key)
+
+    def _track(self, key):
+        """File an entry under the LRU list it can be evicted from, as most recently used"""
+        self._photo_lru.pop(key, None)
+        self._decoded_lru.pop(key, None)
+        if key in self._pin_counts:
+            return
+        entry = self._entries[key]
+        if entry["photo"] is not None:
+            self._photo_lru[key] = entry
+        elif entry["pil_image"] is not None and (entry["path"] is not None or "base" in entry):
+            self._decoded_lru[key] = entry
+
+    def _evict(self):
+        # Drop PhotoImages first (cheap to rebuild from the decoded image),
+        # then the decoded images themselves, least recently used first
+        for stage, lru in (("photo", self._photo_lru), ("pil_image", self._decoded_lru)):
+            while lru and self.used_bytes > self.budget_bytes:
+                key, entry = lru.popitem(last=False)
+                nbytes = image_bytes(entry["pil_image"])
+                entry[stage] = None
+                self._charge(entry, -nbytes)
+                self.evictions += 1
+                self._track(key)
@@ -0,0 +1,157 @@
+"""
+Region copy/paste and prefab stamps for the Tinker RPG Editor
+"""
+
+import os
+import json
+import tempfile
+from copy import deepcopy
+from dataclasses import dataclass, asdict, replace
+from typing import List
+
+from data_classes import Tile, GameObject, Trigger
+from undo_history import TileOp, ContentOp
+
+STAMPS_DIR = "stamps"
+
+@dataclass
+class Stamp:
+    """A rectangular piece of an area; object and trigger positions are relative to its corner.
+
+    Tiles come from one tile layer and are the very Tile objects of the
+    source area, which is safe because edits replace tiles instead of
+    mutating them, so a copy costs one reference per cell until either side
+    changes. Objects and triggers can be edited in place, so the stamp and
+    every paste get their own copies of their properties and parameters.
+    """
+    name: str = "Untitled Stamp"
+    width: int = 0
+    height: int = 0
+    tiles: List[List[Tile]] = None
+    objects: List[GameObject] = None
+    triggers: List[Trigger] = None
+
+    def __post_init__(self):
+        if self.tiles is None:
+            self.tiles = []
+        if self.objects is None:
+            self.objects = []
+        if self.triggers is None:
+            self.triggers = []
+
+def region_bounds(x0, y0, x1, y1):
+    """Normalize two corners to (left, top, right, bottom), inclusive"""
+    left, right = sorted((x0, x1))
+    top, bottom = sorted((y0, y1))
+    return left, top, right, bottom
+
+def _layer_rows(area, layer, left, top, right, bottom):
+    """Rows of tiles of one layer inside a rectangle, empty tiles included"""
+    if layer == 0:
+        return [row[left:right + 1] for row in area.tiles[top:bottom + 1]]
+    return [[area.layer_tile(layer, x, y) for x in range(left, right + 1)] for y in range(top, bottom + 1)]
+
+def _moved_object(obj, dx, dy):
+    return replace(obj, x=obj.x + dx, y=obj.y + dy, properties=deepcopy(obj.properties))
+
+def _moved_trigger(trig, dx, dy):
+    return replace(trig, x=trig.x + dx, y=trig.y + dy, parameters=deepcopy(trig.parameters))
+
+def copy_region(area, x0, y0, x1, y1, name="Untitled Stamp", layer=0):
+    """Capture the tiles of a layer, objects and triggers inside a rectangle of the area"""
+    left, top, right, bottom = region_bounds(x0, y0, x1, y1)
+    left, top = max(0, left), max(0, top)
+    right, bottom = min(area.width - 1, right), min(area.height - 1, bottom)
+    return Stamp(
+        name=name,
+        width=right - left + 1,
+        height=bottom - top + 1,
+        tiles=_layer_rows(area, layer, left, top, right, bottom),
+        objects=[_moved_object(obj, -left, -top) for obj in area.objects_in(left, top, right, bottom)],
+        triggers=[_moved_trigger(trig, -left, -top) for trig in area.triggers_in(left, top, right, bottom)]
+    )
+
+def clear_ops(area, x0, y0, x1, y1, layer=0):
+    """Ops that empty a rectangle: tiles of a layer back to empty, objects and triggers removed"""
+    left, top, right, bottom = region_bounds(x0, y0, x1, y1)
+    cells = [(x, y) for y in range(top, bottom + 1) for x in range(left, right + 1)]
+    return [TileOp.fill(area, cells, "empty", layer),
+            ContentOp(area, "objects", removed=area.objects_in(left, top, right, bottom)),
+            ContentOp(area, "triggers", removed=area.triggers_in(left, top, right, bottom))]
+
+def paste_ops(area, stamp, x, y, layer=0):
+    """Ops that place a stamp with its top-left corner at (x, y) on a tile layer, clipped to the area.
+
+    Whatever was inside the covered rectangle is replaced. Pasted objects and
+    triggers are fresh copies; triggers whose names are taken get the next
+    free trigger_N name.
+    """
+    right = min(area.width, x + stamp.width) - 1
+    bottom = min(area.height, y + stamp.height) - 1
+
+    def inside(item):
+        return x <= item.x <= right and y <= item.y <= bottom
+
+    tile_changes = []
+    for sy, row in enumerate(stamp.tiles[:max(0, bottom - y + 1)]):
+        area_row = _layer_rows(area, layer, x, y + sy, right, y + sy)[0]
+        for sx, tile in enumerate(row[:max(0, right - x + 1)]):
+            old = area_row[sx]
+            # Empty cells of an upper layer all read as one shared tile, so compare by type there
+            if old is not tile and not (layer and old.type == tile.type == "empty"):
+                tile_changes.append((x + sx, y + sy, old, tile))
+
+    removed_triggers = area.triggers_in(x, y, right, bottom)
+    taken = ({trig.name for trig in area.triggers} - {trig.name for trig in removed_triggers}
+             if stamp.triggers else set())
+    added_triggers = []
+    for trig in stamp.triggers:
+        moved = _moved_trigger(trig, x, y)
+        if not inside(moved):
+            continue
+        if moved.name in taken:
+            counter = 1
+            while f"trigger_{counter}" in taken:
+                counter += 1
+            moved.name = f"trigger_{counter}"
+        taken.add(moved.name)
+        added_triggers.append(moved)
+
+    # The object store copies the properties of the objects added to it
+    added_objects = [obj for obj in (replace(obj, x=obj.x + x, y=obj.y + y) for obj in stamp.objects) if inside(obj)]
+    return [TileOp(area, tile_changes, layer),
+            ContentOp(area, "objects", added=added_objects, removed=area.objects_in(x, y, right, bottom)),
+            ContentOp(area, "triggers", added=added_triggers, removed=removed_triggers)]
+
+def save_stamp(stamp, path):
+    """Write a stamp as JSON, replacing the file atomically"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(asdict(stamp), f, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+def load_stamp(path):
+    with open(path, 'r') as f:
+        stamp_dict = json.load(f)
+    stamp = Stamp(**stamp_dict)
+    # Identical plain tiles share one Tile object, as they would after a copy
+    shared = {}
+
+    def intern(tile_data):
+        if tile_data.get("properties"):
+            return Tile(**tile_data)
+        key = (tile_data.get("type", "empty"), tile_data.get("walkable_override"))
+        if key not in shared:
+            shared[key] = Tile(type=key[0], walkable_override=key[1])
+        return shared[key]
+
+    stamp.tiles = [[intern(tile) for tile in row] for row in stamp.tiles]
+    stamp.objects = [GameObject(**obj) for obj in stamp.objects]
+    stamp.triggers = [Trigger(**trig) for trig in stamp.triggers]
+    return stamp
@@ -0,0 +1,189 @@
+import os
+import sys
+import importlib.util
+
+import pytest
+from PIL import ImageTk
+
+# The editor modules live at the top level of the repository
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+class FakePhoto:
+    """Stands in for ImageTk.PhotoImage, which needs a display"""
+
+    def __init__(self, image=None, **options):
+        self.image = image
+
+    def paste(self, image):
+        self.image = image
+
+class FakeCanvas:
+    """Just enough of a Tk canvas: item ids are never reused"""
+
+    def __init__(self, width=800, height=600):
+        self.items = {}  # item -> options, including "kind", "coords" and "tags"
+        self.order = []  # items, bottom first
+        self.next_item = 1
+        self.width, self.height = width, height
+        self.left = self.top = 0  # Scroll position
+
+    def _create(self, kind, coords, options):
+        item = self.next_item
+        self.next_item += 1
+        tags = options.pop("tags", ())
+        self.items[item] = {"kind": kind, "coords": list(coords), "state": "normal",
+                            "tags": {tags} if isinstance(tags, str) else set(tags), **options}
+        self.order.append(item)
+        return item
+
+    def __getattr__(self, name):
+        if name.startswith("create_"):
+            return lambda *coords, **options: self._create(name[len("create_"):], coords, options)
+        raise AttributeError(name)
+
+    def _find(self, tag_or_item):
+        if tag_or_item == "all":
+            return list(self.order)
+        if isinstance(tag_or_item, int):
+            return [tag_or_item] if tag_or_item in self.items else []
+        return [item for item in self.order if tag_or_item in self.items[item]["tags"]]
+
+    def delete(self, *tags_or_items):
+        for tag_or_item in tags_or_items:
+            for item in self._find(tag_or_item):
+                del self.items[item]
+                self.order.remove(item)
+
+    def itemconfigure(self, tag_or_item, **options):
+        for item in self._find(tag_or_item):
+            self.items[item].update(options)
+
+    itemconfig = itemconfigure
+
+    def coords(self, tag_or_item, *coords):
+        if not coords:
+            return self.items[self._find(tag_or_item)[0]]["coords"]
+        for item in self._find(tag_or_item):
+            self.items[item]["coords"] = list(coords)
+
+    def tag_raise(self, tag_or_item, above=None):
+        for item in self._find(tag_or_item):
+            self.order.remove(item)
+            self.order.append(item)
+
+    def tag_lower(self, tag_or_item, below=None):
+        for item in reversed(self._find(tag_or_item)):
+            self.order.remove(item)
+            self.order.insert(0, item)
+
+    def type(self, item):
+        return self.items[item]["kind"] if item in self.items else ""
+
+    def find_all(self):
+        return tuple(self.order)
+
+    def canvasx(self, x):
+        return x + self.left
+
+    def canvasy(self, y):
+        return y + self.top
+
+    def winfo_width(self):
+        return self.width
+
+    def winfo_height(self):
+        return self.height
+
+    def configure(self, **options):
+        pass
+
+    config = configure
+
+    def xview_moveto(self, fraction):
+        pass
+
+    def yview_moveto(self, fraction):
+        pass
+
+class FakeWidget:
+    def config(self, **options):
+        pass
+
+    configure = config
+
+class FakeVar:
+    def __init__(self, value=None):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+class FakeRoot:
+    """Queues after/after_idle callbacks until run_idle()"""
+
+    def __init__(self):
+        self.pending = []
+
+    def after_idle(self, callback, *args):
+        self.pending.append((callback, args))
+
+    def after(self, ms, callback=None, *args):
+        self.pending.append((callback, args))
+
+    def run_idle(self):
+        while self.pending:
+            callback, args = self.pending.pop(0)
+            callback(*args)
+
+@pytest.fixture
+def canvas():
+    return FakeCanvas()
+
+@pytest.fixture
+def fake_photos(monkeypatch):
+    monkeypatch.setattr(ImageTk, "PhotoImage", FakePhoto)
+
+@pytest.fixture
+def editor(fake_photos):
+    """A TinkerEditor with fake widgets in place of its Tk window"""
+    from data_classes import Area, Game
+    from render_stats import RenderStats
+    from tile_manager import TileManager
+    from undo_history import UndoHistory
+
+    spec = importlib.util.spec_from_file_location("tinker_main", os.path.join(ROOT, "tinker-main.py"))
+    tinker_main = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(tinker_main)
+    editor = tinker_main.TinkerEditor.__new__(tinker_main.TinkerEditor)
+    editor.root = FakeRoot()
+    editor.tile_manager = TileManager(load=False)
+    editor.current_game = Game()
+    editor.current_area = Area()
+    editor.current_area_file = editor.current_game_file = None
+    editor.cursor_x = editor.cursor_y = 0
+    editor.selection_anchor = None
+    editor.clipboard_stamp = None
+    editor.autotile = False
+    editor.autotile_neighbours = 8
+    editor.active_layer = 0
+    editor.selected_tile = "empty"
+    editor.selected_mode = "tile"
+    editor.tile_size = 32
+    editor.composite_tiles = False
+    editor.show_grid = editor.show_blocked = True
+    editor.show_stats = False
+    editor.render_stats = RenderStats()
+    editor.history = UndoHistory()
+    editor.selected_trigger_index = 0
+    editor.trigger_colors = dict(tinker_main.TRIGGER_COLORS)
+    editor.canvas = FakeCanvas()
+    editor.tile_canvas = FakeCanvas(200, 500)
+    editor.cursor_label = FakeWidget()
+    editor.game_name_label = FakeWidget()
+    editor.area_name_var = FakeVar("")
+    editor.walkable_override_var = FakeVar("default")
+    return editor
@@ -0,0 +1,56 @@
+"""
+Tests for the synthetic area generator
+"""
+
+from area_generator import generate_area, PALETTE
+from tile_manager import TileManager
+
+SEEDS = range(300)
+
+def walkable_grid(generated, tile_manager):
+    walkable = {value: tile_manager.get_default_walkable(tile_type) for value, tile_type in enumerate(PALETTE)}
+    return [[walkable[value] for value in row] for row in generated.grid]
+
+def reachable_from(walkable, start):
+    height, width = len(walkable), len(walkable[0])
+    seen = {start}
+    stack = [start]
+    while stack:
+        x, y = stack.pop()
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if 0 <= nx < width and 0 <= ny < height and walkable[ny][nx] and (nx, ny) not in seen:
+                seen.add((nx, ny))
+                stack.append((nx, ny))
+    return seen
+
+def test_bsp_rooms_are_connected_to_the_landing():
+    tile_manager = TileManager(load=False)
+    for seed in SEEDS:
+        generated = generate_area("connected", 48, 40, seed, "bsp")
+        walkable = walkable_grid(generated, tile_manager)
+        x, y = generated.landing
+        assert walkable[y][x], f"seed {seed}: landing {generated.landing} is blocked"
+        reached = reachable_from(walkable, generated.landing)
+        floors = {(x, y) for y, row in enumerate(walkable) for x, cell in enumerate(row) if cell}
+        assert floors == reached, f"seed {seed}: {len(floors - reached)} walkable cells cut off from the landing"
+
+def test_caves_are_connected_to_the_landing():
+    tile_manager = TileManager(load=False)
+    for seed in SEEDS:
+        generated = generate_area("caves", 48, 40, seed, "caves", objects=10, triggers=5)
+        walkable = walkable_grid(generated, tile_manager)
+        x, y = generated.landing
+        assert walkable[y][x], f"seed {seed}: landing is blocked"
+        reached = reachable_from(walkable, generated.landing)
+        floors = {(x, y) for y, row in enumerate(walkable) for x, cell in enumerate(row) if cell}
+        assert floors == reached, f"seed {seed}: {len(floors - reached)} walkable cells cut off from the landing"
+        assert len(floors) > 48 * 40 // 4, f"seed {seed}: only {len(floors)} walkable cells"
+        placed = {(obj.x, obj.y) for obj in generated.objects} | {(trig.x, trig.y) for trig in generated.triggers}
+        assert placed <= reached
+
+def test_generation_is_deterministic():
+    first = generate_area("same", 64, 64, 7, "mixed", objects=20, triggers=5)
+    second = generate_area("same", 64, 64, 7, "mixed", objects=20, triggers=5)
+    assert first.grid == second.grid
+    assert first.objects == second.objects
+    assert first.triggers == second.triggers
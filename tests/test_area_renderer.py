@@ -0,0 +1,49 @@
+"""
+Tests for the retained-mode area canvas
+"""
+
+from data_classes import Area, Tile
+
+def make_area(width, height):
+    # "rock" has no sprite, so it is drawn as a rectangle item next to the "empty" sprite items
+    tiles = [[Tile("rock" if (x + y) % 3 == 0 else "empty") for x in range(width)] for y in range(height)]
+    return Area(name="view", width=width, height=height, tiles=tiles)
+
+def visible_tile_items(editor):
+    """Tile items that are not hidden, mapped to the cell their coordinates point at"""
+    size = editor.tile_size
+    tile_items = [items["tile"] for items in list(editor._cell_items.values()) + editor._free_cell_items
+                  if "tile" in items]
+    shown = {}
+    for item in tile_items:
+        options = editor.canvas.items[item]
+        if options["state"] != "hidden":
+            x, y = options["coords"][:2]
+            shown[item] = (x // size, y // size)
+    return shown
+
+def assert_only_viewport_cells_shown(editor):
+    x0, y0, x1, y1 = editor._visible_cells
+    shown = visible_tile_items(editor)
+    assert sorted(shown.values()) == sorted((x, y) for y in range(y0, y1) for x in range(x0, x1))
+    assert all(shown[items["tile"]] == cell for cell, items in editor._cell_items.items())
+
+def test_recycled_cells_are_hidden_until_reused(editor):
+    editor.tile_manager.tiles["rock"] = {}
+    editor.current_area = make_area(100, 100)
+    editor.draw_area()
+    assert_only_viewport_cells_shown(editor)
+
+    editor.canvas.left, editor.canvas.top = 1000, 1200
+    editor.update_viewport()
+    assert_only_viewport_cells_shown(editor)
+
+    # A smaller view leaves spare item sets on the free list
+    editor.canvas.width, editor.canvas.height = 300, 200
+    editor.update_viewport()
+    assert editor._free_cell_items
+    assert_only_viewport_cells_shown(editor)
+
+    editor.canvas.left = editor.canvas.top = 0
+    editor.update_viewport()
+    assert_only_viewport_cells_shown(editor)
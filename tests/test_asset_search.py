@@ -0,0 +1,41 @@
+"""
+Tests for the toolbox asset search
+"""
+
+from asset_search import AssetSearchIndex
+from tile_manager import TileManager
+
+ENTRIES = [("gray_brick_wall", ["walls"]), ("brown_brick_wall", ["walls"]), ("wood_floor", ["floors"]),
+           ("cobblestone_floor", ["floors"]), ("water", ["liquids"])]
+
+def test_terms_match_word_prefixes_in_display_order():
+    index = AssetSearchIndex(ENTRIES)
+    assert index.search("brick") == ["gray_brick_wall", "brown_brick_wall"]
+    assert index.search("BR") == ["gray_brick_wall", "brown_brick_wall"]
+    assert index.search("floor") == ["wood_floor", "cobblestone_floor"]
+    assert index.search("liq") == ["water"]
+
+def test_every_term_must_match():
+    index = AssetSearchIndex(ENTRIES)
+    assert index.search("brick gray") == ["gray_brick_wall"]
+    assert index.search("brown_brick") == ["brown_brick_wall"]
+    assert index.search("brick floor") == []
+
+def test_unmatched_prefixes_fall_back_to_substrings():
+    index = AssetSearchIndex(ENTRIES)
+    assert index.search("rick") == ["gray_brick_wall", "brown_brick_wall"]
+    assert index.search("stone") == ["cobblestone_floor"]
+    assert index.search("zzz") == []
+
+def test_an_empty_query_lists_everything():
+    index = AssetSearchIndex(ENTRIES)
+    assert index.search("  ") == [name for name, _ in ENTRIES]
+
+def test_tile_manager_searches_by_category_and_rebuilds_after_loading():
+    tile_manager = TileManager(load=False)
+    tile_manager.npcs.update({"guard_npc": {}, "king_npc": {"category": "royals"}})
+    assert tile_manager.search_assets("npcs", "npc") == ["guard_npc", "king_npc"]
+    assert tile_manager.search_assets("npcs", "royal") == ["king_npc"]
+    tile_manager.npcs["queen_npc"] = {"category": "royals"}
+    tile_manager.finish_loading()
+    assert tile_manager.search_assets("npcs", "royal") == ["king_npc", "queen_npc"]
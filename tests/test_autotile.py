@@ -0,0 +1,73 @@
+"""
+Tests for bitmask auto-tiling
+"""
+
+from autotile import REDUCED_MASKS, N, NE, E, SE, S, W, NW
+from data_classes import Area
+
+WALL = "stone_wall"
+
+def add_wall_family(tile_manager, *masks):
+    tile_manager.tiles[WALL] = {"category": "wall"}
+    for mask in masks:
+        tile_manager.tiles[f"{WALL}_{mask}"] = {"category": "wall"}
+    tile_manager.autotiler.clear()
+
+def row_types(area, y, x0, x1):
+    return [area.tiles[y][x].type for x in range(x0, x1)]
+
+def test_reduced_masks_cover_every_raw_mask():
+    for neighbours in (4, 8):
+        assert len(REDUCED_MASKS[neighbours]) == 256
+    assert all(mask & ~(N | E | S | W) == 0 for mask in REDUCED_MASKS[4])
+    # A corner only counts when both edges beside it are set
+    assert REDUCED_MASKS[8][N | NE | E] == N | NE | E
+    assert REDUCED_MASKS[8][NE | E] == E
+    assert REDUCED_MASKS[8][NW | N | NE] == N
+    assert REDUCED_MASKS[8][0xFF] == 0xFF
+
+def test_lookup_falls_back_from_8_to_4_neighbours_to_the_base(editor):
+    tile_manager = editor.tile_manager
+    add_wall_family(tile_manager, N | NE | E, N | E, N | E | S)
+    table = tile_manager.autotiler.table(WALL, 8)
+    assert len(table) == 256
+    assert table[N | NE | E].type == f"{WALL}_{N | NE | E}"
+    assert table[N | E].type == f"{WALL}_{N | E}"
+    # No 8-neighbour variant for N|NE|E|SE|S, so the 4-neighbour N|E|S is used
+    assert table[N | NE | E | SE | S].type == f"{WALL}_{N | E | S}"
+    assert table[W].type == WALL
+    assert tile_manager.autotiler.table(WALL, 4)[N | NE | E].type == f"{WALL}_{N | E}"
+    assert tile_manager.autotiler.family(f"{WALL}_{N | E}") == WALL
+
+def test_painting_retiles_neighbours_in_one_undo_step(editor):
+    add_wall_family(editor.tile_manager, E, E | W, W)
+    area = editor.current_area = Area(name="walls", width=8, height=4)
+    editor.autotile = True
+    editor.selected_tile = WALL
+
+    editor.paint_cells([(1, 1), (2, 1), (3, 1)])
+    assert row_types(area, 1, 1, 4) == [f"{WALL}_{E}", f"{WALL}_{E | W}", f"{WALL}_{W}"]
+    assert len(editor.history.undo_stack) == 1
+
+    # Extending the wall re-picks the old end in the same TileOp
+    editor.paint_cells([(4, 1)])
+    assert row_types(area, 1, 3, 5) == [f"{WALL}_{E | W}", f"{WALL}_{W}"]
+    command = editor.history.undo_stack[-1]
+    assert len(command.ops) == 1 and len(command.ops[0].changes) == 2
+
+    editor.undo()
+    assert row_types(area, 1, 1, 5) == [f"{WALL}_{E}", f"{WALL}_{E | W}", f"{WALL}_{W}", "empty"]
+    editor.undo()
+    assert row_types(area, 1, 1, 5) == ["empty"] * 4
+
+def test_retile_area_is_one_step(editor):
+    add_wall_family(editor.tile_manager, E, E | W, W)
+    area = editor.current_area = Area(name="walls", width=8, height=4)
+    editor.selected_tile = WALL
+    editor.paint_cells([(2, 2), (3, 2), (4, 2)])
+    assert row_types(area, 2, 2, 5) == [WALL] * 3
+
+    editor.retile_area()
+    assert row_types(area, 2, 2, 5) == [f"{WALL}_{E}", f"{WALL}_{E | W}", f"{WALL}_{W}"]
+    editor.undo()
+    assert row_types(area, 2, 2, 5) == [WALL] * 3
@@ -0,0 +1,71 @@
+"""
+Tests for game-wide find and replace
+"""
+
+import os
+import json
+
+import pytest
+
+from data_classes import Area, Tile, GameObject, Trigger, ObjectStore
+from game_replace import ReplaceSpec, GameReplace, replace_ops
+from undo_history import EditCommand
+
+def make_area(name):
+    tiles = [[Tile("grass" if x < 2 else "sand") for x in range(4)] for y in range(3)]
+    return Area(name=name, width=4, height=3, tiles=tiles,
+                objects=ObjectStore([GameObject("grass", 1, 1), GameObject("chest", 2, 2)]),
+                triggers=[Trigger(0, 0, "teleport", "door", {"area": "grass", "x": 1, "y": 1})])
+
+def write_areas(tmp_path, names):
+    paths = []
+    for name in names:
+        path = tmp_path / (name + ".json")
+        path.write_text(json.dumps(make_area(name).to_dict()))
+        paths.append(str(path))
+    return paths
+
+def test_preview_counts_without_writing(tmp_path):
+    paths = write_areas(tmp_path, ["first", "second"])
+    before = [open(path).read() for path in paths]
+    results = GameReplace(paths, ReplaceSpec("grass", "moss")).preview()
+    assert results == {path: {"tiles": 6, "objects": 1, "triggers": 1} for path in paths}
+    assert [open(path).read() for path in paths] == before
+
+def test_apply_replaces_in_every_file(tmp_path):
+    paths = write_areas(tmp_path, ["first", "second"])
+    GameReplace(paths, ReplaceSpec("grass", "moss", objects=False)).apply()
+    for path in paths:
+        with open(path) as f:
+            area = Area.from_dict(json.load(f))
+        assert {tile.type for row in area.tiles for tile in row} == {"moss", "sand"}
+        assert [obj.type for obj in area.objects] == ["grass", "chest"]
+        assert area.triggers[0].parameters["area"] == "moss"
+    assert sorted(os.listdir(tmp_path)) == ["first.json", "second.json"]
+
+def test_a_failing_file_rolls_back_every_staged_file(tmp_path):
+    paths = write_areas(tmp_path, ["first", "second"])
+    broken = tmp_path / "broken.json"
+    broken.write_text("{not json")
+    paths.append(str(broken))
+    before = {path: open(path).read() for path in paths}
+    with pytest.raises(OSError, match="broken.json"):
+        GameReplace(paths, ReplaceSpec("grass", "moss")).apply()
+    assert {path: open(path).read() for path in paths} == before
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+def test_replace_ops_undo_as_one_command():
+    area = make_area("memory")
+    original = area.to_dict()
+    ops, counts = replace_ops(area, ReplaceSpec("grass", "moss"))
+    assert counts == {"tiles": 6, "objects": 1, "triggers": 1}
+    command = EditCommand("Replace", [op for op in ops if op])
+    command.apply(True)
+    assert area.tiles[0][0].type == "moss" and area.tiles[0][2].type == "sand"
+    assert sorted(obj.type for obj in area.objects) == ["chest", "moss"]
+    assert area.triggers[0].parameters["area"] == "moss"
+    command.apply(False)
+    restored = area.to_dict()
+    # Undo re-adds the replaced objects at the end of the store
+    assert sorted(restored.pop("objects"), key=str) == sorted(original.pop("objects"), key=str)
+    assert restored == original
@@ -0,0 +1,68 @@
+"""
+Tests for the minimap's incremental updates
+"""
+
+import pytest
+
+import minimap
+from minimap import Minimap
+from data_classes import Area, Tile
+from conftest import FakeCanvas
+
+COLORS = {"empty": (255, 255, 255), "grass": (0, 200, 0), "water": (0, 0, 220), "lava": (230, 60, 0)}
+
+class FakeTileManager:
+    def get_tile_color(self, tile_type):
+        return COLORS[tile_type]
+
+class FakeTk:
+    def __init__(self):
+        self.calls = []
+
+    def call(self, *args):
+        self.calls.append(args)
+
+def make_minimap(area):
+    view = Minimap.__new__(Minimap)
+    view.canvas = FakeCanvas(minimap.MINIMAP_SIZE, minimap.MINIMAP_SIZE)
+    view.canvas.tk = FakeTk()
+    view.image_item = view.canvas.create_image(0, 0)
+    view.area = None
+    view.set_area(area, FakeTileManager())
+    return view
+
+def cell_color(view, x, y):
+    return view.pil_image.getpixel((x * view.scale, y * view.scale))
+
+@pytest.fixture
+def area():
+    tiles = [[Tile("grass" if (x + y) % 2 else "empty") for x in range(20)] for y in range(10)]
+    return Area(name="mini", width=20, height=10, tiles=tiles)
+
+def test_edited_cells_match_a_full_refresh(fake_photos, area):
+    view = make_minimap(area)
+    assert view.scale == 2
+    area.tiles[3][4] = Tile("water")
+    area.tiles[9][19] = Tile("lava")
+    view.update_cells([(4, 3), (19, 9), (25, 3)])
+    assert cell_color(view, 4, 3) == COLORS["water"]
+    assert cell_color(view, 19, 9) == COLORS["lava"]
+    # Only the two in-bounds cells were written to the Tk photo
+    assert [call[1:3] for call in view.canvas.tk.calls] == [("put", "#0000dc"), ("put", "#e63c00")]
+
+    incremental = view.pil_image.tobytes()
+    view.refresh()
+    assert view.pil_image.tobytes() == incremental
+
+def test_large_edits_re_render_once(fake_photos, area, monkeypatch):
+    monkeypatch.setattr(minimap, "BULK_UPDATE_CELLS", 10)
+    view = make_minimap(area)
+    photo = view.photo
+    cells = [(x, y) for y in range(10) for x in range(5)]
+    for x, y in cells:
+        area.tiles[y][x] = Tile("water")
+    view.update_cells(cells)
+    assert view.photo is not photo
+    assert view.canvas.tk.calls == []
+    assert all(cell_color(view, x, y) == COLORS["water"] for x, y in cells)
+    assert cell_color(view, 5, 0) == COLORS["grass"]
@@ -0,0 +1,129 @@
+"""
+Tests for the column-oriented object store of an area
+"""
+
+import random
+from dataclasses import replace
+
+import pytest
+
+from data_classes import Area, GameObject, ObjectStore
+
+def make_area(objects=()):
+    return Area(name="objects", width=16, height=16, objects=ObjectStore(objects))
+
+def test_moving_a_view_in_place_moves_it_in_the_cell_index():
+    area = make_area([GameObject("npc", 1, 1), GameObject("chest", 1, 1)])
+    npc = area.objects_at(1, 1)[0]
+    npc.x = 5
+    npc.y = 6
+    assert area.objects[0].x == 5
+    assert [obj.type for obj in area.objects_at(1, 1)] == ["chest"]
+    assert area.objects_at(5, 6) == [GameObject("npc", 5, 6)]
+    assert area.objects_at(5, 6)[0] is npc
+
+def test_type_and_property_writes_persist():
+    area = make_area([GameObject("npc", 2, 3)])
+    obj = area.objects[0]
+    obj.type = "merchant"
+    obj.properties["name"] = "Ada"
+    assert area.objects[0].type == "merchant"
+    assert area.objects[0].properties == {"name": "Ada"}
+    assert area.to_dict()["objects"] == [{"type": "merchant", "x": 2, "y": 3, "properties": {"name": "Ada"}}]
+    obj.properties = {}
+    assert area.objects.properties == {}
+
+def test_areas_and_stores_compare_by_value():
+    objects = [GameObject("npc", 1, 2, {"name": "Bo"}), GameObject("chest", 3, 4)]
+    assert make_area(objects) == make_area(objects)
+    assert make_area(objects) != make_area(objects[:1])
+    assert ObjectStore(objects) == objects
+    assert ObjectStore(objects)[0] == GameObject("npc", 1, 2, {"name": "Bo"})
+    area = make_area(objects)
+    assert Area.from_dict(area.to_dict()) == area
+
+def test_assigning_a_list_is_rejected():
+    area = make_area()
+    with pytest.raises(TypeError):
+        area.objects = [GameObject("npc", 0, 0)]
+
+def test_views_survive_rows_moving():
+    area = make_area([GameObject("npc", 0, 0), GameObject("chest", 1, 0), GameObject("door", 2, 0)])
+    door = area.objects[2]
+    area.remove_object(area.objects[0])
+    assert door.type == "door" and door.x == 2
+    door.y = 7
+    assert area.objects_at(2, 7) == [door]
+
+def test_removed_view_keeps_its_values():
+    area = make_area([GameObject("npc", 4, 4, {"name": "Cy"})])
+    obj = area.objects[0]
+    area.remove_object(obj)
+    assert len(area.objects) == 0
+    assert obj == GameObject("npc", 4, 4, {"name": "Cy"})
+    obj.x = 9
+    assert area.objects_at(9, 4) == []
+    area.add_object(obj)
+    assert area.objects_at(9, 4) == [GameObject("npc", 9, 4, {"name": "Cy"})]
+
+def test_replace_copies_a_view():
+    area = make_area([GameObject("npc", 1, 1)])
+    moved = replace(area.objects[0], x=3)
+    assert moved == GameObject("npc", 3, 1)
+    assert area.objects[0].x == 1
+
+def test_adds_and_removes_match_a_list():
+    rng = random.Random(7)
+    area = make_area()
+    reference = []
+    for _ in range(2000):
+        if reference and rng.random() < 0.4:
+            obj = reference.pop(rng.randrange(len(reference)))
+            assert area.objects.remove(obj)
+        else:
+            obj = GameObject(rng.choice(["npc", "chest", "door"]), rng.randrange(8), rng.randrange(8))
+            area.add_object(obj)
+            reference.append(obj)
+        if rng.random() < 0.1 and reference:
+            view = area.objects[rng.randrange(len(area.objects))]
+            target = next(obj for obj in reference if obj == view)
+            view.x = target.x = rng.randrange(8)
+    assert sorted(area.objects.records()) == sorted((obj.type, obj.x, obj.y, obj.properties) for obj in reference)
+    for x in range(8):
+        for y in range(8):
+            assert sorted(obj.type for obj in area.objects_at(x, y)) == \
+                sorted(obj.type for obj in reference if (obj.x, obj.y) == (x, y))
+
+def test_every_mutation_of_a_fresh_rows_properties_persists():
+    area = make_area([GameObject("npc", 0, 0) for _ in range(5)])
+    first, second, third, fourth, fifth = area.objects
+    first.properties |= {"name": "Di"}
+    second.properties.update(level=3)
+    third.properties.setdefault("hostile", True)
+    fourth.properties["gold"] = 7
+    assert fifth.properties.pop("missing", None) is None
+    assert [obj.properties for obj in area.objects] == [{"name": "Di"}, {"level": 3}, {"hostile": True},
+                                                        {"gold": 7}, {}]
+    del fourth.properties["gold"]
+    first.properties.popitem()
+    second.properties.clear()
+    assert third.properties.pop("hostile")
+    assert all(properties == {} for _, _, _, properties in area.objects.records())
+
+def test_copied_stores_do_not_share_properties():
+    store = ObjectStore([GameObject("chest", 1, 1, {"loot": ["gem"]})])
+    copy = ObjectStore(store)
+    copy[0].properties["loot"].append("key")
+    copy[0].properties["gold"] = 3
+    assert store[0].properties == {"loot": ["gem"]}
+
+def test_resize_undo_keeps_later_property_edits_out_of_the_original(editor, monkeypatch):
+    monkeypatch.setattr("dialog_tools.messagebox.showinfo", lambda *args: None)
+    area = editor.current_area = make_area([GameObject("chest", 2, 2, {"gold": 5})])
+    original = area.objects
+    editor.resize_canvas(8, 8)
+    assert area.objects is not original
+    area.objects_at(2, 2)[0].properties["gold"] = 50
+    editor.undo()
+    assert area.objects is original
+    assert area.objects_at(2, 2)[0].properties == {"gold": 5}
@@ -0,0 +1,55 @@
+"""
+Tests for the per-row and per-column tile counts of an area
+"""
+
+import random
+
+from data_classes import Area, Tile
+from undo_history import AttrOp, EditCommand
+
+def recount(area):
+    rows = [sum(tile.type != "empty" for tile in row) for row in area.tiles]
+    columns = [sum(area.tiles[y][x].type != "empty" for y in range(area.height)) for x in range(area.width)]
+    return rows, columns
+
+def scattered_area(seed=3):
+    rng = random.Random(seed)
+    area = Area(name="occupancy", width=12, height=9)
+    for _ in range(30):
+        area.set_tile(rng.randrange(2, 10), rng.randrange(2, 7), Tile("wall"))
+    return area
+
+def test_counts_follow_tile_edits():
+    area = scattered_area()
+    area.occupancy()
+    area.set_tile(0, 0, Tile("floor"))
+    area.set_tile(3, 3, Tile())
+    assert area.occupancy() == recount(area)
+
+def test_window_counts_survive_any_assignment_order():
+    for order in (("width", "height", "tiles"), ("tiles", "width", "height"), ("height", "tiles", "width")):
+        area = scattered_area()
+        x0, y0, width, height = 1, 1, 11, 8
+        values = {"width": width, "height": height, "tiles": area.window(x0, y0, width, height)}
+        command = EditCommand("Crop", [AttrOp(area, cells=None, **{name: values[name] for name in order})])
+        command.apply(True)
+        assert area._counted() is not None  # Carried over from window() rather than recounted
+        assert area.occupancy() == recount(area)
+        area.set_tile(0, 0, Tile("floor"))
+        assert area.occupancy() == recount(area)
+        command.apply(False)
+        assert (area.width, area.height) == (12, 9)
+        assert area.occupancy() == recount(area)
+
+def test_growing_and_shrinking_recount_when_tiles_are_cut_off(editor, monkeypatch):
+    monkeypatch.setattr("dialog_tools.messagebox.showinfo", lambda *args: None)
+    area = editor.current_area = scattered_area()
+    editor.resize_canvas(20, 15)
+    assert area.occupancy() == recount(area)
+    editor.resize_canvas(5, 5)
+    assert area.occupancy() == recount(area)
+    editor.crop_canvas_to_room()
+    assert area.occupancy() == recount(area)
+    for _ in range(3):
+        editor.undo()
+        assert area.occupancy() == recount(area)
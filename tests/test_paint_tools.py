@@ -0,0 +1,72 @@
+"""
+Tests for the rectangle, line and flood-fill painting shapes
+"""
+
+from data_classes import Area, Tile, TileLayer
+from paint_tools import rect_cells, line_cells, flood_cells
+
+def test_rect_cells_from_any_corner():
+    cells = [(1, 2), (2, 2), (3, 2), (1, 3), (2, 3), (3, 3)]
+    assert rect_cells(1, 2, 3, 3) == cells
+    assert rect_cells(3, 3, 1, 2) == cells
+    assert rect_cells(4, 4, 4, 4) == [(4, 4)]
+
+def test_line_cells_include_both_endpoints():
+    assert line_cells(0, 0, 3, 0) == [(0, 0), (1, 0), (2, 0), (3, 0)]
+    assert line_cells(2, 2, 2, 2) == [(2, 2)]
+    assert line_cells(0, 0, 3, 3) == [(0, 0), (1, 1), (2, 2), (3, 3)]
+
+def test_line_cells_steep_and_negative_slopes():
+    steep = line_cells(0, 0, 2, 6)
+    assert steep[0] == (0, 0) and steep[-1] == (2, 6)
+    # One cell per row on a steep line, each step moving at most one column
+    assert [y for _, y in steep] == list(range(7))
+    assert all(abs(x2 - x1) <= 1 for (x1, _), (x2, _) in zip(steep, steep[1:]))
+    backwards = line_cells(5, 4, 0, 1)
+    assert backwards[0] == (5, 4) and backwards[-1] == (0, 1)
+    assert [x for x, _ in backwards] == [5, 4, 3, 2, 1, 0]
+    assert sorted(backwards) == sorted(line_cells(0, 1, 5, 4))
+
+def walled_area():
+    # A 3x2 room of floor inside a ring of walls, in a field of grass
+    area = Area(name="fill", width=7, height=6,
+                tiles=[[Tile("grass") for _ in range(7)] for _ in range(6)])
+    for x, y in rect_cells(1, 1, 5, 4):
+        area.tiles[y][x] = Tile("wall" if x in (1, 5) or y in (1, 4) else "floor")
+    return area
+
+def test_flood_fill_stays_inside_its_region():
+    area = walled_area()
+    assert flood_cells(area, 3, 2) == rect_cells(2, 2, 4, 3)
+    grass = flood_cells(area, 0, 0)
+    assert len(grass) == 7 * 6 - 5 * 4
+    assert (3, 2) not in grass
+
+def test_flood_fill_with_the_same_tile_changes_nothing(editor):
+    area = editor.current_area = walled_area()
+    editor.selected_tile = "floor"
+    editor.cursor_x, editor.cursor_y = 3, 2
+    editor.paint_flood_fill()
+    assert not editor.history.can_undo
+    editor.selected_tile = "water"
+    editor.paint_flood_fill()
+    assert [area.tiles[y][x].type for x, y in rect_cells(2, 2, 4, 3)] == ["water"] * 6
+    assert area.tiles[1][1].type == "wall"
+
+class CountingCells(dict):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.reads = 0
+
+    def get(self, key, default=None):
+        self.reads += 1
+        return super().get(key, default)
+
+def test_upper_layer_fill_reads_only_near_the_region():
+    area = Area(name="big", width=1000, height=1000)
+    ring = {(x, y): Tile("fence") for x, y in rect_cells(10, 10, 14, 14) if x in (10, 14) or y in (10, 14)}
+    cells = CountingCells(ring)
+    area.layers = [area.layers[0], TileLayer(name="Upper", cells=cells)]
+    filled = flood_cells(area, 12, 12, layer=1)
+    assert filled == rect_cells(11, 11, 13, 13)
+    assert cells.reads < 100
@@ -0,0 +1,28 @@
+"""
+Tests for the timings shown in the render-stats overlay
+"""
+
+import json
+
+from data_classes import Area, Tile
+
+def test_incremental_redraws_are_timed(editor):
+    editor.current_area = Area(name="timed", width=40, height=40)
+    editor.draw_area()
+    editor.canvas.left = 320
+    editor.update_viewport()
+    editor.current_area.set_tile(12, 3, Tile("wall"))
+    editor.schedule_redraw(cells=[(12, 3)])
+    editor.root.run_idle()
+    counts = editor.render_stats.counts
+    for name in ("draw_area", "update_viewport", "flush_redraw", "redraw_cells"):
+        assert counts.get(name), name
+
+def test_opening_a_game_is_timed(editor, tmp_path, monkeypatch):
+    path = tmp_path / "game.json"
+    path.write_text(json.dumps({"name": "Timed", "areas": []}))
+    monkeypatch.setattr("file_manager.filedialog.askopenfilename", lambda **options: str(path))
+    monkeypatch.setattr(type(editor), "show_load_message", lambda self, **parts: None)
+    editor.open_game()
+    assert editor.current_game.name == "Timed"
+    assert editor.render_stats.counts["load_game"] == 1
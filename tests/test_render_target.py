@@ -0,0 +1,39 @@
+"""
+Tests for the PhotoImages a CanvasTarget keeps alive
+"""
+
+from PIL import Image
+
+from render_target import CanvasTarget, PHOTO_CACHE_SIZE
+
+def make_target(canvas):
+    return CanvasTarget(canvas, tile_manager=None)
+
+def test_composites_nobody_shows_are_dropped(fake_photos, canvas):
+    target = make_target(canvas)
+    pil_image = Image.new("RGB", (4, 4))
+    item = target.composite(0, 0, ("grass",), pil_image)
+    for n in range(10 * PHOTO_CACHE_SIZE):
+        target.set_composite(item, ("grass", n), pil_image)
+        canvas.delete(target.composite(0, 0, ("water", n), pil_image))
+    assert len(target._composites) <= 2 * PHOTO_CACHE_SIZE
+    # The photo a live item shows is never dropped
+    assert target._composites[("grass", 10 * PHOTO_CACHE_SIZE - 1)] is canvas.items[item]["image"]
+
+def test_shown_photos_are_kept_past_the_limit(fake_photos, canvas):
+    target = make_target(canvas)
+    pil_image = Image.new("RGB", (4, 4))
+    items = [target.composite(0, 0, ("stack", n), pil_image) for n in range(2 * PHOTO_CACHE_SIZE)]
+    items += [target.paste(0, 0, pil_image) for _ in range(PHOTO_CACHE_SIZE)]
+    for item in items:
+        assert target.canvas.items[item]["image"] in target._composites.values() or \
+            target._photos.get(item) is target.canvas.items[item]["image"]
+
+def test_pasted_photos_of_deleted_items_are_dropped(fake_photos, canvas):
+    target = make_target(canvas)
+    pil_image = Image.new("RGB", (4, 4))
+    for _ in range(10 * PHOTO_CACHE_SIZE):
+        target.canvas.delete(target.paste(0, 0, pil_image))
+    assert len(target._photos) <= PHOTO_CACHE_SIZE + 1
+    target.clear()
+    assert not target._photos and not target._composites
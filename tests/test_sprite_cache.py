@@ -0,0 +1,63 @@
+"""
+Tests for pinning and eviction in the sprite cache
+"""
+
+from PIL import Image
+
+from render_target import CanvasTarget
+from sprite_cache import SpriteCache
+from tile_manager import TileManager
+
+SPRITE = Image.new("RGB", (8, 8))
+SPRITE_BYTES = 8 * 8 * 3
+
+def make_cache(count, budget):
+    cache = SpriteCache(lambda path: SPRITE, budget)
+    for n in range(count):
+        cache.register(f"sprite{n}", f"sprite{n}.png", SPRITE)
+    return cache
+
+def test_a_sprite_stays_pinned_until_every_pin_is_dropped(fake_photos):
+    cache = make_cache(2, 10 * SPRITE_BYTES)
+    photo = cache.get_photo("sprite0", "area")
+    cache.get_photo("sprite0", "area")
+    cache.set_budget(0)
+    cache.unpin("sprite0", "area")
+    assert cache.get_photo("sprite0") is photo
+    cache.unpin("sprite0", "area")
+    cache.unpin("sprite0", "area")  # One too many is ignored
+    cache.set_budget(0)
+    assert cache.stats()["pinned"] == 0
+    assert cache._entries["sprite0"]["photo"] is None
+
+def test_eviction_skips_pinned_sprites(fake_photos):
+    cache = make_cache(200, 1000 * SPRITE_BYTES)
+    pinned = [cache.get_photo(f"sprite{n}", "area") for n in range(100)]
+    for n in range(100, 200):
+        cache.get_photo(f"sprite{n}")
+    assert len(cache._photo_lru) == 100
+    cache.set_budget(0)
+    # Only unpinned sprites were candidates, and all of them went
+    assert not cache._photo_lru and not cache._decoded_lru
+    assert [cache._entries[f"sprite{n}"]["photo"] for n in range(100)] == pinned
+    assert cache.used_bytes == 100 * 2 * SPRITE_BYTES
+    cache.release("area")
+    assert cache.used_bytes == 0
+
+def test_recycled_and_deleted_items_give_their_pins_back(fake_photos, canvas):
+    tile_manager = TileManager(load=False)
+    cache = tile_manager.sprite_cache
+    for n in range(3):
+        cache.register(f"sprite{n}", f"sprite{n}.png", SPRITE)
+    infos = [{"sprite": f"sprite{n}"} for n in range(3)]
+    target = CanvasTarget(canvas, tile_manager)
+    first = target.sprite(0, 0, infos[0], 8)
+    second = target.sprite(0, 0, infos[0], 8)
+    assert cache._pin_counts == {"sprite0": 2}
+    target.set_sprite(first, infos[1], 8)
+    assert cache._pin_counts == {"sprite0": 1, "sprite1": 1}
+    target.release(second)
+    assert cache._pin_counts == {"sprite1": 1}
+    target.set_sprite(second, infos[2], 8)
+    target.delete(first)
+    assert cache._pin_counts == {"sprite2": 1}
@@ -0,0 +1,59 @@
+"""
+Tests for region copy/paste and stamps
+"""
+
+import pytest
+
+from data_classes import Area, GameObject, ObjectStore, Trigger
+from stamps import copy_region, clear_ops, paste_ops
+from undo_history import EditCommand
+
+def make_area(objects=(), triggers=()):
+    return Area(name="stamps", width=20, height=20, objects=ObjectStore(objects), triggers=list(triggers))
+
+def test_stamp_and_pastes_own_their_properties():
+    area = make_area([GameObject("chest", 2, 2, {"gold": 5})],
+                     [Trigger(3, 3, "teleport", "door", {"area": "cellar"})])
+    stamp = copy_region(area, 1, 1, 4, 4)
+    stamp.objects[0].properties["gold"] = 99
+    stamp.triggers[0].parameters["area"] = "attic"
+    assert area.objects[0].properties == {"gold": 5}
+    assert area.triggers[0].parameters == {"area": "cellar"}
+
+    EditCommand("Paste", paste_ops(area, stamp, 10, 10)).apply(True)
+    EditCommand("Paste", paste_ops(area, stamp, 15, 15)).apply(True)
+    first, second = area.objects_at(11, 11)[0], area.objects_at(16, 16)[0]
+    first.properties["gold"] = 1
+    assert second.properties == {"gold": 99}
+    assert stamp.objects[0].properties == {"gold": 99}
+    assert area.triggers_at(12, 12)[0].parameters is not area.triggers_at(17, 17)[0].parameters
+
+def test_cut_and_paste_round_trip_with_undo():
+    area = make_area([GameObject("npc", 5, 5), GameObject("npc", 9, 9)], [Trigger(6, 5, "custom", "trap")])
+    stamp = copy_region(area, 5, 5, 6, 6)
+    cut = EditCommand("Cut", clear_ops(area, 5, 5, 6, 6))
+    cut.apply(True)
+    assert area.objects == [GameObject("npc", 9, 9)] and area.triggers == []
+    EditCommand("Paste", paste_ops(area, stamp, 0, 0)).apply(True)
+    assert area.objects_at(0, 0) == [GameObject("npc", 0, 0)]
+    assert [trig.name for trig in area.triggers_at(1, 0)] == ["trap"]
+    cut.apply(False)
+    assert area.objects_at(5, 5) == [GameObject("npc", 5, 5)]
+
+def test_small_regions_use_the_cell_index(monkeypatch):
+    objects = [GameObject("rock", x % 200, x // 200) for x in range(20000)]
+    area = Area(name="big", width=200, height=100, objects=ObjectStore(objects),
+                triggers=[Trigger(x, 50, "custom", f"t{x}") for x in range(200)])
+
+    def no_scan(*args):
+        pytest.fail("scanned every object or trigger")
+
+    monkeypatch.setattr(ObjectStore, "__iter__", no_scan)
+    triggers_by_cell = area._index()
+    monkeypatch.setattr(area, "triggers", type("NoScan", (list,), {"__iter__": no_scan})(area.triggers))
+    area._cell_index = triggers_by_cell  # Built once, before scanning is forbidden
+    stamp = copy_region(area, 10, 49, 12, 51)
+    assert len(stamp.objects) == 9 and len(stamp.triggers) == 3
+    assert len(clear_ops(area, 10, 49, 12, 51)[1].removed) == 9
+    ops = paste_ops(area, copy_region(area, 0, 0, 1, 1), 30, 30)
+    assert len(ops[1].added) == len(ops[1].removed) == 4
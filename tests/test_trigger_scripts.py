@@ -0,0 +1,50 @@
+"""
+Tests for the trigger script bytecode cache
+"""
+
+import os
+
+import trigger_scripts
+from trigger_scripts import TriggerScriptCache
+
+SOURCE = "game.add_item('key')\n"
+
+def cached_files(cache_dir):
+    return sorted(name for name in os.listdir(cache_dir) if name.endswith(".bin"))
+
+def count_compiles(monkeypatch):
+    calls = []
+
+    def counting_compile(source, filename, mode):
+        calls.append(filename)
+        return compile(source, filename, mode)
+
+    monkeypatch.setattr(trigger_scripts, "compile", counting_compile, raising=False)
+    return calls
+
+def test_second_compile_reads_the_marshal_cache(tmp_path, monkeypatch):
+    calls = count_compiles(monkeypatch)
+    code, error = TriggerScriptCache(str(tmp_path)).compile(SOURCE, "first.py")
+    assert error is None and calls == ["first.py"]
+    assert len(cached_files(tmp_path)) == 1
+
+    # A fresh cache, as after restarting the editor, loads the code from disk
+    cached, error = TriggerScriptCache(str(tmp_path)).compile(SOURCE, "second.py")
+    assert error is None and calls == ["first.py"]
+    assert cached.co_code == code.co_code
+
+def test_changed_source_is_recompiled(tmp_path, monkeypatch):
+    calls = count_compiles(monkeypatch)
+    cache = TriggerScriptCache(str(tmp_path))
+    cache.compile(SOURCE, "trigger.py")
+    code, error = cache.compile(SOURCE + "game.add_item('map')\n", "trigger.py")
+    assert error is None and len(calls) == 2
+    assert len(cached_files(tmp_path)) == 2
+    assert "map" in code.co_consts
+
+def test_syntax_errors_are_reported_and_not_cached(tmp_path):
+    cache = TriggerScriptCache(str(tmp_path))
+    code, error = cache.compile("if True\n", "broken.py")
+    assert code is None
+    assert error.startswith("broken.py:1:")
+    assert cached_files(tmp_path) == []
@@ -0,0 +1,77 @@
+"""
+Tests for the memory-bounded undo history
+"""
+
+from data_classes import Area, Tile
+from undo_history import UndoHistory, EditCommand, TileOp, AttrOp
+
+def paint(area, x, tile_type):
+    return EditCommand("Paint", [TileOp.fill(area, [(x, 0)], tile_type)])
+
+def test_typing_a_name_merges_into_one_undo_step(editor):
+    area = editor.current_area = Area(name="start", width=4, height=4)
+    for name in ("s", "sh", "shop"):
+        editor.area_name_var.set(name)
+        editor.on_area_name_change(None)
+    assert area.name == "shop"
+    assert editor.history.stats()["undo_steps"] == 1
+    editor.undo()
+    assert area.name == "start"
+    assert not editor.history.can_undo
+
+def test_merging_stops_at_a_different_key():
+    area = Area(name="a", width=4, height=4)
+    history = UndoHistory()
+    for name, key in (("b", "rename"), ("c", "rename"), ("d", None), ("e", "rename")):
+        command = EditCommand("Rename", [AttrOp(area, name=name)], key)
+        command.apply(True)
+        history.push(command)
+    assert len(history.undo_stack) == 3
+    names = []
+    while history.can_undo:
+        history.undo()
+        names.append(area.name)
+    assert names == ["d", "c", "a"]
+
+def test_oldest_steps_are_dropped_over_the_budget():
+    area = Area(name="cap", width=8, height=1)
+    step_bytes = paint(area, 0, "rock").nbytes
+    history = UndoHistory(max_bytes=3 * step_bytes)
+    for x in range(8):
+        command = paint(area, x, "rock")
+        command.apply(True)
+        history.push(command)
+        assert history.used_bytes <= history.max_bytes
+    assert history.stats()["undo_steps"] == 3
+    while history.can_undo:
+        history.undo()
+    # Only the last three cells went back to empty
+    assert [tile.type for tile in area.tiles[0]] == ["rock"] * 5 + ["empty"] * 3
+
+def test_the_latest_step_is_kept_even_when_it_alone_is_over_budget():
+    area = Area(name="big", width=8, height=1)
+    history = UndoHistory(max_bytes=1)
+    for tile_type in ("rock", "sand"):
+        command = EditCommand("Fill", [TileOp.fill(area, [(x, 0) for x in range(8)], tile_type)])
+        command.apply(True)
+        history.push(command)
+    assert history.stats()["undo_steps"] == 1
+    history.undo()
+    assert {tile.type for tile in area.tiles[0]} == {"rock"}
+
+def test_a_new_edit_discards_the_redo_steps():
+    area = Area(name="redo", width=4, height=1)
+    history = UndoHistory()
+    for x in range(2):
+        command = paint(area, x, "rock")
+        command.apply(True)
+        history.push(command)
+    history.undo()
+    assert history.can_redo
+    used = history.used_bytes
+    command = paint(area, 3, "sand")
+    command.apply(True)
+    history.push(command)
+    assert not history.can_redo
+    assert history.used_bytes == used
+    assert area.tiles[0][1] == Tile("empty")
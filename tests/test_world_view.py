@@ -0,0 +1,72 @@
+"""
+Tests for the world layout and the area stream behind the world view
+"""
+
+import json
+import time
+
+from data_classes import Area, Game
+from world_view import layout_world, AreaStream, WORLD_AREA_GAP
+
+def write_area(tmp_path, filename, width, height):
+    (tmp_path / filename).write_text(json.dumps(Area(name=filename[:-5], width=width, height=height).to_dict()))
+
+def load_all(stream, paths):
+    for path in paths:
+        stream.request(path)
+    arrived = []
+    while stream.busy:
+        time.sleep(0.01)
+        arrived += stream.poll()
+    return arrived
+
+def test_saved_positions_win_and_the_rest_are_packed_below(tmp_path, capsys):
+    sizes = {"town.json": (30, 20), "cave.json": (10, 10), "forest.json": (40, 12), "shop.json": (8, 6)}
+    for filename, (width, height) in sizes.items():
+        write_area(tmp_path, filename, width, height)
+    (tmp_path / "broken.json").write_text("{")
+    game = Game(areas=list(sizes) + ["broken.json", "missing.json"], world_positions={"town.json": [5, 7]})
+
+    placements = {p.filename: p for p in layout_world(game, str(tmp_path))}
+    assert sorted(placements) == sorted(sizes)
+    assert "Error reading area missing.json" in capsys.readouterr().out
+    town = placements["town.json"]
+    assert (town.x, town.y, town.width, town.height) == (5, 7, 30, 20)
+    assert placements["cave.json"].name == "cave"
+
+    others = [p for p in placements.values() if p is not town]
+    assert all(p.y >= town.y + town.height + WORLD_AREA_GAP for p in others)
+    for first in placements.values():
+        for second in placements.values():
+            if first is not second:
+                assert not first.intersects(second.x, second.y, second.x + second.width, second.y + second.height)
+
+def test_trim_drops_least_recently_used_unwanted_areas(tmp_path):
+    for filename in ("a.json", "b.json", "c.json"):
+        write_area(tmp_path, filename, 10, 10)
+    paths = [str(tmp_path / filename) for filename in ("a.json", "b.json", "c.json")]
+    stream = AreaStream(cell_budget=200)
+    try:
+        assert sorted(load_all(stream, paths)) == sorted(paths)
+        a, b, c = paths
+        stream.get(a)  # a is now the most recently used
+        assert stream.trim(wanted={c}) == [b]
+        assert stream.loaded_cells() == 200
+        assert stream.trim(wanted=set()) == []
+        assert stream.get(b) is None and stream.get(a) is not None
+        stream.cell_budget = 0
+        assert stream.trim(wanted={a, c}) == []
+    finally:
+        stream.close()
+
+def test_the_open_area_is_served_instead_of_its_file(tmp_path):
+    write_area(tmp_path, "a.json", 10, 10)
+    path = str(tmp_path / "a.json")
+    edited = Area(name="edited", width=10, height=10)
+    stream = AreaStream(open_area=lambda: (path, edited))
+    try:
+        stream.request(path)
+        assert not stream.busy
+        assert stream.get(path) is edited
+    finally:
+        stream.close()
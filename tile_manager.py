@@ -3,150 +3,224 @@ Tile and Asset Manager for the Tinker RPG Editor
 """
 
 import os
-import glob
-from PIL import Image, ImageTk
+import sys
+import hashlib
+import threading
+from PIL import Image
+from sprite_cache import SpriteCache, DEFAULT_CACHE_BUDGET
+from trigger_scripts import TriggerScriptCache
+from asset_registry import AssetRegistry
+from asset_search import AssetSearchIndex
+from autotile import AutoTiler
+
+SPRITE_SIZE = (32, 32)
+
+def decode_sprite(png_file):
+    """Open a sprite PNG and normalise it to the editor tile size"""
+    pil_image = Image.open(png_file)
+    pil_image.load()
+    if pil_image.size != SPRITE_SIZE:
+        pil_image = pil_image.resize(SPRITE_SIZE, Image.NEAREST)
+    return pil_image
+
+def sprite_digest(pil_image):
+    """Hash the decoded pixel data so identical sprites share one key"""
+    h = hashlib.sha1()
+    h.update(f"{pil_image.mode}:{pil_image.size[0]}x{pil_image.size[1]}:".encode())
+    h.update(pil_image.tobytes())
+    return h.hexdigest()
+
+def file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def find_duplicate_sprites(directories=("tiles", "npcs", "objects")):
+    """Return groups of PNG paths (recursively) whose pixel data is identical"""
+    by_file = {}
+    by_pixels = {}
+    for directory in directories:
+        for dirpath, dirnames, filenames in os.walk(directory):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if not filename.lower().endswith(".png"):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    raw = file_digest(path)
+                    if raw not in by_file:
+                        by_file[raw] = sprite_digest(decode_sprite(path))
+                    by_pixels.setdefault(by_file[raw], []).append(path)
+                except Exception as e:
+                    print(f"Error reading {path}: {e}")
+    return [paths for paths in by_pixels.values() if len(paths) > 1]
+
+def print_duplicate_report(directories=("tiles", "npcs", "objects")):
+    groups = find_duplicate_sprites(directories)
+    if not groups:
+        print("No duplicate sprites found")
+        return groups
+    wasted = 0
+    for paths in groups:
+        print(f"{len(paths)} identical sprites:")
+        for path in paths:
+            print(f"  {path}")
+        wasted += len(paths) - 1
+    print(f"{len(groups)} duplicate groups, {wasted} redundant images")
+    return groups
 
 class TileManager:
     """Manages loading tiles from PNG files and their properties"""
     
-    def __init__(self):
-        self.tiles = {}
-        self.npcs = {}
-        self.objects = {}
-        self.triggers = {}
-        self.loaded_assets = self.load_all_assets()
+    def __init__(self, cache_budget=DEFAULT_CACHE_BUDGET, load=True):
+        self.sprite_cache = SpriteCache(decode_sprite, cache_budget)  # keyed by pixel digest
+        self._file_digests = {}  # raw file digest -> pixel digest
+        self._digest_lock = threading.Lock()
+        self.trigger_scripts = TriggerScriptCache()
+        self.trigger_errors = []
+        self.search_indexes = {}  # kind -> AssetSearchIndex, built on first search
+        self.autotiler = AutoTiler(self)
+        
+        self.registry = AssetRegistry()
+        self.tiles = self.registry.register_kind("tiles", "tiles", [".png"], self._load_sprite_file,
+                                                 self._commit_tile)
+        self.npcs = self.registry.register_kind("npcs", "npcs", [".png"], self._load_sprite_file,
+                                                self._commit_sprite_asset("npcs"))
+        self.objects = self.registry.register_kind("objects", "objects", [".png"], self._load_sprite_file,
+                                                   self._commit_sprite_asset("objects"))
+        self.triggers = self.registry.register_kind("triggers", "triggers", [".py"], self._load_trigger_file,
+                                                    self._commit_trigger)
+        self.loaded_assets = self.load_all_assets() if load else []
     
     def load_all_assets(self):
-        loaded_assets = []
-        
-        if self.load_tiles():
-            loaded_assets.append("tiles")
-        if self.load_npcs():
-            loaded_assets.append("npcs")
-        if self.load_objects():
-            loaded_assets.append("objects")
-        if self.load_triggers():
-            loaded_assets.append("triggers")
-        
-        return loaded_assets
+        self.registry.load()
+        return self.finish_loading()
     
-    def load_tiles(self):
-        tiles_dir = "tiles"
-        if not os.path.exists(tiles_dir):
-            os.makedirs(tiles_dir)
-            self._create_default_tile()
-            return False
-        
-        png_files = glob.glob(os.path.join(tiles_dir, "*.png"))
-        if not png_files:
-            self._create_default_tile()
-            return False
-        
-        loaded_any = False
-        for png_file in png_files:
-            try:
-                tile_name = os.path.splitext(os.path.basename(png_file))[0]
-                pil_image = Image.open(png_file)
-                if pil_image.size != (32, 32):
-                    pil_image = pil_image.resize((32, 32), Image.NEAREST)
-                photo_image = ImageTk.PhotoImage(pil_image)
-                display_name = tile_name.replace('_', ' ').title()
-                category = self._get_tile_category(tile_name)
-                
-                self.tiles[tile_name] = {
-                    "image": photo_image,
-                    "display_name": display_name,
-                    "category": category
-                }
-                loaded_any = True
-            except Exception as e:
-                print(f"Error loading {png_file}: {e}")
+    def load_all_assets_async(self, progress=None):
+        """Start loading on a background thread; poll the returned job from the UI
+        thread, then call finish_loading() once it reports finished"""
+        return self.registry.load_async(progress)
+    
+    def finish_loading(self):
+        """Order assets by name and record which kinds loaded"""
+        for assets in self.registry.assets.values():
+            ordered = sorted(assets.items())
+            assets.clear()
+            assets.update(ordered)
         
-        if not loaded_any:
+        if not self.tiles:
             self._create_default_tile()
-            return False
+        self.search_indexes.clear()
+        self.autotiler.clear()
         
-        return True
+        self.loaded_assets = [kind for kind, assets in self.registry.assets.items()
+                              if assets and not (kind == "tiles" and list(assets) == ["empty"])]
+        return self.loaded_assets
     
-    def load_npcs(self):
-        npcs_dir = "npcs"
-        if not os.path.exists(npcs_dir):
-            os.makedirs(npcs_dir)
-            return False
-        
-        png_files = glob.glob(os.path.join(npcs_dir, "*.png"))
-        loaded_any = False
-        for png_file in png_files:
-            try:
-                npc_name = os.path.splitext(os.path.basename(png_file))[0]
-                pil_image = Image.open(png_file)
-                if pil_image.size != (32, 32):
-                    pil_image = pil_image.resize((32, 32), Image.NEAREST)
-                photo_image = ImageTk.PhotoImage(pil_image)
-                display_name = npc_name.replace('_', ' ').title()
-                
-                self.npcs[npc_name] = {
-                    "image": photo_image,
-                    "display_name": display_name
-                }
-                loaded_any = True
-            except Exception as e:
-                print(f"Error loading NPC {png_file}: {e}")
-        
-        return loaded_any
+    # Worker-thread loaders
+    def _load_sprite_file(self, png_file):
+        """Decode a sprite unless an identical file has already been decoded"""
+        raw = file_digest(png_file)
+        with self._digest_lock:
+            digest = self._file_digests.get(raw)
+        if digest is not None:
+            return digest, None
+        pil_image = decode_sprite(png_file)
+        digest = sprite_digest(pil_image)
+        with self._digest_lock:
+            self._file_digests[raw] = digest
+        return digest, pil_image
     
-    def load_objects(self):
-        objects_dir = "objects"
-        if not os.path.exists(objects_dir):
-            os.makedirs(objects_dir)
-            return False
-        
-        png_files = glob.glob(os.path.join(objects_dir, "*.png"))
-        loaded_any = False
-        for png_file in png_files:
-            try:
-                obj_name = os.path.splitext(os.path.basename(png_file))[0]
-                pil_image = Image.open(png_file)
-                if pil_image.size != (32, 32):
-                    pil_image = pil_image.resize((32, 32), Image.NEAREST)
-                photo_image = ImageTk.PhotoImage(pil_image)
-                display_name = obj_name.replace('_', ' ').title()
-                
-                self.objects[obj_name] = {
-                    "image": photo_image,
-                    "display_name": display_name
-                }
-                loaded_any = True
-            except Exception as e:
-                print(f"Error loading object {png_file}: {e}")
-        
-        return loaded_any
+    def _load_trigger_file(self, py_file):
+        with open(py_file, 'r') as f:
+            code = f.read()
+        code_object, error = self.trigger_scripts.compile(code, py_file)
+        return code, code_object, error
     
-    def load_triggers(self):
-        triggers_dir = "triggers"
-        if not os.path.exists(triggers_dir):
-            os.makedirs(triggers_dir)
-            return False
-        
-        py_files = glob.glob(os.path.join(triggers_dir, "*.py"))
-        loaded_any = False
-        for py_file in py_files:
-            try:
-                trigger_name = os.path.splitext(os.path.basename(py_file))[0]
-                with open(py_file, 'r') as f:
-                    code = f.read()
-                display_name = trigger_name.replace('_', ' ').title()
-                
-                self.triggers[trigger_name] = {
-                    "code": code,
-                    "display_name": display_name,
-                    "file_path": py_file
-                }
-                loaded_any = True
-            except Exception as e:
-                print(f"Error loading trigger {py_file}: {e}")
+    # Commit callbacks, run on the polling thread
+    def _register_sprite(self, asset_key, png_file, loaded):
+        """Share the decoded image with any identical sprite"""
+        digest, pil_image = loaded
+        self.sprite_cache.register(digest, png_file, pil_image)["assets"].append(asset_key)
+        return digest
+    
+    def _commit_tile(self, tile_name, png_file, loaded):
+        self.tiles[tile_name] = {
+            "display_name": tile_name.replace('_', ' ').title(),
+            "category": self._get_tile_category(tile_name),
+            "sprite": self._register_sprite(f"tiles/{tile_name}", png_file, loaded),
+            "file_path": png_file
+        }
+    
+    def _commit_sprite_asset(self, kind):
+        def commit(name, png_file, loaded):
+            self.registry.assets[kind][name] = {
+                "display_name": name.replace('_', ' ').title(),
+                "sprite": self._register_sprite(f"{kind}/{name}", png_file, loaded),
+                "file_path": png_file
+            }
+        return commit
+    
+    def _commit_trigger(self, trigger_name, py_file, loaded):
+        code, code_object, error = loaded
+        if error:
+            print(f"Syntax error in trigger {error}")
+            self.trigger_errors.append(error)
         
-        return loaded_any
+        self.triggers[trigger_name] = {
+            "code": code,
+            "code_object": code_object,
+            "error": error,
+            "display_name": trigger_name.replace('_', ' ').title(),
+            "file_path": py_file
+        }
+    
+    def search_assets(self, kind, query):
+        """Names of one asset kind matching a toolbox search, in display order"""
+        index = self.search_indexes.get(kind)
+        if index is None:
+            kind_keyword = kind.rstrip("s")  # "npcs" -> "npc"
+            entries = [(name, [info.get("category", kind_keyword)])
+                       for name, info in self.registry.assets[kind].items()]
+            index = self.search_indexes[kind] = AssetSearchIndex(entries)
+        return index.search(query)
+    
+    def get_duplicate_groups(self):
+        """Return lists of loaded asset keys that share identical pixel data"""
+        return [list(entry["assets"]) for _, entry in self.sprite_cache.entries()
+                if len(entry["assets"]) > 1]
+    
+    def get_image(self, info, holder=None, size=None):
+        """Return the PhotoImage for an asset info dict, reloading it if evicted"""
+        digest = info.get("sprite")
+        if digest is None:
+            return None
+        return self.sprite_cache.get_photo(digest, holder, size)
+    
+    def release_image(self, info, holder, size=None):
+        """Drop one pin that get_image took for holder"""
+        digest = info.get("sprite")
+        if digest is not None:
+            self.sprite_cache.unpin(digest, holder, size)
+    
+    def get_tile_color(self, tile_name):
+        """Representative RGB colour of a tile (its average pixel), computed once"""
+        info = self.tiles.get(tile_name)
+        if info is None:
+            return (255, 255, 255) if tile_name == "empty" else (211, 211, 211)
+        if "color" not in info:
+            pil_image = self.get_pil_image(info)
+            if pil_image.mode in ("RGBA", "LA", "P"):
+                # Blend transparent pixels against the canvas background
+                background = Image.new("RGBA", pil_image.size, (255, 255, 255, 255))
+                pil_image = Image.alpha_composite(background, pil_image.convert("RGBA"))
+            info["color"] = pil_image.convert("RGB").resize((1, 1), Image.BOX).getpixel((0, 0))
+        return info["color"]
+    
+    def get_pil_image(self, info, size=None):
+        digest = info.get("sprite")
+        if digest is None:
+            return None
+        return self.sprite_cache.get_pil(digest, size)
     
     def _get_tile_category(self, tile_name):
         if "_wall" in tile_name:
@@ -165,10 +239,11 @@ class TileManager:
         return category in ["floor", "door", "stairs"]
     
     def _create_default_tile(self):
-        pil_image = Image.new('RGB', (32, 32), color=(200, 200, 200))
-        photo_image = ImageTk.PhotoImage(pil_image)
+        pil_image = Image.new('RGB', SPRITE_SIZE, color=(200, 200, 200))
+        digest = sprite_digest(pil_image)
+        self.sprite_cache.register(digest, None, pil_image)["assets"].append("tiles/empty")
         self.tiles["empty"] = {
-            "image": photo_image,
+            "sprite": digest,
             "display_name": "Empty",
             "category": "floor"
         }
@@ -195,4 +270,7 @@ class TileManager:
         return self.objects.get(obj_name, {})
     
     def get_trigger_info(self, trigger_name):
-        return self.triggers.get(trigger_name, {})
\ No newline at end of file
+        return self.triggers.get(trigger_name, {})
+
+if __name__ == "__main__":
+    print_duplicate_report(sys.argv[1:] or ("tiles", "npcs", "objects"))
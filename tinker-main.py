@@ -7,51 +7,62 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import json
 import os
+import time
 from dataclasses import asdict
 
 from data_classes import Tile, GameObject, Trigger, Area, Game
 from tile_manager import TileManager
+from sprite_cache import DEFAULT_CACHE_BUDGET
 from editor_methods import EditorMethods
 from file_manager import FileManager
 from dialog_tools import DialogTools
+from area_renderer import AreaRenderer
+from area_scene import TRIGGER_COLORS
+from minimap import Minimap
+from render_stats import RenderStats
+from undo_history import UndoHistory
 
-class TinkerEditor(EditorMethods, FileManager, DialogTools):
+class TinkerEditor(EditorMethods, AreaRenderer, FileManager, DialogTools):
     def __init__(self, root):
         self.root = root
         self.root.title("Tinker RPG Editor")
         self.root.geometry("1400x800")
         
-        self.tile_manager = TileManager()
+        self.cache_budget = DEFAULT_CACHE_BUDGET
+        self.tile_manager = TileManager(cache_budget=self.cache_budget, load=False)
         self.current_game = Game()
         self.current_area = Area()
         self.current_area_file = None
         self.current_game_file = None
         self.cursor_x = 0
         self.cursor_y = 0
-        self.selected_tile = list(self.tile_manager.get_tile_names())[0] if self.tile_manager.get_tile_names() else "empty"
+        self.selection_anchor = None  # Fixed corner for the rectangle and line tools
+        self.clipboard_stamp = None  # Last copied region or loaded stamp
+        self.autotile = False  # Pick wall variants from their neighbours while painting
+        self.autotile_neighbours = 8
+        self.active_layer = 0  # Index into current_area.layers that tile edits go to
+        self.selected_tile = "empty"  # Set once assets finish loading
         self.selected_mode = "tile"
         self.tile_size = 32
+        self.composite_tiles = False
+        self.show_grid = True
+        self.show_blocked = True
+        self.show_stats = False
+        self.render_stats = RenderStats()
+        self.history = UndoHistory()
         
         # Initialize trigger system
         self.selected_trigger_index = 0
-        self.trigger_colors = {
-            "teleport": "#0066CC",      # Blue
-            "inventory": "#009900",     # Green
-            "tile_update": "#FFCC00",   # Yellow
-            "area_object": "#FF6600",   # Orange
-            "game_end": "#9900CC",      # Purple
-            "show_dialog": "#00CCCC",   # Cyan
-            "custom": "#CC0000"         # Red
-        }
+        self.trigger_colors = dict(TRIGGER_COLORS)
         
         self.create_directories()
         self.setup_ui()
         self.bind_events()
-        self.show_startup_message()
+        self.load_assets(on_finished=self.show_startup_message)
         
     def create_directories(self):
         """Create necessary directories if they don't exist"""
-        directories = ["tiles", "npcs", "objects", "triggers", "areas"]
+        directories = ["tiles", "npcs", "objects", "triggers", "areas", "stamps"]
         for directory in directories:
             if not os.path.exists(directory):
                 os.makedirs(directory)
@@ -72,6 +83,7 @@ class TinkerEditor(EditorMethods, FileManager, DialogTools):
         game_menu.add_command(label="Save All", command=self.save_all)
         game_menu.add_separator()
         game_menu.add_command(label="Game Properties", command=self.show_game_properties)
+        game_menu.add_command(label="World View...", command=self.show_world_view)
         
         # Area menu
         area_menu = tk.Menu(menubar, tearoff=0)
@@ -82,15 +94,68 @@ class TinkerEditor(EditorMethods, FileManager, DialogTools):
         area_menu.add_command(label="Save Area As", command=self.save_area_as)
         area_menu.add_separator()
         area_menu.add_command(label="Add Area to Game", command=self.add_area_to_game)
+        area_menu.add_separator()
+        area_menu.add_command(label="Add Layer...", command=self.add_layer)
+        area_menu.add_command(label="Rename Layer...", command=self.rename_layer)
+        area_menu.add_command(label="Remove Layer", command=self.remove_layer)
+        
+        # Edit menu
+        edit_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Edit", menu=edit_menu)
+        edit_menu.add_command(label="Undo", command=self.undo, accelerator="Ctrl+Z")
+        edit_menu.add_command(label="Redo", command=self.redo, accelerator="Ctrl+Y")
+        edit_menu.add_separator()
+        edit_menu.add_command(label="Cut", command=self.cut_selection, accelerator="Ctrl+X")
+        edit_menu.add_command(label="Copy", command=self.copy_selection, accelerator="Ctrl+C")
+        edit_menu.add_command(label="Paste", command=self.paste_clipboard, accelerator="Ctrl+V")
+        edit_menu.add_separator()
+        edit_menu.add_command(label="Save Selection as Stamp...", command=self.save_selection_as_stamp)
+        edit_menu.add_command(label="Load Stamp...", command=self.load_stamp_file)
         
         # Tools menu
         tools_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Tools", menu=tools_menu)
         tools_menu.add_command(label="Reload Assets", command=self.reload_assets)
+        tools_menu.add_command(label="Sprite Cache...", command=self.show_cache_dialog)
+        tools_menu.add_command(label="Dump Render Stats...", command=self.dump_render_stats)
         tools_menu.add_command(label="Resize Canvas...", command=self.show_resize_dialog)
         tools_menu.add_command(label="Crop Canvas to Room", command=self.crop_canvas_to_room)
         tools_menu.add_separator()
+        tools_menu.add_command(label="Set Anchor", command=self.set_selection_anchor, accelerator="M")
+        tools_menu.add_command(label="Fill Rectangle", command=self.paint_rectangle, accelerator="R")
+        tools_menu.add_command(label="Draw Line", command=self.paint_line, accelerator="L")
+        tools_menu.add_command(label="Flood Fill", command=self.paint_flood_fill, accelerator="F")
+        self.autotile_var = tk.BooleanVar(value=self.autotile)
+        tools_menu.add_checkbutton(label="Auto-tile Walls", variable=self.autotile_var,
+                                   command=lambda: setattr(self, 'autotile', self.autotile_var.get()))
+        self.autotile_corners_var = tk.BooleanVar(value=self.autotile_neighbours == 8)
+        tools_menu.add_checkbutton(label="Auto-tile Corners (8 Neighbours)", variable=self.autotile_corners_var,
+                                   command=lambda: setattr(self, 'autotile_neighbours',
+                                                           8 if self.autotile_corners_var.get() else 4))
+        tools_menu.add_command(label="Retile Area", command=self.retile_area)
+        tools_menu.add_separator()
         tools_menu.add_command(label="Update Game Assets", command=self.update_game_assets)
+        tools_menu.add_command(label="Find and Replace in Game...", command=self.show_find_replace_dialog)
+        
+        # View menu
+        view_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="View", menu=view_menu)
+        view_menu.add_command(label="Zoom In", command=self.zoom_in, accelerator="+")
+        view_menu.add_command(label="Zoom Out", command=self.zoom_out, accelerator="-")
+        view_menu.add_command(label="Actual Size", command=lambda: self.set_zoom(32))
+        view_menu.add_separator()
+        self.show_grid_var = tk.BooleanVar(value=self.show_grid)
+        view_menu.add_checkbutton(label="Show Grid", variable=self.show_grid_var,
+                                  command=lambda: self.set_show_grid(self.show_grid_var.get()))
+        self.show_blocked_var = tk.BooleanVar(value=self.show_blocked)
+        view_menu.add_checkbutton(label="Show Blocked Markers", variable=self.show_blocked_var,
+                                  command=lambda: self.set_show_blocked(self.show_blocked_var.get()))
+        self.composite_tiles_var = tk.BooleanVar(value=self.composite_tiles)
+        view_menu.add_checkbutton(label="Composite Tile Layer", variable=self.composite_tiles_var,
+                                  command=lambda: self.set_composite_tiles(self.composite_tiles_var.get()))
+        self.show_stats_var = tk.BooleanVar(value=self.show_stats)
+        view_menu.add_checkbutton(label="Render Stats Overlay", variable=self.show_stats_var,
+                                  command=lambda: self.set_show_stats(self.show_stats_var.get()))
         
         # File menu (legacy support)
         file_menu = tk.Menu(menubar, tearoff=0)
@@ -124,19 +189,48 @@ class TinkerEditor(EditorMethods, FileManager, DialogTools):
         ttk.Radiobutton(mode_frame, text="Triggers", variable=self.mode_var, 
                        value="trigger", command=self.on_mode_change).pack(anchor=tk.W)
         
+        # Tile layer that tile edits go to, with its visibility and lock
+        layer_frame = ttk.Frame(self.tile_frame)
+        layer_frame.pack(fill=tk.X, padx=5, pady=(0, 5))
+        ttk.Label(layer_frame, text="Layer:").pack(side=tk.LEFT)
+        self.layer_combo = ttk.Combobox(layer_frame, state="readonly", width=12)
+        self.layer_combo.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.layer_combo.bind('<<ComboboxSelected>>', self.on_layer_select)
+        self.layer_visible_var = tk.BooleanVar(value=True)
+        self.layer_locked_var = tk.BooleanVar(value=False)
+        layer_flags = ttk.Frame(self.tile_frame)
+        layer_flags.pack(fill=tk.X, padx=5)
+        ttk.Checkbutton(layer_flags, text="Visible", variable=self.layer_visible_var,
+                        command=self.on_layer_flags_change).pack(side=tk.LEFT)
+        ttk.Checkbutton(layer_flags, text="Locked", variable=self.layer_locked_var,
+                        command=self.on_layer_flags_change).pack(side=tk.LEFT)
+        self.update_layer_controls()
+        
+        # Search field filters the palette as you type
+        search_frame = ttk.Frame(self.tile_frame)
+        search_frame.pack(fill=tk.X, padx=5)
+        ttk.Label(search_frame, text="Search:").pack(side=tk.LEFT)
+        self.palette_search_var = tk.StringVar()
+        self.palette_search_var.trace_add("write", lambda *args: self.update_tile_display())
+        ttk.Entry(search_frame, textvariable=self.palette_search_var).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
         # Tile canvas
         canvas_frame = ttk.Frame(self.tile_frame)
         canvas_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         self.tile_canvas = tk.Canvas(canvas_frame, bg="white", width=200)
-        tile_scrollbar = ttk.Scrollbar(canvas_frame, orient=tk.VERTICAL, command=self.tile_canvas.yview)
+        tile_scrollbar = ttk.Scrollbar(canvas_frame, orient=tk.VERTICAL, command=self.on_palette_yview)
         self.tile_canvas.configure(yscrollcommand=tile_scrollbar.set)
         
         self.tile_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         tile_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
         self.tile_canvas.bind('<Button-1>', self.on_tile_canvas_click)
+        self.tile_canvas.bind('<Configure>', self.render_palette)
         self.tile_canvas.configure(takefocus=True)
+        
+        self.asset_status_label = ttk.Label(self.tile_frame, text="")
+        self.asset_status_label.pack(fill=tk.X, padx=5, pady=(0, 5))
 
     def setup_area_panel(self, parent):
         self.area_frame = ttk.LabelFrame(parent, text="Area Editor")
@@ -161,6 +255,9 @@ class TinkerEditor(EditorMethods, FileManager, DialogTools):
         self.cursor_label = ttk.Label(info_frame, text=f"Cursor: ({self.cursor_x}, {self.cursor_y})")
         self.cursor_label.pack(side=tk.RIGHT)
         
+        self.zoom_label = ttk.Label(info_frame, text="Zoom: 100%")
+        self.zoom_label.pack(side=tk.RIGHT, padx=(0, 10))
+        
         self.selected_tile_label = ttk.Label(info_frame, text=f"Selected: {self.selected_tile}")
         self.selected_tile_label.pack(side=tk.RIGHT, padx=(0, 10))
         
@@ -171,16 +268,17 @@ class TinkerEditor(EditorMethods, FileManager, DialogTools):
         self.canvas = tk.Canvas(canvas_frame, bg="white")
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
-        v_scrollbar = ttk.Scrollbar(canvas_frame, orient=tk.VERTICAL, command=self.canvas.yview)
+        v_scrollbar = ttk.Scrollbar(canvas_frame, orient=tk.VERTICAL, command=self.on_area_yview)
         v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.canvas.configure(yscrollcommand=v_scrollbar.set)
         
-        h_scrollbar = ttk.Scrollbar(self.area_frame, orient=tk.HORIZONTAL, command=self.canvas.xview)
+        h_scrollbar = ttk.Scrollbar(self.area_frame, orient=tk.HORIZONTAL, command=self.on_area_xview)
         h_scrollbar.pack(side=tk.BOTTOM, fill=tk.X, padx=5)
         self.canvas.configure(xscrollcommand=h_scrollbar.set)
         
         self.canvas.configure(takefocus=True)
         self.canvas.bind('<Button-1>', self.on_canvas_click)
+        self.canvas.bind('<Configure>', self.update_viewport)
         
         self.draw_area()
         self.update_tile_display()
@@ -212,6 +310,13 @@ class TinkerEditor(EditorMethods, FileManager, DialogTools):
         ttk.Label(props_frame, text="Details:").pack(padx=5, pady=(10,0))
         self.properties_text = tk.Text(props_frame, height=15, width=35, state='disabled')
         self.properties_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        # Minimap
+        minimap_frame = ttk.LabelFrame(props_frame, text="Minimap")
+        minimap_frame.pack(fill=tk.X, padx=5, pady=5)
+        self.minimap = Minimap(minimap_frame, on_jump=self.on_minimap_jump)
+        self.minimap.pack(padx=5, pady=5)
+        self.minimap.set_area(self.current_area, self.tile_manager)
 
     def bind_events(self):
         self.root.bind('<Key>', self.on_key_press)
@@ -231,6 +336,10 @@ class TinkerEditor(EditorMethods, FileManager, DialogTools):
         message_parts.append("loaded areas: none")
         message_parts.append("loaded game: " + self.current_game.name)
         
+        # Show trigger scripts that failed to compile
+        if self.tile_manager.trigger_errors:
+            message_parts.append("trigger errors:\n" + "\n".join(self.tile_manager.trigger_errors))
+        
         if message_parts:
             messagebox.showinfo("Tinker RPG Editor", "\n".join(message_parts))
     
@@ -256,17 +365,39 @@ class TinkerEditor(EditorMethods, FileManager, DialogTools):
             messagebox.showinfo("Load Complete", "\n".join(message_parts))
 
     # Asset management
-    def reload_assets(self):
-        self.tile_manager = TileManager()
+    def load_assets(self, on_finished=None):
+        """Load assets in the background and swap them in once complete"""
+        manager = TileManager(cache_budget=self.cache_budget, load=False)
+        self._asset_load_started = time.perf_counter()
+        job = manager.load_all_assets_async(progress=self.on_asset_progress)
+        self.asset_status_label.config(text="Loading assets...")
+        self.root.after(20, self._poll_asset_loading, manager, job, on_finished)
+    
+    def on_asset_progress(self, done, total, kind, name):
+        self.asset_status_label.config(text=f"Loading {kind}: {done}/{total if total is not None else '?'}")
+    
+    def _poll_asset_loading(self, manager, job, on_finished):
+        if not job.poll(limit=200):
+            self.root.after(20, self._poll_asset_loading, manager, job, on_finished)
+            return
+        
+        manager.finish_loading()
+        self.render_stats.record("load_assets", time.perf_counter() - self._asset_load_started)
+        self.tile_manager = manager
         if self.tile_manager.get_tile_names():
             self.selected_tile = self.tile_manager.get_tile_names()[0]
         elif self.selected_mode == "trigger":
             self.selected_tile = "teleport"
+        self.asset_status_label.config(text="")
         self.update_tile_display()
         self.draw_area()
         
+        if on_finished:
+            on_finished()
+    
+    def reload_assets(self):
         # Show consolidated reload message
-        self.show_load_message(loaded_assets=self.tile_manager.loaded_assets)
+        self.load_assets(on_finished=lambda: self.show_load_message(loaded_assets=self.tile_manager.loaded_assets))
 
 def main():
     try:
@@ -0,0 +1,64 @@
+"""
+Trigger script compilation and bytecode cache for the Tinker RPG Editor
+"""
+
+import os
+import hashlib
+import marshal
+import tempfile
+import importlib.util
+
+CACHE_DIR = ".trigger_cache"
+
+def source_digest(source):
+    """Key compiled code by interpreter version and source text"""
+    h = hashlib.sha1(importlib.util.MAGIC_NUMBER)
+    h.update(source.encode("utf-8"))
+    return h.hexdigest()
+
+class TriggerScriptCache:
+    """Compiles trigger scripts once and keeps the code objects in memory and on disk"""
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._code = {}  # source digest -> code object
+
+    def compile(self, source, filename="<trigger>"):
+        """Return (code, error) for source; error is a message string or None"""
+        digest = source_digest(source)
+        code = self._code.get(digest)
+        if code is not None:
+            return code, None
+
+        code = self._read_cached(digest)
+        if code is None:
+            try:
+                code = compile(source, filename, "exec")
+            except (SyntaxError, ValueError) as e:
+                line = getattr(e, "lineno", None)
+                location = f"{filename}:{line}" if line else filename
+                return None, f"{location}: {getattr(e, 'msg', e)}"
+            self._write_cached(digest, code)
+
+        self._code[digest] = code
+        return code, None
+
+    def _cache_path(self, digest):
+        return os.path.join(self.cache_dir, digest + ".bin")
+
+    def _read_cached(self, digest):
+        try:
+            with open(self._cache_path(digest), 'rb') as f:
+                return marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+    def _write_cached(self, digest, code):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, 'wb') as f:
+                marshal.dump(code, f)
+            os.replace(tmp_path, self._cache_path(digest))
+        except OSError as e:
+            print(f"Error caching trigger bytecode: {e}")
@@ -0,0 +1,204 @@
+"""
+Undo/redo history for the Tinker RPG Editor
+"""
+
+import sys
+from collections import deque
+
+DEFAULT_HISTORY_BYTES = 32 * 1024 * 1024
+REF_BYTES = 8  # One list slot or tuple field
+TILE_BYTES = 250  # A Tile instance with its properties dict, roughly
+CHANGE_BYTES = 100  # One (x, y, old, new) change record
+
+# Edits never copy tiles, objects or triggers. Changed cells reference the
+# old and new Tile objects, and resize/crop keep the old row lists, which
+# share their Tile objects with the new grid. For that to be safe, model
+# objects are replaced rather than mutated in place once an edit can see
+# them.
+
+class TileOp:
+    """Replace tiles on individual cells of one tile layer"""
+
+    def __init__(self, area, changes, layer=0):
+        self.area = area
+        self.changes = changes  # [(x, y, old_tile, new_tile)]
+        self.layer = layer  # Index into area.layers; 0 is the ground
+
+    @classmethod
+    def fill(cls, area, cells, tile_type, layer=0):
+        """Plan putting a new tile of tile_type on each in-bounds cell of another type"""
+        from data_classes import Tile
+        new_tile = Tile(type=tile_type)  # One instance shared by every filled cell
+        changes = []
+        for x, y in cells:
+            if 0 <= x < area.width and 0 <= y < area.height:
+                old = area.layer_tile(layer, x, y)
+                if old.type != tile_type:
+                    changes.append((x, y, old, new_tile))
+        return cls(area, changes, layer)
+
+    def __bool__(self):
+        return bool(self.changes)
+
+    def apply(self, forward):
+        for x, y, old, new in self.changes:
+            self.area.set_layer_tile(self.layer, x, y, new if forward else old)
+        return [(x, y) for x, y, _, _ in self.changes]
+
+    def nbytes(self):
+        return len(self.changes) * (CHANGE_BYTES + TILE_BYTES)
+
+class ContentOp:
+    """Add and remove objects or triggers; kind is "objects" or "triggers" """
+
+    def __init__(self, area, kind, added=(), removed=()):
+        self.area = area
+        self.kind = kind
+        self.added = list(added)
+        self.removed = list(removed)
+
+    def __bool__(self):
+        return bool(self.added or self.removed)
+
+    def apply(self, forward):
+        add, remove = (self.added, self.removed) if forward else (self.removed, self.added)
+        for item in remove:
+            if self.kind == "objects":
+                self.area.remove_object(item)
+            else:
+                self.area.remove_trigger(item)
+        for item in add:
+            if self.kind == "objects":
+                self.area.add_object(item)
+            else:
+                self.area.add_trigger(item)
+        return [(item.x, item.y) for item in self.added + self.removed]
+
+    def nbytes(self):
+        return (len(self.added) + len(self.removed)) * (REF_BYTES + TILE_BYTES)
+
+class AttrOp:
+    """Set attributes of any object, remembering the previous values.
+
+    cells lists the area cells to redraw afterwards; None means the whole
+    area. retained_bytes overrides the size estimate of the old values.
+    """
+
+    def __init__(self, target, cells=(), retained_bytes=None, **values):
+        self.target = target
+        self.cells = cells
+        self.old = {name: getattr(target, name) for name in values}
+        self.new = values
+        self.retained_bytes = retained_bytes
+
+    def __bool__(self):
+        return any(_differs(self.old[name], value) for name, value in self.new.items())
+
+    def apply(self, forward):
+        for name, value in (self.new if forward else self.old).items():
+            setattr(self.target, name, value)
+        return None if self.cells is None else list(self.cells)
+
+    def nbytes(self):
+        if self.retained_bytes is not None:
+            return self.retained_bytes
+        return sum(sys.getsizeof(value) for value in self.old.values())
+
+def _differs(old, new):
+    # Model objects compare by identity: a fresh Area() equal to the old one is still a new area
+    if old is None or isinstance(old, (str, int, float, bool)):
+        return old != new
+    return old is not new
+
+def window_retained_bytes(area, x0, y0, width, height):
+    """Estimate what keeping the grid of area costs once it is replaced by area.window(...).
+
+    The old row lists are kept whole; of the Tile objects only those outside
+    the window are, and blank cells are assumed to share one Tile. The count
+    of tiles outside comes from the occupancy counts, so this is an upper
+    bound computed without visiting cells.
+    """
+    row_counts, column_counts = area.occupancy()
+    total = sum(row_counts)
+    outside = min(total, (total - sum(row_counts[y0:y0 + height])) +
+                         (total - sum(column_counts[x0:x0 + width])))
+    return area.height * (sys.getsizeof([]) + area.width * REF_BYTES) + outside * TILE_BYTES
+
+class EditCommand:
+    """One user action made of one or more ops, undone and redone as a unit"""
+
+    def __init__(self, label, ops, merge_key=None):
+        self.label = label
+        self.ops = ops
+        self.merge_key = merge_key  # Consecutive commands with the same key collapse into one
+        self.nbytes = sum(op.nbytes() for op in ops) + sys.getsizeof(self)
+
+    def apply(self, forward):
+        """Run the ops forward or backward; returns cells to redraw or None for everything"""
+        cells = []
+        for op in (self.ops if forward else reversed(self.ops)):
+            changed = op.apply(forward)
+            if changed is None or cells is None:
+                cells = None
+            else:
+                cells.extend(changed)
+        return cells
+
+    def absorb(self, later):
+        """Fold a later single-AttrOp command with the same merge_key into this one"""
+        self.ops[0].new.update(later.ops[0].new)
+
+class UndoHistory:
+    """Undo and redo stacks whose combined size estimate stays under max_bytes.
+
+    When the budget is exceeded the oldest undo steps are discarded first;
+    the most recent step is always kept so the last action can be undone.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_HISTORY_BYTES):
+        self.max_bytes = max_bytes
+        self.undo_stack = deque()
+        self.redo_stack = []
+        self.used_bytes = 0
+
+    @property
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    @property
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+    def push(self, command):
+        for stale in self.redo_stack:
+            self.used_bytes -= stale.nbytes
+        self.redo_stack.clear()
+
+        top = self.undo_stack[-1] if self.undo_stack else None
+        if top is not None and command.merge_key is not None and top.merge_key == command.merge_key:
+            top.absorb(command)
+            return
+        self.undo_stack.append(command)
+        self.used_bytes += command.nbytes
+        while self.used_bytes > self.max_bytes and len(self.undo_stack) > 1:
+            self.used_bytes -= self.undo_stack.popleft().nbytes
+
+    def undo(self):
+        """Undo the latest command; returns (command, cells to redraw)"""
+        command = self.undo_stack.pop()
+        self.redo_stack.append(command)
+        return command, command.apply(False)
+
+    def redo(self):
+        command = self.redo_stack.pop()
+        self.undo_stack.append(command)
+        return command, command.apply(True)
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.used_bytes = 0
+
+    def stats(self):
+        return {"undo_steps": len(self.undo_stack), "redo_steps": len(self.redo_stack),
+                "used_bytes": self.used_bytes, "max_bytes": self.max_bytes}
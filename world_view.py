@@ -0,0 +1,435 @@
+"""
+Stitched world view over the areas of a game for the Tinker RPG Editor
+
+Every area of the game gets a place on one shared cell plane. Area files
+are only parsed once the viewport comes near them, and are dropped again
+when the loaded cells exceed a budget, so a large game can be browsed
+without holding all of it in memory.
+"""
+
+import os
+import re
+import json
+import math
+import tkinter as tk
+from tkinter import ttk
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from PIL import ImageTk
+
+from area_scene import render_area
+
+WORLD_ZOOM_LEVELS = [2, 4, 8, 16, 32]  # Tile sizes in pixels
+WORLD_CHUNK_CELLS = 32  # Cells per side of a streamed chunk image
+WORLD_MARGIN_CHUNKS = 1  # Chunks kept beyond each edge of the view
+WORLD_AREA_GAP = 4  # Cells between areas placed automatically
+LOADED_CELL_BUDGET = 4 * 1024 * 1024  # Cells of area data kept in memory
+HEADER_BYTES = 4096  # Enough of an area file to find its name and size
+CHUNKS_PER_TICK = 4  # Chunk images rendered before yielding to Tk
+TICK_INTERVAL = 15  # Milliseconds between streaming steps
+
+_HEADER_FIELDS = {field: re.compile(rf'"{field}":\s*(\d+|"(?:[^"\\]|\\.)*")')
+                  for field in ("name", "width", "height")}
+
+def read_area_header(path):
+    """(name, width, height) of an area file, from its first bytes when the file starts with them"""
+    with open(path, 'r') as f:
+        head = f.read(HEADER_BYTES)
+    found = {field: pattern.search(head) for field, pattern in _HEADER_FIELDS.items()}
+    if found["width"] and found["height"]:
+        name = json.loads(found["name"].group(1)) if found["name"] else None
+        return name, int(found["width"].group(1)), int(found["height"].group(1))
+    with open(path, 'r') as f:
+        area_dict = json.load(f)
+    return area_dict.get("name"), area_dict.get("width", 20), area_dict.get("height", 15)
+
+class WorldPlacement:
+    """Where one area file sits in the world, in cells"""
+
+    def __init__(self, filename, path, name, x, y, width, height):
+        self.filename = filename
+        self.path = path
+        self.name = name
+        self.x, self.y = x, y
+        self.width, self.height = width, height
+
+    def intersects(self, x0, y0, x1, y1):
+        return self.x < x1 and x0 < self.x + self.width and self.y < y1 and y0 < self.y + self.height
+
+    def contains(self, x, y):
+        return self.x <= x < self.x + self.width and self.y <= y < self.y + self.height
+
+def layout_world(game, areas_dir="areas"):
+    """Place every readable area of the game; saved world positions win over automatic ones.
+
+    Areas without a saved position are packed in rows below the placed ones,
+    wrapping at roughly the width of a square holding all of them.
+    """
+    placements, unplaced = [], []
+    for filename in game.areas:
+        path = os.path.join(areas_dir, filename)
+        try:
+            name, width, height = read_area_header(path)
+        except Exception as e:
+            print(f"Error reading area {filename}: {e}")
+            continue
+        placement = WorldPlacement(filename, path, name or os.path.splitext(filename)[0], 0, 0, width, height)
+        position = game.world_positions.get(filename)
+        if position:
+            placement.x, placement.y = position
+        else:
+            unplaced.append(placement)
+        placements.append(placement)
+
+    top = max((p.y + p.height + WORLD_AREA_GAP for p in placements if p not in unplaced), default=0)
+    row_limit = max([p.width for p in unplaced] +
+                    [int(math.sqrt(sum((p.width + WORLD_AREA_GAP) * (p.height + WORLD_AREA_GAP) for p in unplaced)))])
+    x = row_height = 0
+    for placement in unplaced:
+        if x >= row_limit:
+            top += row_height + WORLD_AREA_GAP
+            x = row_height = 0
+        placement.x, placement.y = x, top
+        x += placement.width + WORLD_AREA_GAP
+        row_height = max(row_height, placement.height)
+    return placements
+
+def _load_area(path):
+    from data_classes import Area
+    with open(path, 'r') as f:
+        return Area.from_dict(json.load(f))
+
+class AreaStream:
+    """Loads area files on a worker thread and keeps the recently used ones within a cell budget.
+
+    Nothing here touches Tk: request() starts loads, poll() collects the
+    finished ones from the Tk thread, and trim() forgets the least recently
+    used areas that are not wanted any more.
+    """
+
+    def __init__(self, cell_budget=LOADED_CELL_BUDGET, open_area=None):
+        self.cell_budget = cell_budget
+        self.open_area = open_area  # Returns (path, area) of the area open in the editor, if any
+        self._areas = OrderedDict()  # path -> Area, least recently used first
+        self._loading = {}  # path -> Future
+        self._pool = ThreadPoolExecutor(max_workers=2)
+
+    def get(self, path):
+        """The loaded area, or None while it is still streaming in"""
+        if self.open_area:
+            open_path, open_area = self.open_area()
+            if open_path and os.path.abspath(open_path) == os.path.abspath(path):
+                return open_area  # Show unsaved edits instead of the file
+        area = self._areas.get(path)
+        if area is not None:
+            self._areas.move_to_end(path)
+        return area
+
+    def request(self, path):
+        if self.get(path) is None and path not in self._loading:
+            self._loading[path] = self._pool.submit(_load_area, path)
+
+    def poll(self):
+        """Move finished loads into the loaded set; returns the paths that just arrived"""
+        arrived = []
+        for path, future in list(self._loading.items()):
+            if future.done():
+                del self._loading[path]
+                try:
+                    self._areas[path] = future.result()
+                    arrived.append(path)
+                except Exception as e:
+                    print(f"Error loading area {path}: {e}")
+        return arrived
+
+    @property
+    def busy(self):
+        return bool(self._loading)
+
+    def loaded_cells(self):
+        return sum(area.width * area.height for area in self._areas.values())
+
+    def trim(self, wanted):
+        """Drop least recently used areas outside wanted until the budget holds; returns the dropped paths"""
+        dropped = []
+        total = self.loaded_cells()
+        for path in list(self._areas):
+            if total <= self.cell_budget:
+                break
+            if path not in wanted:
+                area = self._areas.pop(path)
+                total -= area.width * area.height
+                dropped.append(path)
+        return dropped
+
+    def clear(self):
+        self._areas.clear()
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._loading.clear()
+        self._areas.clear()
+
+class WorldView:
+    """Window showing all areas of a game stitched together, streamed in by chunk.
+
+    Each area has an outline and name label at all times. Its tiles are
+    drawn as WORLD_CHUNK_CELLS-square chunk images rendered by render_area()
+    once the area has loaded, and only for chunks near the view; chunks that
+    scroll away are deleted, and their areas become candidates for
+    unloading. Sprites go through the tile manager's sprite cache, whose
+    budget bounds them the same way as in the editor.
+
+    Drag to pan, +/- to zoom, F5 to reload from disk, double-click to open
+    an area at that cell, and Shift-drag to move an area.
+    """
+
+    def __init__(self, parent, game, tile_manager, areas_dir="areas", open_area=None,
+                 on_open=None, on_move=None, cell_budget=LOADED_CELL_BUDGET):
+        self.game = game
+        self.tile_manager = tile_manager
+        self.areas_dir = areas_dir
+        self.on_open = on_open  # called as on_open(path, x, y) with area cell coordinates
+        self.on_move = on_move  # called as on_move({filename: [x, y]}) with every area's position
+        self.tile_size = 8
+        self.stream = AreaStream(cell_budget, open_area)
+        self._chunks = {}  # (path, cx, cy) -> {"item", "photo"}
+        self._pending = []  # Chunk keys waiting to be rendered, nearest first
+        self._tick_scheduled = False
+        self._drag = None
+
+        self.window = tk.Toplevel(parent)
+        self.window.title(f"World View - {game.name}")
+        self.window.geometry("900x700")
+        frame = ttk.Frame(self.window)
+        frame.pack(fill=tk.BOTH, expand=True)
+        self.canvas = tk.Canvas(frame, bg="#303030", highlightthickness=0)
+        h_scroll = ttk.Scrollbar(frame, orient=tk.HORIZONTAL, command=self._on_xview)
+        v_scroll = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self._on_yview)
+        self.canvas.configure(xscrollcommand=h_scroll.set, yscrollcommand=v_scroll.set)
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        v_scroll.grid(row=0, column=1, sticky="ns")
+        h_scroll.grid(row=1, column=0, sticky="ew")
+        frame.grid_rowconfigure(0, weight=1)
+        frame.grid_columnconfigure(0, weight=1)
+        self.status_label = ttk.Label(self.window, text="")
+        self.status_label.pack(fill=tk.X, padx=5, pady=2)
+
+        self.canvas.bind('<Configure>', lambda event: self.update_view())
+        self.canvas.bind('<ButtonPress-1>', self._on_press)
+        self.canvas.bind('<B1-Motion>', self._on_drag)
+        self.canvas.bind('<ButtonRelease-1>', self._on_release)
+        self.canvas.bind('<Shift-ButtonPress-1>', self._on_move_press)
+        self.canvas.bind('<Double-Button-1>', self._on_double_click)
+        self.window.bind('<plus>', lambda event: self.zoom(1))
+        self.window.bind('<equal>', lambda event: self.zoom(1))
+        self.window.bind('<minus>', lambda event: self.zoom(-1))
+        self.window.bind('<F5>', lambda event: self.reload())
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.placements = layout_world(game, areas_dir)
+        self.draw_world()
+
+    def close(self):
+        self.stream.close()
+        self.window.destroy()
+
+    def draw_world(self):
+        """Rebuild outlines and labels; chunks stream back in for the view"""
+        self.canvas.delete("all")
+        self._chunks.clear()
+        self._pending = []
+        size = self.tile_size
+        right = max((p.x + p.width for p in self.placements), default=1)
+        bottom = max((p.y + p.height for p in self.placements), default=1)
+        self.canvas.configure(scrollregion=(-WORLD_AREA_GAP * size, -WORLD_AREA_GAP * size,
+                                            (right + WORLD_AREA_GAP) * size, (bottom + WORLD_AREA_GAP) * size))
+        for index, placement in enumerate(self.placements):
+            tag = f"area{index}"
+            x1, y1 = placement.x * size, placement.y * size
+            self.canvas.create_rectangle(x1, y1, x1 + placement.width * size, y1 + placement.height * size,
+                                         fill="#505050", outline="white", tags=(tag, "outline"))
+            self.canvas.create_text(x1 + 2, y1 - 2, text=placement.name, anchor=tk.SW, fill="white",
+                                    tags=(tag, "label"))
+        self.update_view()
+
+    def zoom(self, step):
+        index = WORLD_ZOOM_LEVELS.index(self.tile_size) if self.tile_size in WORLD_ZOOM_LEVELS else 2
+        index = max(0, min(len(WORLD_ZOOM_LEVELS) - 1, index + step))
+        if WORLD_ZOOM_LEVELS[index] == self.tile_size:
+            return
+        # Keep the cell in the middle of the view where it is
+        center_x, center_y = self._view_center()
+        self.tile_size = WORLD_ZOOM_LEVELS[index]
+        self.draw_world()
+        self.center_on(center_x, center_y)
+
+    def reload(self):
+        """Forget loaded areas and re-read the game's area files"""
+        self.stream.clear()
+        self.placements = layout_world(self.game, self.areas_dir)
+        self.draw_world()
+
+    def _view_center(self):
+        size = self.tile_size
+        return ((self.canvas.canvasx(0) + self.canvas.winfo_width() / 2) / size,
+                (self.canvas.canvasy(0) + self.canvas.winfo_height() / 2) / size)
+
+    def center_on(self, x, y):
+        """Scroll so world cell (x, y) is in the middle of the view"""
+        left, top, right, bottom = (float(v) for v in str(self.canvas.cget("scrollregion")).split())
+        size = self.tile_size
+        self.canvas.xview_moveto(max(0.0, (x * size - self.canvas.winfo_width() / 2 - left) / (right - left)))
+        self.canvas.yview_moveto(max(0.0, (y * size - self.canvas.winfo_height() / 2 - top) / (bottom - top)))
+        self.update_view()
+
+    def _on_xview(self, *args):
+        self.canvas.xview(*args)
+        self.update_view()
+
+    def _on_yview(self, *args):
+        self.canvas.yview(*args)
+        self.update_view()
+
+    def visible_cells(self, margin_cells=0):
+        """World cell range (x0, y0, x1, y1) in view, x1/y1 exclusive"""
+        size = self.tile_size
+        left, top = self.canvas.canvasx(0), self.canvas.canvasy(0)
+        right = left + max(self.canvas.winfo_width(), 1)
+        bottom = top + max(self.canvas.winfo_height(), 1)
+        return (int(left // size) - margin_cells, int(top // size) - margin_cells,
+                int(right // size) + 1 + margin_cells, int(bottom // size) + 1 + margin_cells)
+
+    def wanted_chunks(self):
+        """Chunk keys near the view, nearest to its center first"""
+        x0, y0, x1, y1 = self.visible_cells(WORLD_MARGIN_CHUNKS * WORLD_CHUNK_CELLS)
+        center_x, center_y = (x0 + x1) / 2, (y0 + y1) / 2
+        wanted = []
+        for placement in self.placements:
+            if not placement.intersects(x0, y0, x1, y1):
+                continue
+            # Chunk range of the view, in the area's own cell coordinates
+            first_cx = max(0, (x0 - placement.x) // WORLD_CHUNK_CELLS)
+            first_cy = max(0, (y0 - placement.y) // WORLD_CHUNK_CELLS)
+            last_cx = min((placement.width - 1) // WORLD_CHUNK_CELLS, (x1 - 1 - placement.x) // WORLD_CHUNK_CELLS)
+            last_cy = min((placement.height - 1) // WORLD_CHUNK_CELLS, (y1 - 1 - placement.y) // WORLD_CHUNK_CELLS)
+            for cy in range(first_cy, last_cy + 1):
+                for cx in range(first_cx, last_cx + 1):
+                    distance = (abs(placement.x + (cx + 0.5) * WORLD_CHUNK_CELLS - center_x) +
+                                abs(placement.y + (cy + 0.5) * WORLD_CHUNK_CELLS - center_y))
+                    wanted.append((distance, (placement.path, cx, cy)))
+        return [key for _, key in sorted(wanted)]
+
+    def update_view(self):
+        """Drop chunks that left the view, queue the ones that entered it and start their area loads"""
+        wanted = self.wanted_chunks()
+        wanted_set = set(wanted)
+        for key in [key for key in self._chunks if key not in wanted_set]:
+            self.canvas.delete(self._chunks.pop(key)["item"])
+        self._pending = [key for key in wanted if key not in self._chunks]
+        wanted_paths = {path for path, _, _ in wanted}
+        for path in wanted_paths:
+            self.stream.request(path)
+        self.stream.trim(wanted_paths)
+        self._schedule_tick()
+        self._update_status()
+
+    def _schedule_tick(self):
+        if not self._tick_scheduled and (self._pending or self.stream.busy):
+            self._tick_scheduled = True
+            self.window.after(TICK_INTERVAL, self._tick)
+
+    def _tick(self):
+        """One streaming step: collect loaded areas and render a few pending chunks"""
+        self._tick_scheduled = False
+        if not self.window.winfo_exists():
+            return
+        self.stream.poll()
+        rendered = 0
+        waiting = []
+        for key in self._pending:
+            if rendered >= CHUNKS_PER_TICK:
+                waiting.append(key)
+                continue
+            area = self.stream.get(key[0])
+            if area is None:
+                waiting.append(key)  # Its area is still streaming in
+                continue
+            self._render_chunk(key, area)
+            rendered += 1
+        self._pending = waiting
+        self._schedule_tick()
+        self._update_status()
+
+    def _render_chunk(self, key, area):
+        path, cx, cy = key
+        placement = next(p for p in self.placements if p.path == path)
+        x0, y0 = cx * WORLD_CHUNK_CELLS, cy * WORLD_CHUNK_CELLS
+        x1, y1 = min(area.width, x0 + WORLD_CHUNK_CELLS), min(area.height, y0 + WORLD_CHUNK_CELLS)
+        if x1 <= x0 or y1 <= y0:
+            return  # The file changed size since it was laid out
+        image = render_area(area, self.tile_manager, self.tile_size, show_grid=False, show_blocked=False,
+                            cells=(x0, y0, x1, y1))
+        photo = ImageTk.PhotoImage(image)
+        size = self.tile_size
+        tag = f"area{self.placements.index(placement)}"
+        item = self.canvas.create_image((placement.x + x0) * size, (placement.y + y0) * size, image=photo,
+                                        anchor=tk.NW, tags=(tag, "chunk"))
+        self.canvas.tag_raise("label")
+        self._chunks[key] = {"item": item, "photo": photo}
+
+    def _update_status(self):
+        loaded = self.stream.loaded_cells()
+        self.status_label.config(text=f"{len(self.placements)} areas, {len(self._chunks)} chunks shown, "
+                                      f"{len(self._pending)} pending, {loaded:,} cells loaded")
+
+    def placement_at(self, event):
+        """(placement, x, y) of the area cell under the mouse, or None"""
+        size = self.tile_size
+        x = int(self.canvas.canvasx(event.x) // size)
+        y = int(self.canvas.canvasy(event.y) // size)
+        for placement in reversed(self.placements):
+            if placement.contains(x, y):
+                return placement, x - placement.x, y - placement.y
+        return None
+
+    def _on_press(self, event):
+        self._drag = None
+        self.canvas.scan_mark(event.x, event.y)
+
+    def _on_drag(self, event):
+        if self._drag is not None:
+            size = self.tile_size
+            placement, last_x, last_y = self._drag
+            dx = int(self.canvas.canvasx(event.x) // size) - last_x
+            dy = int(self.canvas.canvasy(event.y) // size) - last_y
+            if dx or dy:
+                self.canvas.move(f"area{self.placements.index(placement)}", dx * size, dy * size)
+                self._drag = (placement, last_x + dx, last_y + dy)
+                placement.x += dx
+                placement.y += dy
+            return
+        self.canvas.scan_dragto(event.x, event.y, gain=1)
+        self.update_view()
+
+    def _on_move_press(self, event):
+        found = self.placement_at(event)
+        if found is None:
+            return
+        placement, x, y = found
+        self._drag = (placement, placement.x + x, placement.y + y)
+
+    def _on_release(self, event):
+        if self._drag is None:
+            return
+        self._drag = None
+        if self.on_move:
+            # Pin every area, so the automatic layout doesn't shuffle the others around the moved one
+            self.on_move({p.filename: [p.x, p.y] for p in self.placements})
+        self.update_view()
+
+    def _on_double_click(self, event):
+        found = self.placement_at(event)
+        if found and self.on_open:
+            placement, x, y = found
+            self.on_open(placement.path, x, y)